@@ -4,7 +4,10 @@ from dataclasses import asdict
 from typing import Optional
 
 from domain.ports import GameEnvironmentPort
-from domain.services import CriticService, CurriculumService, PlannerService, SkillService
+from domain.services import CriticService, CurriculumService, PlannerService, PreflightValidator, SkillService
+from application.skill_ingestion import SkillIngestionWorker
+from application.speculative_curriculum import SpeculativeCurriculum
+from infrastructure.metrics import STAGE_SECONDS
 from infrastructure.utils import load_skills
 from infrastructure.websocket.agent_ws_server import manager as websocket_manager
 
@@ -15,7 +18,12 @@ class AgentController:
         planner_service: PlannerService,
         critic_service: CriticService, 
         env: GameEnvironmentPort,
-        primitive_skill_dir: str = "infrastructure/primitive_skill"
+        primitive_skill_dir: str = "infrastructure/primitive_skill",
+        skill_ingestion: Optional[SkillIngestionWorker] = None,
+        fresh_library: bool = False,
+        speculative_curriculum: bool = True,
+        agent_id: str = "bot",
+        preflight: Optional[PreflightValidator] = None,
         ):
         self._curriculum_service = curriculum_service
         self._skill_service = skill_service
@@ -23,9 +31,31 @@ class AgentController:
         self._critic_service = critic_service
         self._env = env
         self._primitive_skill_dir = primitive_skill_dir
+        # successful programs are described and indexed off the task critical path
+        self._skill_ingestion = skill_ingestion or SkillIngestionWorker(skill_service, agent_id=agent_id)
+        # by default the persisted library is resumed; True deletes it before the first task
+        self._fresh_library = fresh_library
+        # the next task's QA phase runs while the environment executes a step
+        self._speculation = SpeculativeCurriculum(curriculum_service) if speculative_curriculum else None
+        # the Minecraft username; agents of one pool run side by side in the same world
+        self._agent_id = agent_id
+        # programs failing static checks go back to the planner without an environment step
+        self._preflight = preflight
         self._running_task = None
         self._is_running = False
 
+    @property
+    def agent_id(self) -> str:
+        return self._agent_id
+
+    @property
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def _stage(self, stage: str):
+        """Times one stage of the task loop into `agent_stage_seconds`."""
+        return STAGE_SECONDS.time(self._agent_id, stage)
+
     def start(self):
         logging.info("--- AGENT START CALLED ---")
         if self._is_running:
@@ -37,17 +67,29 @@ class AgentController:
         logging.info("Agent run loop started in background.")
 
     async def stop(self):
-        if not self._running_task or self._running_task.done():
+        if self._running_task is None:
             print("Agent is not running.")
             return
 
-        self._running_task.cancel()
+        # a loop that already finished still leaves the skill worker, the environment and the caches to close
+        if not self._running_task.done():
+            self._running_task.cancel()
         try:
             await self._running_task
         except asyncio.CancelledError:
             print("Agent task was successfully cancelled.")
+        except Exception:
+            # already logged by the run loop
+            pass
 
+        if self._speculation is not None:
+            self._speculation.cancel()
+        await self._curriculum_service.flush()
+        await self._skill_ingestion.stop()
         await self._env.close()
+        if self._preflight is not None:
+            # stops the node syntax worker; a shared checker restarts on its next use
+            await self._preflight.close()
         self._running_task = None
         self._is_running = False
         print("Agent stopped and environment closed.")
@@ -59,20 +101,28 @@ class AgentController:
     async def _run_loop(self, max_tries_per_task: int = 5):
         try:
             logging.info(f"--- Starting agent run loop ---")
-            await self._skill_service.clear()
+            if self._fresh_library:
+                logging.info("Starting with an empty skill library.")
+                await self._skill_service.clear()
+            else:
+                logging.info("Resuming the persisted skill library.")
+            self._skill_ingestion.start()
             primitive_skillset_definitions = load_skills(self._primitive_skill_dir + "/definitions")
             primitive_skillset_usage = load_skills(self._primitive_skill_dir + "/usage")
 
             logging.info("Resetting environment...")
-            observation = await self._env.reset({
-                "port": 25565,
-                "waitTicks": 5,
-                "reset": "hard"
-            })
+            with self._stage("env_reset"):
+                observation = await self._env.reset({
+                    "port": 25565,
+                    "waitTicks": 5,
+                    "reset": "hard",
+                    "username": self._agent_id,
+                })
             logging.info("Environment reset complete. Observation received.")
             
             # Get the first task from the curriculum service
-            task = await self._curriculum_service.get_next_task(observation)
+            with self._stage("curriculum"):
+                task = await self._curriculum_service.get_next_task(observation)
             logging.info(f"First task from curriculum: '{task.command}'")
 
             while task:
@@ -85,50 +135,92 @@ class AgentController:
 
                 while try_count < max_tries_per_task and not success:
                     logging.info(f"--- Task attempt {try_count + 1} ---")
-                    await websocket_manager.broadcast({
-                        "task": task.command,
-                        "code": code_snippet.function_name if code_snippet else "",
-                        "observation": asdict(observation),
-                        "success": success,
-                        "critique": critique if critique else "",
-                    })
+                    with self._stage("broadcast"):
+                        await websocket_manager.broadcast({
+                            "agent": self._agent_id,
+                            "task": task.command,
+                            "code": code_snippet.function_name if code_snippet else "",
+                            "observation": asdict(observation),
+                            "success": success,
+                            "critique": critique if critique else "",
+                        })
                     logging.info("Broadcasted state to websocket.")
                     
-                    retrieved_skillset = await self._skill_service.retrieve_skillset(task)
+                    with self._stage("retrieval"):
+                        retrieved_skillset = await self._skill_service.retrieve_skillset(task)
                     logging.info(f"Retrieved {len(retrieved_skillset)} skills for the task.")
-                    skillset_context = primitive_skillset_usage + retrieved_skillset
                     
                     logging.info("Generating code with planner...")
-                    code_snippet, llm_response = await self._planner_service.generate_code(
-                        skillset_context,
-                        code_snippet,
-                        observation,
-                        task,
-                        critique
-                    )
+                    # the LLM share of this stage is llm_call_seconds{service="planner"}
+                    with self._stage("planner"):
+                        code_snippet, llm_response = await self._planner_service.generate_code(
+                            retrieved_skillset,
+                            code_snippet,
+                            observation,
+                            task,
+                            critique,
+                            static_skillset=primitive_skillset_usage,
+                            helpers=self._skill_service.available_helpers(primitive_skillset_definitions),
+                        )
 
-                    plan = self._planner_service._parser.extract_plan(llm_response)
-                    thought = self._planner_service._parser.extract_thought(llm_response)
+                    with self._stage("parse"):
+                        plan = self._planner_service._parser.extract_plan(llm_response)
+                        thought = self._planner_service._parser.extract_thought(llm_response)
 
                     logging.info(f"code_snippet: {code_snippet}")
 
-                    await websocket_manager.broadcast({
-                        "task": asdict(task),
-                        "plan": {
-                            "plan": plan,
-                            "thought": thought,
-                            "code": code_snippet.execution_code if code_snippet else "",
-                        },
-                        "skills": [asdict(skill) for skill in retrieved_skillset],
-                        "observation": asdict(observation),
-                        "success": success,
-                        "critique": critique if critique else "",
-                    })
-
-                    helper_functions = primitive_skillset_definitions + retrieved_skillset
+                    with self._stage("broadcast"):
+                        await websocket_manager.broadcast({
+                            "agent": self._agent_id,
+                            "task": asdict(task),
+                            "plan": {
+                                "plan": plan,
+                                "thought": thought,
+                                "code": code_snippet.execution_code if code_snippet else "",
+                            },
+                            "skills": [asdict(skill) for skill in retrieved_skillset],
+                            "observation": asdict(observation),
+                            "success": success,
+                            "critique": critique if critique else "",
+                        })
+
+                    if code_snippet is not None and self._preflight is not None:
+                        with self._stage("preflight"):
+                            problems = await self._preflight.validate(
+                                code_snippet,
+                                self._skill_service.available_helpers(primitive_skillset_definitions + list(retrieved_skillset)),
+                            )
+                        if problems:
+                            critique = " ".join(problems)
+                            logging.info(f"Pre-flight check failed; not executing: {critique}")
+                            with self._stage("broadcast"):
+                                await websocket_manager.broadcast({
+                                    "agent": self._agent_id,
+                                    "task": asdict(task),
+                                    "plan": {
+                                        "plan": plan,
+                                        "thought": thought,
+                                        "code": code_snippet.execution_code,
+                                    },
+                                    "skills": [asdict(skill) for skill in retrieved_skillset],
+                                    "observation": asdict(observation),
+                                    "success": False,
+                                    "critique": critique,
+                                })
+                            try_count += 1
+                            continue
+
                     if code_snippet is not None:
+                        # only the helpers the generated code reaches, not the whole library
+                        helper_functions = self._skill_service.resolve_helpers(
+                            code_snippet, primitive_skillset_definitions + list(retrieved_skillset)
+                        )
+                        logging.info(f"Sending {len(helper_functions)} helper functions: {[h.name for h in helper_functions]}")
                         logging.info("Executing code in environment...")
-                        observation = await self._env.step(code_snippet, helper_functions)
+                        if self._speculation is not None:
+                            self._speculation.speculate(observation)
+                        with self._stage("env_step"):
+                            observation = await self._env.step(code_snippet, helper_functions)
                         logging.info("Code execution finished.")
                     else:
                         logging.error("Planner failed to generate code.")
@@ -144,21 +236,24 @@ class AgentController:
                     observation.set_chests(chest_memory)
 
                     logging.info("Evaluating with critic...")
-                    success, critique = await self._critic_service.evaluate(observation, task)
+                    with self._stage("critic"):
+                        success, critique = await self._critic_service.evaluate(observation, task)
                     logging.info(f"Critic evaluation: success={success}, critique='{critique}'")
 
-                    await websocket_manager.broadcast({
-                        "task": asdict(task),
-                        "plan": {
-                            "plan": plan,
-                            "thought": thought,
-                            "code": code_snippet.execution_code if code_snippet else "",
-                        },
-                        "skills": [asdict(skill) for skill in retrieved_skillset],
-                        "observation": asdict(observation),
-                        "success": success,
-                        "critique": critique if critique else "",
-                    })
+                    with self._stage("broadcast"):
+                        await websocket_manager.broadcast({
+                            "agent": self._agent_id,
+                            "task": asdict(task),
+                            "plan": {
+                                "plan": plan,
+                                "thought": thought,
+                                "code": code_snippet.execution_code if code_snippet else "",
+                            },
+                            "skills": [asdict(skill) for skill in retrieved_skillset],
+                            "observation": asdict(observation),
+                            "success": success,
+                            "critique": critique if critique else "",
+                        })
                     logging.info("Broadcasted final state to websocket.")
 
                     logging.info(f"--- End of Try {try_count + 1} ---")
@@ -166,21 +261,28 @@ class AgentController:
 
                 if success:
                     logging.info(f"Task '{task.command}' completed successfully.")
-                    logging.info(f"Adding successful code to skill library: {code_snippet.function_name}")
-                    skill = await self._skill_service.describe_skill(code=code_snippet)
-                    await self._skill_service.add_skill(skill)
+                    logging.info(f"Queueing successful code for the skill library: {code_snippet.function_name}")
+                    # waits only when the ingestion queue is full; describe/add are timed by the worker
+                    with self._stage("skill_queue"):
+                        await self._skill_ingestion.submit(code_snippet, task)
                     self._curriculum_service.add_completed_task(task)
                 else:
                     logging.warning(f"Task '{task.command}' failed after {max_tries_per_task} attempts.")
                     self._curriculum_service.add_failed_task(task)
 
                 # Get the next task
-                task = await self._curriculum_service.get_next_task(observation)
+                with self._stage("curriculum"):
+                    if self._speculation is not None:
+                        task = await self._speculation.next_task(observation)
+                    else:
+                        task = await self._curriculum_service.get_next_task(observation)
                 if task:
                     logging.info(f"New task from curriculum: '{task.command}'")
                 else:
                     logging.info("Curriculum complete. No more tasks.")
 
+            await self._skill_ingestion.flush()
+
         except asyncio.CancelledError:
             logging.info("Agent run loop cancelled.")
             raise
@@ -211,7 +313,7 @@ async def main():
     except Exception as e:
         logging.error(f"An error occurred during agent execution: {e}", exc_info=True)
     finally:
-        if agent_controller and agent_controller._is_running:
+        if agent_controller:
             logging.info("Stopping agent controller.")
             await agent_controller.stop()
 
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import re
+from typing import Callable, Dict, List, Optional
+
+from application.agent_controller import AgentController
+
+# agent ids double as Minecraft usernames
+_AGENT_ID = re.compile(r"^[A-Za-z0-9_]{3,16}$")
+
+
+class AgentPool:
+    """
+    Agents running side by side in one process, each on its own Mineflayer server.
+
+    - `build_agent(agent_id, port)` creates a controller the first time an id is
+      used; agents are numbered in creation order and agent i talks to the server
+      on `base_port + i * port_stride` unless a port is given.
+    - Whatever the factory shares between controllers (LLM quotas, caches, the
+      skill library) is shared by every agent of the pool.
+    - Agents stay in the pool when stopped, so restarting one keeps its curriculum.
+    """
+
+    def __init__(
+        self,
+        build_agent: Callable[[str, int], AgentController],
+        base_port: int = 3000,
+        port_stride: int = 3,
+        max_agents: Optional[int] = None,
+    ):
+        self._build_agent = build_agent
+        self._base_port = base_port
+        self._port_stride = port_stride
+        self._max_agents = max_agents
+        self._agents: Dict[str, AgentController] = {}
+        self._ports: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._agents)
+
+    def __contains__(self, agent_id: str) -> bool:
+        return agent_id in self._agents
+
+    def get(self, agent_id: str, port: Optional[int] = None) -> AgentController:
+        """The agent `agent_id`, built on first use."""
+        if agent_id in self._agents:
+            if port is not None and port != self._ports[agent_id]:
+                raise ValueError(f"Agent '{agent_id}' already uses port {self._ports[agent_id]}")
+            return self._agents[agent_id]
+        if not _AGENT_ID.match(agent_id):
+            raise ValueError(f"Agent id '{agent_id}' is not a valid Minecraft username (3-16 letters, digits or _)")
+        if self._max_agents is not None and len(self._agents) >= self._max_agents:
+            raise ValueError(f"The pool is full ({self._max_agents} agents)")
+        if port is None:
+            port = self._next_port()
+        elif port in self._ports.values():
+            raise ValueError(f"Port {port} is already used by another agent")
+
+        logging.info(f"Adding agent '{agent_id}' on Mineflayer port {port}")
+        self._agents[agent_id] = self._build_agent(agent_id, port)
+        self._ports[agent_id] = port
+        return self._agents[agent_id]
+
+    def start(self, agent_id: str, port: Optional[int] = None) -> AgentController:
+        agent = self.get(agent_id, port)
+        agent.start()
+        return agent
+
+    async def stop(self, agent_id: str) -> None:
+        if agent_id not in self._agents:
+            raise KeyError(agent_id)
+        await self._agents[agent_id].stop()
+
+    async def stop_all(self) -> None:
+        # stop() also closes agents whose loop already finished
+        await asyncio.gather(*(agent.stop() for agent in self._agents.values()))
+
+    def status(self) -> List[dict]:
+        return [
+            {"agent_id": agent_id, "port": self._ports[agent_id], "running": agent.is_running}
+            for agent_id, agent in self._agents.items()
+        ]
+
+    def _next_port(self) -> int:
+        used = set(self._ports.values())
+        index = len(self._agents)
+        while self._base_port + index * self._port_stride in used:
+            index += 1
+        return self._base_port + index * self._port_stride
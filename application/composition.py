@@ -1,90 +1,190 @@
 # application/bootstrap.py
 
-from domain.services import CurriculumService, QAService, CriticService, PlannerService, SkillService
+import asyncio
+from dataclasses import dataclass
+from typing import Callable, Optional
+from domain.ports import DatabasePort, LLMPort
+from domain.services import CurriculumService, QAService, CriticService, PlannerService, PreflightValidator, SkillService
 from application.agent_controller import AgentController
-from infrastructure.adapters.llm import LangchainOllamaLLM, GeminiLLM
-from infrastructure.adapters.database import ChromaDatabase
-from infrastructure.adapters.game.minecraft import MinecraftObservationBuilder, MineflayerEnvironment, MineflayerProcessManager, MineflayerAPIClient
-from infrastructure.parsers import  QAQuestionParser, TaskParser, JSParser, CriticParser
+from infrastructure.adapters.llm import CachingLLM, SqliteResponseCache, ModelRouter, InstrumentedLLM
+from infrastructure.adapters.database import ChromaDatabase, NumpyVectorDatabase, CachedEmbeddings, InstrumentedDatabase, SqliteKeyValueStore
+from infrastructure.adapters.game.minecraft import MinecraftObservationBuilder, MineflayerEnvironment, MineflayerProcessManager, MineflayerAPIClient, NodeSyntaxChecker, load_minecraft_names
+from infrastructure.parsers import  QAQuestionParser, QAAnswerParser, TaskParser, JSParser, CriticParser
 from infrastructure.prompts.registry import get
 from pathlib import Path
 import logging
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 import os
 
-def build_agent(game: str) -> AgentController:
-    logging.info("--- Starting to build agent ---")
+# Mineflayer server i serves its API on 3000 + 3i, its viewer on 3001 + 3i and its inventory on 3002 + 3i
+MINEFLAYER_BASE_PORT = 3000
+MINEFLAYER_PORT_STRIDE = 3
+
+# services whose replies are deterministic enough to serve from the response cache.
+# Planner calls are retried and sampled, so they always reach the model; critic
+# results are cached as parsed verdicts by CriticService (`verdict_cache`), not here.
+CACHED_SERVICES = ("qa", "curriculum", "skill_description")
+
+
+@dataclass
+class SharedServices:
+    """What every agent in the process shares: model quotas and caches, the QA cache and the skill library."""
+    llm_for: Callable[[str], LLMPort]
+    qa_db: DatabasePort
+    skill_service: SkillService
+    planner_service: PlannerService
+    critic_service: CriticService
+    preflight: Optional[PreflightValidator]
+    skill_db: DatabasePort
+
+    async def close(self) -> None:
+        """Persist what the shared databases buffered; call once every agent has stopped."""
+        await asyncio.gather(self.qa_db.compact(), self.skill_db.compact())
+
+
+def build_shared_services(game: str) -> SharedServices:
+    logging.info("--- Building shared services ---")
 
     # Choose your LLM
     logging.info("Initializing LLM...")
-    llm = GeminiLLM()
+    # Each service is routed to a model in configs/llm_config.yaml. Services sharing a model
+    # share its quota; planner/critic calls are admitted first when it runs low.
+    router = ModelRouter.from_yaml(os.getenv("LLM_CONFIG", "configs/llm_config.yaml"))
+    # Identical prompts of CACHED_SERVICES are answered from disk without touching the
+    # quota. LLM_CACHE_MODE=record / replay turns this into a record-then-replay
+    # harness for offline runs.
+    response_cache = SqliteResponseCache("ckpt/llm_cache.sqlite3")
+    cache_mode = os.getenv("LLM_CACHE_MODE", "read_write")
+
+    # Every call is timed into llm_call_seconds (served at /metrics), cache hits included.
+    def llm_for(service: str) -> LLMPort:
+        llm = router.llm_for(service)
+        if service in CACHED_SERVICES:
+            llm = CachingLLM(llm, response_cache, mode=cache_mode)
+        return InstrumentedLLM(llm, service)
     logging.info("LLM initialized.")
 
     logging.info("Initializing Embeddings...")
-    embeddings = GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=os.getenv("GOOGLE_API_KEY"))
+    # Task commands and skill descriptions repeat across attempts and restarts; embed each once.
+    embeddings = CachedEmbeddings(
+        GoogleGenerativeAIEmbeddings(model="models/embedding-001", google_api_key=os.getenv("GOOGLE_API_KEY")),
+        path="ckpt/embedding_cache.sqlite3",
+    )
     logging.info("Embeddings initialized.")
 
-    # QA Service
-    logging.info("Initializing ChromaDatabase for QA...")
-    qa_db = ChromaDatabase(collection_name="qa_cache", embedding_model=embeddings)
-    logging.info("ChromaDatabase for QA initialized.")
-    
-    logging.info("Initializing QA Service...")
-    qa_service = QAService(
-        llm=llm,
-        question_prompt_builder=get(game=game, name="qa_question"),
-        answer_prompt_builder=get(game=game, name="qa_answer"),
-        parser=QAQuestionParser(),
-        database=qa_db
-    )
-    logging.info("QA Service initialized.")
+    # VECTOR_DB=numpy keeps the (small) QA cache and skill library in an in-process NumPy index.
+    backend = {"chroma": ChromaDatabase, "numpy": NumpyVectorDatabase}[os.getenv("VECTOR_DB", "chroma")]
 
-    # Curriculum Service
-    logging.info("Initializing Curriculum Service...")
-    curriculum_service = CurriculumService(
-        llm=llm,
-        qa_service=qa_service,
-        prompt_builder=get(game=game, name="curriculum"),
-        parser=TaskParser()
-    )
-    logging.info("Curriculum Service initialized.")
+    # every call is timed into database_call_seconds, labelled with the collection
+    def vector_db(collection_name: str, **kwargs) -> DatabasePort:
+        return InstrumentedDatabase(backend(collection_name=collection_name, **kwargs), collection_name)
 
+    # QA cache: an answer found by one agent serves them all
+    logging.info(f"Initializing {backend.__name__} for QA...")
+    qa_db = vector_db(collection_name="qa_cache", embedding_model=embeddings)
+    logging.info(f"{backend.__name__} for QA initialized.")
+    
     # planner service
     logging.info("Initializing Planner Service...")
     planner_service = PlannerService(
-        llm=llm,
+        llm=llm_for("planner"),
         prompt_builder=get(game=game, name="planner"),
         parser=JSParser(),
+        # PLANNER_CANDIDATES=N asks for N programs at once and executes only the best-ranked one
+        candidates=int(os.getenv("PLANNER_CANDIDATES", "1")),
     )
     logging.info("Planner Service initialized.")
 
     # critic service
     logging.info("Initializing Critic Service...")
+    # An identical critique prompt gets the stored verdict back without an LLM call.
+    # Same file and namespace the "critic_verdicts" collection used, so stored verdicts carry over.
+    critic_verdicts = SqliteKeyValueStore("ckpt/vectordb/kv.sqlite3", namespace="critic_verdicts")
     critic_service = CriticService(
-        llm=llm,
+        llm=llm_for("critic"),
         prompt_builder=get(game=game, name="critic"),
         parser=CriticParser(),
+        verdict_cache=critic_verdicts,
     )
     logging.info("Critic Service initialized.")
 
     # skill service
-    logging.info("Initializing ChromaDatabase for SkillService...")
-    skill_db = ChromaDatabase(collection_name="skill_library", embedding_model=embeddings, score_threshold=0.6)
-    logging.info("ChromaDatabase for SkillService initialized.")
+    logging.info(f"Initializing {backend.__name__} for SkillService...")
+    skill_db = vector_db(collection_name="skill_library", embedding_model=embeddings, score_threshold=0.6)
+    logging.info(f"{backend.__name__} for SkillService initialized.")
     
     logging.info("Initializing Skill Service...")
     skill_service = SkillService(
-        llm=llm,
+        llm=llm_for("skill_description"),
         prompt_builder=get(game=game, name="skill_description"),
         database=skill_db,
     )
     logging.info("Skill Service initialized.")
 
+    # pre-flight validation
+    # PREFLIGHT=0 sends every generated program to the environment unchecked
+    preflight = None
+    if os.getenv("PREFLIGHT", "1") == "1":
+        logging.info("Initializing pre-flight validator...")
+        preflight = PreflightValidator(names=load_minecraft_names("1.18.1"), syntax_checker=NodeSyntaxChecker())
+        logging.info("Pre-flight validator initialized.")
+
+    logging.info("--- Shared services built ---")
+
+    return SharedServices(
+        llm_for=llm_for,
+        qa_db=qa_db,
+        skill_service=skill_service,
+        planner_service=planner_service,
+        critic_service=critic_service,
+        preflight=preflight,
+        skill_db=skill_db,
+    )
+
+
+def build_agent(
+    game: str,
+    shared: Optional[SharedServices] = None,
+    agent_id: str = "bot",
+    mineflayer_port: int = MINEFLAYER_BASE_PORT,
+    fresh_library: Optional[bool] = None,
+) -> AgentController:
+    """
+    Build one agent driving the bot `agent_id` through the Mineflayer server on `mineflayer_port`.
+    Agents built from the same `shared` services share quotas, caches and the skill library;
+    the QA and curriculum state is their own.
+    """
+    logging.info(f"--- Starting to build agent {agent_id} ---")
+    if shared is None:
+        shared = build_shared_services(game)
+
+    logging.info("Initializing QA Service...")
+    qa_service = QAService(
+        llm=shared.llm_for("qa"),
+        question_prompt_builder=get(game=game, name="qa_question"),
+        answer_prompt_builder=get(game=game, name="qa_answer"),
+        parser=QAQuestionParser(),
+        database=shared.qa_db,
+        batch_answer_prompt_builder=get(game=game, name="qa_answer_batch"),
+        answer_parser=QAAnswerParser(),
+    )
+    logging.info("QA Service initialized.")
+
+    # Curriculum Service
+    logging.info("Initializing Curriculum Service...")
+    curriculum_service = CurriculumService(
+        llm=shared.llm_for("curriculum"),
+        qa_service=qa_service,
+        prompt_builder=get(game=game, name="curriculum"),
+        parser=TaskParser()
+    )
+    logging.info("Curriculum Service initialized.")
+
     # Game Environment adapter
     logging.info("Initializing Game Environment...")
     script_path = Path(__file__).parent.parent / Path("infrastructure/adapters/game/minecraft/mineflayer_server/index.js")
     env = MineflayerEnvironment(
-        api_client=MineflayerAPIClient(host="localhost", port=3000, timeout=10*60),
+        api_client=MineflayerAPIClient(host="localhost", port=mineflayer_port, timeout=10*60),
         process_manager=MineflayerProcessManager(
             script_path=script_path,
             logger=logging.getLogger(__name__)
@@ -97,13 +197,18 @@ def build_agent(game: str) -> AgentController:
     logging.info("Initializing AgentController...")
     agent_controller = AgentController(
         curriculum_service=curriculum_service,
-        skill_service=skill_service,
-        planner_service=planner_service,
-        critic_service=critic_service,
+        skill_service=shared.skill_service,
+        planner_service=shared.planner_service,
+        critic_service=shared.critic_service,
         env=env,
-        primitive_skill_dir="infrastructure/primitive_skill"
+        primitive_skill_dir="infrastructure/primitive_skill",
+        agent_id=agent_id,
+        preflight=shared.preflight,
+        # FRESH_LIBRARY=1 discards the skills learned by earlier runs
+        fresh_library=os.getenv("FRESH_LIBRARY", "0") == "1" if fresh_library is None else fresh_library,
+        speculative_curriculum=os.getenv("SPECULATIVE_CURRICULUM", "1") == "1",
     )
     logging.info("AgentController initialized.")
-    logging.info("--- Agent build complete ---")
+    logging.info(f"--- Agent {agent_id} build complete ---")
 
     return agent_controller
\ No newline at end of file
@@ -0,0 +1,84 @@
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+from domain.models import CodeSnippet, Task
+from domain.services import SkillService
+from infrastructure.metrics import STAGE_SECONDS
+
+
+class SkillIngestionWorker:
+    """
+    Describes, embeds and indexes successful programs in the background.
+
+    - `submit` returns as soon as the program is queued; it only waits when
+      `max_pending` programs are already queued (backpressure on the run loop).
+    - Describing and adding are timed as the `describe_skill` / `add_skill`
+      stages of `agent_id`.
+    - Programs are deduplicated by function name: resubmitting a name that is
+      still queued replaces its code instead of queueing a second description.
+    - `flush` waits for everything queued so far; `stop` flushes, then ends the worker.
+    """
+
+    def __init__(self, skill_service: SkillService, max_pending: int = 32, agent_id: str = "bot"):
+        self._skill_service = skill_service
+        self._agent_id = agent_id
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=max_pending)
+        self._pending: Dict[str, Tuple[CodeSnippet, Optional[Task]]] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self.ingested = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def start(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def submit(self, code_snippet: CodeSnippet, task: Optional[Task] = None) -> None:
+        name = code_snippet.function_name
+        queued = name in self._pending
+        self._pending[name] = (code_snippet, task)
+        if queued:
+            logging.info(f"Skill '{name}' is already queued; replacing its code.")
+            return
+        await self._queue.put(name)
+
+    async def flush(self) -> None:
+        """Wait until every queued program is in the skill library."""
+        if self._worker is None or self._worker.done():
+            if self._pending:
+                logging.warning(f"Skill ingestion worker is not running; {len(self._pending)} skills left unindexed.")
+            return
+        await self._queue.join()
+
+    async def stop(self) -> None:
+        await self.flush()
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self) -> None:
+        while True:
+            name = await self._queue.get()
+            try:
+                code_snippet, task = self._pending.pop(name)
+                with STAGE_SECONDS.time(self._agent_id, "describe_skill"):
+                    skill = await self._skill_service.describe_skill(code=code_snippet)
+                with STAGE_SECONDS.time(self._agent_id, "add_skill"):
+                    await self._skill_service.add_skill(skill, task=task)
+                self.ingested += 1
+                logging.info(f"Skill '{name}' added to the skill library.")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Failed to add skill '{name}': {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
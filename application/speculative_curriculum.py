@@ -0,0 +1,73 @@
+import asyncio
+import logging
+from typing import List, Optional
+
+from domain.models import Observation, Task
+from domain.services import CurriculumService
+from domain.services.curriculum import observation_similarity
+
+
+class SpeculativeCurriculum:
+    """
+    Runs the curriculum's QA phase while the environment executes a step.
+
+    - `speculate(observation)` starts `gather_qa` on the pre-step observation in
+      the background, unless a speculation on a similar observation is already
+      running or finished (so repeated attempts reuse it).
+    - `next_task(observation)` reuses the speculated QA pairs when the post-step
+      observation is at least `min_similarity` alike (see `observation_similarity`),
+      and otherwise discards them and runs the QA phase afresh.
+
+    The speculated questions see the task history as it was before the step,
+    i.e. without the outcome of the task being attempted.
+    """
+
+    def __init__(self, curriculum_service: CurriculumService, min_similarity: float = 0.8):
+        self._curriculum_service = curriculum_service
+        self._min_similarity = min_similarity
+        self._observation: Optional[Observation] = None
+        self._pending: Optional[asyncio.Task] = None
+        self.reused = 0
+        self.discarded = 0
+
+    def speculate(self, observation: Observation) -> None:
+        if self._pending is not None and self._usable_for(observation):
+            return
+        self.cancel()
+        self._observation = observation.copy()
+        self._pending = asyncio.create_task(self._curriculum_service.gather_qa(self._observation))
+
+    async def next_task(self, observation: Observation) -> Task:
+        qa_pairs = await self._take(observation)
+        return await self._curriculum_service.get_next_task(observation, qa_pairs=qa_pairs)
+
+    def cancel(self) -> None:
+        if self._pending is not None:
+            self._pending.cancel()
+        self._pending = None
+        self._observation = None
+
+    def _usable_for(self, observation: Observation) -> bool:
+        if self._pending.done() and (self._pending.cancelled() or self._pending.exception() is not None):
+            return False
+        return observation_similarity(self._observation, observation) >= self._min_similarity
+
+    async def _take(self, observation: Observation) -> Optional[List[tuple[str, str]]]:
+        """The speculated QA pairs if still valid for `observation`, else None."""
+        if self._pending is None:
+            return None
+        pending, usable = self._pending, self._usable_for(observation)
+        self._pending, self._observation = None, None
+        if not usable:
+            pending.cancel()
+            self.discarded += 1
+            logging.info("Observation changed during the step; discarding the speculated curriculum QA.")
+            return None
+        try:
+            qa_pairs = await pending
+        except Exception as e:
+            logging.warning(f"Speculated curriculum QA failed: {e!r}")
+            return None
+        self.reused += 1
+        logging.info("Reusing the curriculum QA gathered during the step.")
+        return qa_pairs
@@ -0,0 +1,142 @@
+"""
+Task throughput of an `AgentPool` with 1..N agents against stub environments.
+
+Every agent is a real `AgentController` (curriculum, planner, critic, skill
+library); only the game and the model are fakes. Steps sleep `--step` seconds,
+every LLM call answers after `--delay` seconds, and all agents share one quota
+of `--rpm` requests per minute, one embedding model and one skill library,
+as they do under `main.py`.
+
+    python -m benchmarks.agent_pool [--agents 1 2 4 8] [--duration 20] [--step 2] [--delay 0.5] [--rpm 600]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import io
+import itertools
+import tempfile
+
+from application.agent_controller import AgentController
+from application.agent_pool import AgentPool
+from benchmarks.curriculum_latency import _observation
+from benchmarks.stubs import FixedDelayLLM, HashEmbeddings
+from domain.ports import GameEnvironmentPort
+from domain.services import CriticService, CurriculumService, PlannerService, QAService, SkillService
+from infrastructure.adapters.database import NumpyVectorDatabase
+from infrastructure.adapters.llm import QuotaScheduler
+from infrastructure.parsers import CriticParser, JSParser, QAQuestionParser, TaskParser
+from infrastructure.prompts.registry import get
+
+
+class StubEnvironment(GameEnvironmentPort):
+    """Every step takes `delay` seconds and leaves the world as it was."""
+
+    def __init__(self, delay: float):
+        self._delay = delay
+
+    async def reset(self, options=None):
+        return _observation()
+
+    async def step(self, code_snippet, helper_functions):
+        await asyncio.sleep(self._delay)
+        return _observation()
+
+    async def close(self) -> None:
+        pass
+
+
+def _responder():
+    tasks = itertools.count(1)
+
+    def respond(messages) -> str:
+        system = messages[0].content
+        if "asks questions" in system:
+            return "Reasoning: ...\nQuestion 1: How to obtain wood?\nConcept 1: wood"
+        if "answer my question" in system:
+            return "Answer: Mine it."
+        if "writes Mineflayer javascript code" in system:
+            return "Explain: ...\nPlan: ...\nCode:\n```javascript\nasync function mineWoodLog(bot) {\n  await mineBlock(bot, 'oak_log', 1);\n}\n```"
+        if "assesses my progress" in system:
+            return '{"reasoning": "...", "success": true, "critique": ""}'
+        if "writes a description" in system:
+            return "Mine one oak log from a nearby tree."
+        return f"Reasoning: ...\nTask: Mine {next(tasks)} wood log"
+    return respond
+
+
+def _pool(args, persist_dir: str) -> tuple[AgentPool, FixedDelayLLM]:
+    llm = FixedDelayLLM(_responder(), delay=args.delay)
+    scheduler = QuotaScheduler(requests_per_minute=args.rpm, tokens_per_minute=10_000_000)
+    skill_service = SkillService(
+        llm=scheduler.bind(llm, "skill_description"),
+        prompt_builder=get(game="minecraft", name="skill_description"),
+        database=NumpyVectorDatabase("skill_library", HashEmbeddings(), persist_dir=persist_dir),
+    )
+    planner_service = PlannerService(
+        llm=scheduler.bind(llm, "planner"), prompt_builder=get(game="minecraft", name="planner"), parser=JSParser(),
+    )
+    critic_service = CriticService(
+        llm=scheduler.bind(llm, "critic"), prompt_builder=get(game="minecraft", name="critic"), parser=CriticParser(),
+    )
+
+    def build(agent_id: str, port: int) -> AgentController:
+        qa_service = QAService(
+            llm=scheduler.bind(llm, "qa"),
+            question_prompt_builder=get(game="minecraft", name="qa_question"),
+            answer_prompt_builder=get(game="minecraft", name="qa_answer"),
+            parser=QAQuestionParser(),
+            database=None,
+        )
+        curriculum_service = CurriculumService(
+            llm=scheduler.bind(llm, "curriculum"),
+            qa_service=qa_service,
+            prompt_builder=get(game="minecraft", name="curriculum"),
+            parser=TaskParser(),
+        )
+        return AgentController(
+            curriculum_service=curriculum_service,
+            skill_service=skill_service,
+            planner_service=planner_service,
+            critic_service=critic_service,
+            env=StubEnvironment(args.step),
+            agent_id=agent_id,
+        )
+
+    return AgentPool(build), llm
+
+
+async def _run(args, n_agents: int) -> tuple[int, int]:
+    with tempfile.TemporaryDirectory() as persist_dir:
+        pool, llm = _pool(args, persist_dir)
+        agents = [pool.start(f"bot{i}") for i in range(n_agents)]
+        await asyncio.sleep(args.duration)
+        completed = sum(len(agent._curriculum_service.get_completed_tasks()) for agent in agents)
+        await pool.stop_all()
+        return completed, llm.calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--agents", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--duration", type=float, default=20.0, help="wall-clock seconds per pool size")
+    parser.add_argument("--step", type=float, default=2.0, help="environment step duration (s)")
+    parser.add_argument("--delay", type=float, default=0.5, help="fake LLM latency per call (s)")
+    parser.add_argument("--rpm", type=float, default=600, help="shared LLM requests per minute")
+    args = parser.parse_args()
+
+    print(f"{args.duration:.0f}s per run, step {args.step}s, LLM {args.delay}s/call, shared quota {args.rpm:.0f} rpm")
+    print(f"{'agents':>6} | {'tasks':>5} | {'tasks/min':>9} | {'speedup':>7} | {'LLM calls':>9}")
+    baseline = None
+    for n_agents in args.agents:
+        with contextlib.redirect_stdout(io.StringIO()):  # controllers and parsers print progress
+            completed, calls = asyncio.run(_run(args, n_agents))
+        per_minute = completed * 60 / args.duration
+        baseline = baseline or per_minute or None
+        speedup = f"{per_minute / baseline:>6.1f}x" if baseline else "      -"
+        print(f"{n_agents:>6} | {completed:>5} | {per_minute:>9.1f} | {speedup} | {calls:>9}")
+
+
+if __name__ == "__main__":
+    main()
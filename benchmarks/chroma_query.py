@@ -0,0 +1,72 @@
+"""
+Latency of `ChromaDatabase.query` on a persisted library of `--skills` skills.
+
+"before" replays the old per-query sequence (list_collections -> get_collection
+-> count -> similarity search, each its own `to_thread` hop); "after" is the
+current `query`, a single vector search. Embeddings are `HashEmbeddings`, so the
+numbers measure Chroma and the event-loop hops only.
+
+    python -m benchmarks.chroma_query [--skills 10000] [--queries 200]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill
+from infrastructure.adapters.database import ChromaDatabase
+
+WORDS = "mine craft smelt place kill wood log stone iron gold coal pickaxe axe sword furnace chest table plank stick torch".split()
+
+
+def _skill(i: int) -> Skill:
+    words = [WORDS[(i * k) % len(WORDS)] for k in (1, 3, 7, 11)]
+    return Skill(name=f"skill{i}", code=f"async function skill{i}(bot) {{}}", description=" ".join(words) + f" variant {i}")
+
+
+async def _old_query(db: ChromaDatabase, query: str):
+    """The query path before the collection handle and count were cached."""
+    collections = await asyncio.to_thread(db._client.list_collections)
+    if not any(c.name == db._collection_name for c in collections):
+        return []
+    collection = await asyncio.to_thread(db._client.get_collection, name=db._collection_name)
+    if await asyncio.to_thread(collection.count) == 0:
+        return []
+    return await asyncio.to_thread(db._vectorstore.similarity_search_with_score, query, k=db._retrieval_top_k)
+
+
+async def _run(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db = ChromaDatabase("bench_skills", HashEmbeddings(), persist_dir=tmp, score_threshold=2.0)
+        skills = [_skill(i) for i in range(args.skills)]
+        for start in range(0, len(skills), 1000):
+            await db.add(skills[start:start + 1000])
+        queries = [f"{WORDS[i % len(WORDS)]} {WORDS[(i * 5) % len(WORDS)]}" for i in range(args.queries)]
+
+        print(f"{args.skills} skills, {args.queries} queries")
+        print(f"{'path':>7} | {'mean (ms)':>9} | {'p95 (ms)':>8}")
+        for name, run in (("before", lambda q: _old_query(db, q)), ("after", db.query)):
+            await run(queries[0])  # warm-up
+            latencies = []
+            for query in queries:
+                start = time.perf_counter()
+                await run(query)
+                latencies.append((time.perf_counter() - start) * 1000)
+            latencies.sort()
+            p95 = latencies[int(0.95 * len(latencies)) - 1]
+            print(f"{name:>7} | {statistics.mean(latencies):>9.2f} | {p95:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--skills", type=int, default=10_000)
+    parser.add_argument("--queries", type=int, default=200)
+    asyncio.run(_run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
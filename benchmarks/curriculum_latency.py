@@ -0,0 +1,86 @@
+"""
+End-to-end latency of `CurriculumService.get_next_task` with a fixed-delay fake LLM.
+
+Compares the old sequential QA loop (one answer in flight), the concurrent
+fan-out and the single-call batched mode.
+
+    python -m benchmarks.curriculum_latency [--delay 0.5] [--questions 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+
+from benchmarks.stubs import FixedDelayLLM
+from domain.models import Observation
+from domain.services import CurriculumService, QAService
+from infrastructure.parsers import QAAnswerParser, QAQuestionParser, TaskParser
+from infrastructure.prompts.registry import get
+
+
+def _responder(n_questions: int):
+    def respond(messages) -> str:
+        system = messages[0].content
+        if "asks questions" in system:
+            return "Reasoning: ...\n" + "\n".join(
+                f"Question {i}: How to obtain item {i}?\nConcept {i}: item {i}" for i in range(1, n_questions + 1)
+            )
+        if "Answer <number>" in system:
+            return "\n".join(f"Answer {i}: Mine it." for i in range(1, n_questions + 1))
+        if "answer my question" in system:
+            return "Answer: Mine it."
+        return "Reasoning: ...\nTask: Mine 1 wood log"
+    return respond
+
+
+def _observation() -> Observation:
+    return Observation(
+        biome="plains", time="day", nearby_blocks="grass_block, dirt", other_blocks="",
+        nearby_entities="cow", health="20.0/20", hunger="20.0/20", position={"x": 0, "y": 64, "z": 0},
+        equipment="", inventory="Inventory (0/36): Empty", chests={},
+    )
+
+
+async def _measure(delay: float, n_questions: int, **curriculum_kwargs) -> tuple[float, int]:
+    llm = FixedDelayLLM(_responder(n_questions), delay=delay)
+    qa_service = QAService(
+        llm=llm,
+        question_prompt_builder=get(game="minecraft", name="qa_question"),
+        answer_prompt_builder=get(game="minecraft", name="qa_answer"),
+        parser=QAQuestionParser(),
+        database=None,
+        batch_answer_prompt_builder=get(game="minecraft", name="qa_answer_batch"),
+        answer_parser=QAAnswerParser(),
+    )
+    curriculum = CurriculumService(
+        llm=llm,
+        qa_service=qa_service,
+        prompt_builder=get(game="minecraft", name="curriculum"),
+        parser=TaskParser(),
+        **curriculum_kwargs,
+    )
+    start = time.perf_counter()
+    await curriculum.get_next_task(_observation())
+    return time.perf_counter() - start, llm.calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.5, help="fake LLM latency per call (s)")
+    parser.add_argument("--questions", type=int, default=5)
+    args = parser.parse_args()
+
+    modes = {
+        "sequential": {"max_concurrent_answers": 1},
+        "concurrent": {"max_concurrent_answers": args.questions},
+        "batched": {"batch_answers": True},
+    }
+    print(f"{'mode':>10} | {'latency (s)':>11} | {'LLM calls':>9}")
+    for name, kwargs in modes.items():
+        elapsed, calls = asyncio.run(_measure(args.delay, args.questions, **kwargs))
+        print(f"{name:>10} | {elapsed:>11.2f} | {calls:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Throughput of `GeminiLLM` at 1, 8 and 32 concurrent calls against a local stand-in.
+
+The "threaded" column reproduces the old `asyncio.to_thread(invoke)` path with a
+blocking client, capped by a default-sized executor, for comparison.
+
+    python -m benchmarks.gemini_concurrency [--delay 0.2] [--calls 64]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+
+from benchmarks.stubs import GeminiStubServer
+from domain.models import Message
+from infrastructure.adapters.llm.gemini_llm import GeminiLLM
+
+MESSAGES = [Message(role="system", content="bench"), Message(role="user", content="ping")]
+
+
+async def _run_native(base_url: str, concurrency: int, calls: int) -> float:
+    async with httpx.AsyncClient() as client:
+        llm = GeminiLLM("bench", api_key="x", base_url=base_url, client=client, max_concurrency=concurrency)
+        start = time.perf_counter()
+        await asyncio.gather(*[llm.chat(MESSAGES) for _ in range(calls)])
+        return calls / (time.perf_counter() - start)
+
+
+async def _run_threaded(base_url: str, concurrency: int, calls: int, workers: int) -> float:
+    loop = asyncio.get_running_loop()
+    loop.set_default_executor(ThreadPoolExecutor(max_workers=workers))
+    semaphore = asyncio.Semaphore(concurrency)
+    url = f"{base_url}/v1beta/models/bench:generateContent"
+    with httpx.Client() as client:
+        async def one() -> None:
+            async with semaphore:
+                await asyncio.to_thread(client.post, url, json={"contents": []})
+
+        start = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(calls)])
+        return calls / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--delay", type=float, default=0.2, help="stand-in latency per call (s)")
+    parser.add_argument("--calls", type=int, default=64)
+    parser.add_argument("--workers", type=int, default=5, help="executor size for the threaded baseline")
+    args = parser.parse_args()
+
+    with GeminiStubServer(delay=args.delay) as server:
+        print(f"{'concurrency':>11} | {'native req/s':>12} | {'threaded req/s':>14}")
+        for concurrency in (1, 8, 32):
+            native = asyncio.run(_run_native(server.base_url, concurrency, args.calls))
+            threaded = asyncio.run(_run_threaded(server.base_url, concurrency, args.calls, args.workers))
+            print(f"{concurrency:>11} | {native:>12.1f} | {threaded:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Cost of the latency instrumentation: a stage span (`Histogram.time`), an
+`InstrumentedLLM` call and an `InstrumentedDatabase` lookup, each against the
+same work unwrapped.
+
+    python -m benchmarks.metrics_overhead [--iterations 200000]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import time
+from typing import Optional, Sequence
+
+from domain.models import Message
+from domain.ports.llm_port import LLMPort
+from infrastructure.adapters.database import InstrumentedDatabase
+from infrastructure.adapters.llm import InstrumentedLLM
+from infrastructure.metrics import Histogram
+
+
+class EchoLLM(LLMPort):
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        return messages[-1]
+
+
+class DictDatabase:
+    """Only the exact key/value side of `DatabasePort`, backed by a dict."""
+
+    def __init__(self):
+        self._items = {"key": "value"}
+
+    def lookup(self, key: str) -> Optional[str]:
+        return self._items.get(key)
+
+
+def _per_call(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+
+async def _per_await(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await fn()
+    return (time.perf_counter() - start) / iterations
+
+
+async def main(args) -> None:
+    n = args.iterations
+    histogram = Histogram("bench_seconds", "Benchmark.", ("agent", "stage"))
+
+    def span():
+        with histogram.time("bot", "planner"):
+            pass
+
+    messages = [Message("user", "q")]
+    llm = EchoLLM()
+    instrumented_llm = InstrumentedLLM(llm, "planner", Histogram("llm_seconds", "LLM.", ("service", "outcome")))
+    database = DictDatabase()
+    instrumented_db = InstrumentedDatabase(database, "bench", Histogram("db_seconds", "DB.", ("collection", "operation")))
+
+    rows = [
+        ("stage span", _per_call(span, n), _per_call(lambda: None, n)),
+        ("LLM chat", await _per_await(lambda: instrumented_llm.chat(messages), n), await _per_await(lambda: llm.chat(messages), n)),
+        ("db lookup", _per_call(lambda: instrumented_db.lookup("key"), n), _per_call(lambda: database.lookup("key"), n)),
+    ]
+    print(f"{'':<12}{'plain':>10}{'timed':>10}{'overhead':>10}")
+    for name, timed, plain in rows:
+        print(f"{name:<12}{plain * 1e6:>8.2f}us{timed * 1e6:>8.2f}us{(timed - plain) * 1e6:>8.2f}us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200_000)
+    asyncio.run(main(parser.parse_args()))
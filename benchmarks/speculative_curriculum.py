@@ -0,0 +1,99 @@
+"""
+Latency between tasks with and without the speculative curriculum.
+
+A fake environment sleeps `--step` seconds per step and, for a `--drift`
+fraction of steps, moves the agent to another biome (which invalidates the
+speculation). The fake LLM answers every call after `--delay` seconds. The
+reported gap is the time from the end of the final step to the next task.
+
+    python -m benchmarks.speculative_curriculum [--step 3] [--delay 0.5] [--tasks 10] [--drift 0.2]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from application.speculative_curriculum import SpeculativeCurriculum
+from benchmarks.curriculum_latency import _observation, _responder
+from benchmarks.stubs import FixedDelayLLM
+from domain.services import CurriculumService, QAService
+from infrastructure.parsers import QAQuestionParser, TaskParser
+from infrastructure.prompts.registry import get
+
+
+class ScriptedEnvironment:
+    """Steps take `delay` seconds; every `1 / drift`-th step ends in another biome."""
+
+    def __init__(self, delay: float, drift: float):
+        self._delay = delay
+        self._drift = drift
+        self._steps = 0
+
+    async def step(self, observation):
+        await asyncio.sleep(self._delay)
+        self._steps += 1
+        after = observation.copy()
+        if int(self._steps * self._drift) > int((self._steps - 1) * self._drift):
+            after.biome = "desert" if observation.biome != "desert" else "plains"
+        return after
+
+
+def _curriculum(delay: float, n_questions: int) -> tuple[CurriculumService, FixedDelayLLM]:
+    llm = FixedDelayLLM(_responder(n_questions), delay=delay)
+    qa_service = QAService(
+        llm=llm,
+        question_prompt_builder=get(game="minecraft", name="qa_question"),
+        answer_prompt_builder=get(game="minecraft", name="qa_answer"),
+        parser=QAQuestionParser(),
+        database=None,
+    )
+    curriculum = CurriculumService(
+        llm=llm,
+        qa_service=qa_service,
+        prompt_builder=get(game="minecraft", name="curriculum"),
+        parser=TaskParser(),
+        max_concurrent_answers=n_questions,
+    )
+    return curriculum, llm
+
+
+async def _run(args, speculative: bool) -> tuple[list[float], int, SpeculativeCurriculum | None]:
+    curriculum, llm = _curriculum(args.delay, args.questions)
+    speculation = SpeculativeCurriculum(curriculum) if speculative else None
+    env = ScriptedEnvironment(args.step, args.drift)
+    observation = _observation()
+    gaps = []
+    for _ in range(args.tasks):
+        if speculation is not None:
+            speculation.speculate(observation)
+        observation = await env.step(observation)
+        start = time.perf_counter()
+        if speculation is not None:
+            await speculation.next_task(observation)
+        else:
+            await curriculum.get_next_task(observation)
+        gaps.append(time.perf_counter() - start)
+    return gaps, llm.calls, speculation
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--step", type=float, default=3.0, help="environment step duration (s)")
+    parser.add_argument("--delay", type=float, default=0.5, help="fake LLM latency per call (s)")
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--tasks", type=int, default=10)
+    parser.add_argument("--drift", type=float, default=0.2, help="fraction of steps that change the biome")
+    args = parser.parse_args()
+
+    print(f"step {args.step}s, LLM {args.delay}s/call, {args.tasks} tasks, drift {args.drift:.0%}")
+    print(f"{'mode':>11} | {'mean gap (s)':>12} | {'max gap (s)':>11} | {'LLM calls':>9} | reused/discarded")
+    for name, speculative in (("sequential", False), ("speculative", True)):
+        gaps, calls, speculation = asyncio.run(_run(args, speculative))
+        outcome = f"{speculation.reused}/{speculation.discarded}" if speculation else "-"
+        print(f"{name:>11} | {statistics.mean(gaps):>12.2f} | {max(gaps):>11.2f} | {calls:>9} | {outcome}")
+
+
+if __name__ == "__main__":
+    main()
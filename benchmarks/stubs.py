@@ -0,0 +1,138 @@
+"""
+Stand-in servers and fakes shared by the benchmark scripts.
+
+Nothing in here talks to a real provider; every delay is scripted so that runs
+are comparable across machines.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from domain.models import Message
+from domain.ports import LLMPort
+
+
+class _GeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(self.server.delay)
+        payload = json.dumps({
+            "candidates": [{"content": {"role": "model", "parts": [{"text": "ok"}]}}]
+        }).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class _StubHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+
+class GeminiStubServer:
+    """Threaded HTTP server answering `generateContent` after a fixed delay."""
+
+    def __init__(self, delay: float = 0.2):
+        self._server = _StubHTTPServer(("127.0.0.1", 0), _GeminiHandler)
+        self._server.delay = delay
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def __enter__(self) -> "GeminiStubServer":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class FixedDelayLLM(LLMPort):
+    """Fake LLM that sleeps `delay` seconds and answers with `respond(messages)`."""
+
+    def __init__(self, respond: Callable[[Sequence[Message]], str], delay: float = 0.5):
+        self._respond = respond
+        self._delay = delay
+        self.calls = 0
+        self.temperatures: List[Optional[float]] = []
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        self.calls += 1
+        self.temperatures.append(temperature)
+        await asyncio.sleep(self._delay)
+        return Message(role="assistant", content=self._respond(messages))
+
+
+class HashEmbeddings(Embeddings):
+    """
+    Deterministic bag-of-words embeddings: every word is hashed into one of `dim`
+    buckets and the counts are L2-normalised. Texts sharing words are close in
+    cosine distance, which is enough to exercise retrieval without a model.
+    """
+
+    def __init__(self, dim: int = 256):
+        self._dim = dim
+        self.calls = 0
+        self.texts = 0
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self._dim
+        for word in text.lower().split():
+            bucket = int.from_bytes(hashlib.md5(word.encode("utf-8")).digest()[:4], "little") % self._dim
+            vector[bucket] += 1.0
+        norm = sum(v * v for v in vector) ** 0.5 or 1.0
+        return [v / norm for v in vector]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.texts += len(texts)
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        self.calls += 1
+        self.texts += 1
+        return self._embed(text)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Batched query embedding, one call per batch like a provider's bulk endpoint."""
+        self.calls += 1
+        self.texts += len(texts)
+        return [self._embed(text) for text in texts]
+
+
+class RandomEmbeddings(Embeddings):
+    """Gaussian unit vectors seeded by the text, so the same text always maps to the same vector."""
+
+    def __init__(self, dim: int = 384):
+        self._dim = dim
+
+    def _embed(self, text: str) -> List[float]:
+        seed = int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self._dim).astype(np.float32)
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
@@ -0,0 +1,76 @@
+"""
+Tail latency of `ResilientLLM` hedging against a fake LLM with a heavy-tailed delay.
+
+Most calls take ~`--fast` seconds, but `--slow-rate` of them stall for `--slow`
+seconds (a stuck connection / overloaded replica). Each mode makes `--calls`
+sequential calls and reports p50/p95/p99 and the number of LLM requests sent.
+
+    python -m benchmarks.tail_latency [--calls 300] [--fast 0.02] [--slow 1.0] [--slow-rate 0.08]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Optional, Sequence
+
+from domain.models import Message
+from domain.ports.llm_port import LLMPort
+from infrastructure.adapters.llm import LatencyTracker, ResilientLLM
+
+
+class HeavyTailLLM(LLMPort):
+    """Fake LLM whose delay is lognormal around `fast`, with `slow_rate` of calls stalling for `slow`."""
+
+    def __init__(self, fast: float, slow: float, slow_rate: float, seed: int = 0):
+        self._fast = fast
+        self._slow = slow
+        self._slow_rate = slow_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        self.calls += 1
+        if self._rng.random() < self._slow_rate:
+            delay = self._slow
+        else:
+            delay = self._fast * self._rng.lognormvariate(0, 0.25)
+        await asyncio.sleep(delay)
+        return Message(role="assistant", content="ok")
+
+
+async def _measure(args, **resilient_kwargs) -> tuple[dict, int]:
+    llm = HeavyTailLLM(args.fast, args.slow, args.slow_rate)
+    resilient = ResilientLLM(llm, service="benchmark", **resilient_kwargs)
+    observed = LatencyTracker(window=args.calls)
+    for _ in range(args.calls):
+        start = time.perf_counter()
+        await resilient.chat([Message(role="user", content="q")])
+        observed.record(time.perf_counter() - start)
+    return observed.snapshot(), llm.calls
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--calls", type=int, default=300)
+    parser.add_argument("--fast", type=float, default=0.02, help="typical latency (s)")
+    parser.add_argument("--slow", type=float, default=1.0, help="stalled-call latency (s)")
+    parser.add_argument("--slow-rate", type=float, default=0.08, help="fraction of stalled calls")
+    args = parser.parse_args()
+
+    modes = {
+        "plain": {},
+        "hedged": {"hedge": True, "hedge_min_samples": 20},
+    }
+    print(f"{'mode':>7} | {'p50 (ms)':>8} | {'p95 (ms)':>8} | {'p99 (ms)':>8} | {'requests':>8}")
+    for name, kwargs in modes.items():
+        snapshot, requests = asyncio.run(_measure(args, **kwargs))
+        print(
+            f"{name:>7} | {snapshot['p50'] * 1000:>8.1f} | {snapshot['p95'] * 1000:>8.1f} | "
+            f"{snapshot['p99'] * 1000:>8.1f} | {requests:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Recall@k and query latency of `NumpyVectorDatabase` vs `ChromaDatabase`.
+
+Skills get `RandomEmbeddings` vectors; ground truth is an exact brute-force
+cosine top-k over the same vectors. Latency is end-to-end `query()` time
+(embedding the query is a local hash + RNG draw, the same for both).
+
+    python -m benchmarks.vector_index [--sizes 1000 10000 100000] [--queries 100] [--k 5]
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.stubs import RandomEmbeddings
+from domain.models import Skill
+from infrastructure.adapters.database import ChromaDatabase, NumpyVectorDatabase
+
+
+async def _fill(db, skills, batch: int = 5000) -> float:
+    start = time.perf_counter()
+    for i in range(0, len(skills), batch):
+        await db.add(skills[i:i + batch])
+    return time.perf_counter() - start
+
+
+async def _measure(db, queries, truth) -> tuple[float, float, float]:
+    await db.query(queries[0])  # warm-up
+    latencies, hits = [], 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        skills = await db.query(query)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len({skill.name for skill in skills} & expected)
+    latencies.sort()
+    recall = hits / sum(len(expected) for expected in truth)
+    return recall, statistics.mean(latencies), latencies[int(0.95 * len(latencies)) - 1]
+
+
+async def _run(size: int, n_queries: int, k: int, embeddings: RandomEmbeddings) -> None:
+    skills = [Skill(name=f"skill{i}", code="", description=f"skill description {i}") for i in range(size)]
+    queries = [f"task {i}" for i in range(n_queries)]
+
+    matrix = np.asarray(embeddings.embed_documents([s.description for s in skills]), dtype=np.float32)
+    truth = []
+    for query in queries:
+        similarities = matrix @ np.asarray(embeddings.embed_query(query), dtype=np.float32)
+        truth.append({skills[i].name for i in np.argsort(-similarities)[:k]})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, backend in (("chroma", ChromaDatabase), ("numpy", NumpyVectorDatabase)):
+            # threshold 2.0 = keep every hit; recall is about ranking
+            db = backend("bench_skills", embeddings, persist_dir=f"{tmp}/{name}", score_threshold=2.0, retrieval_top_k=k)
+            build = await _fill(db, skills)
+            recall, mean, p95 = await _measure(db, queries, truth)
+            print(f"{size:>7} | {name:>6} | {build:>9.1f} | {recall:>8.3f} | {mean:>9.2f} | {p95:>8.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    embeddings = RandomEmbeddings(args.dim)
+    print(f"{'skills':>7} | {'index':>6} | {'build (s)':>9} | {'recall@' + str(args.k):>8} | {'mean (ms)':>9} | {'p95 (ms)':>8}")
+    for size in args.sizes:
+        asyncio.run(_run(size, args.queries, args.k, embeddings))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,25 @@
+from typing import Optional
+
 class PlanningError(Exception):
     pass
 
 class LLMError(Exception):
     pass
 
+class TransientLLMError(LLMError):
+    """A failure worth retrying: network errors, provider 5xx, timeouts."""
+    pass
+
+class LLMTimeoutError(TransientLLMError):
+    pass
+
+class RateLimitError(TransientLLMError):
+    """Raised when the LLM provider rejects a call for exceeding its quota (HTTP 429)."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 class ParserError(Exception):
     pass
 
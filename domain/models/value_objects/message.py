@@ -1,9 +1,25 @@
-from dataclasses import dataclass
+import hashlib
+from dataclasses import dataclass, field
+from typing import Optional
 
 @dataclass
 class Message:
     role: str  # "system" or "user" or "assistant"
     content: str
+    # Number of leading characters of `content` that are identical across calls
+    # (templates, fixed docs). Adapters may cache this prefix provider-side.
+    prefix_len: int = field(default=0, compare=False)
+
+    @property
+    def prefix(self) -> str:
+        return self.content[:self.prefix_len]
+
+    @property
+    def prefix_hash(self) -> Optional[str]:
+        """Content hash identifying the static prefix, or None when there is none."""
+        if self.prefix_len <= 0:
+            return None
+        return hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()
 
     def __str__(self):
         return f"[{self.role}]\n{self.content}"
@@ -1,8 +1,9 @@
 from .llm_port import LLMPort
 from .parser_port import ParserPort
 from .prompt_builder_port import PromptBuilderPort
-from .database_port import DatabasePort
+from .database_port import DatabasePort, KeyValuePort
 from .executor_port import ExecutorPort
 from .game_environment_port import GameEnvironmentPort
+from .syntax_checker_port import SyntaxCheckerPort
 
-__all__ = ["LLMPort", "ParserPort", "PromptBuilderPort", "DatabasePort", "ExecutorPort", "GameEnvironmentPort"]
\ No newline at end of file
+__all__ = ["LLMPort", "ParserPort", "PromptBuilderPort", "DatabasePort", "KeyValuePort", "ExecutorPort", "GameEnvironmentPort", "SyntaxCheckerPort"]
\ No newline at end of file
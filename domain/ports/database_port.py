@@ -4,33 +4,56 @@ from typing import Sequence
 from domain.models import Skill
 
 
-class DatabasePort(ABC):
+class KeyValuePort(ABC):
     """
-    Hexagonal *outbound* port for persisting data.
+    Hexagonal *outbound* port for an exact-match key/value store.
+    """
+    @abstractmethod
+    def lookup(self, key: str) -> str | None:
+        """If the key is in the database, return the value. If not, return None. Must be cheap (no embedding)."""
+
+    @abstractmethod
+    def store(self, key: str, value: str) -> None:
+        """Store `value` under `key`, replacing any previous value."""
+
+
+class DatabasePort(KeyValuePort):
+    """
+    Hexagonal *outbound* port for persisting data; `lookup` / `store` are its exact key/value side.
     """
     # ---------- Count ----------
     @abstractmethod
     def count(self) -> int:
         """Return the number of items in the database."""
 
-    # ---------- Query ----------
     @abstractmethod
-    def lookup(self, key: str) -> str | None:
-        """If the key is in the database, return the value. If not, return None."""
+    async def add(self, documents: Sequence[Skill]):
+        pass
 
-    # ---------- Command ----------
+    # ---------- Semantic key/value ----------
     @abstractmethod
-    def store(self, key: str, value: str) -> None:
-        """Store a new query in the database."""
+    async def semantic_lookup(self, key: str, max_distance: float | None = None) -> str | None:
+        """Return the value stored under the nearest key within `max_distance` (cosine), or None."""
 
     @abstractmethod
-    async def add(self, documents: Sequence[Skill]):
-        pass
+    async def semantic_store(self, key: str, value: str) -> None:
+        """Embed the key and store the value alongside it."""
 
     @abstractmethod
-    async def query(self, query: str) -> Sequence[Skill]:
-        pass
+    async def query(self, query: str, max_distance: float | None = None) -> Sequence[Skill]:
+        """Nearest skills first, within `max_distance` (cosine; the backend's threshold by default)."""
+
+    @abstractmethod
+    async def get_all(self) -> Sequence[Skill]:
+        """Every stored skill (documents added with `add`) that passes the backend's integrity check."""
+
+    async def query_many(self, queries: Sequence[str]) -> Sequence[Sequence[Skill]]:
+        """Results of `query` for each of `queries`, in order. Backends batch the embeddings and the search."""
+        return [await self.query(query) for query in queries]
 
     @abstractmethod
     async def clear(self) -> None:
         pass
+
+    async def compact(self) -> None:
+        """Fold buffered writes into the persisted form so the next start loads it directly. A no-op by default."""
@@ -1,9 +1,34 @@
 from abc import ABC, abstractmethod
-from typing import Sequence
+from typing import AsyncIterator, Optional, Sequence
 from domain.models import Message
 
 class LLMPort(ABC):
-    """Hexagonal *outbound* port for any chat-style LLM."""
+    """
+    Hexagonal *outbound* port for any chat-style LLM.
+
+    `temperature=None` leaves sampling to the model's default.
+    """
+
+    # True when `chat_stream` yields tokens as they are generated
+    supports_streaming: bool = False
+
     @abstractmethod
-    async def chat(self, messages: Sequence[Message]) -> Message:
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
         pass
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """
+        Yield the reply in chunks. Closing the iterator early cancels the rest
+        of the generation. Adapters without native streaming yield the whole
+        reply at once.
+        """
+        response = await self.chat(messages, **sampling(temperature))
+        yield response.content
+
+
+def sampling(temperature: Optional[float]) -> dict:
+    """
+    Keyword arguments passing `temperature` on to a wrapped `LLMPort`; empty
+    when unset, so adapters without the parameter keep working.
+    """
+    return {} if temperature is None else {"temperature": temperature}
@@ -1,6 +1,6 @@
 from __future__ import annotations
 from abc import abstractmethod
-from typing import List
+from typing import Any, List, Optional
 
 class ParserPort:
     """parse text into a list of objects"""
@@ -8,3 +8,16 @@ class ParserPort:
     @abstractmethod
     def parse(self, text: str) -> List[str]:
         pass
+
+    def incremental(self) -> Optional[IncrementalParserPort]:
+        """Return a parser for streamed replies, or None if the reply must be parsed whole."""
+        return None
+
+
+class IncrementalParserPort:
+    """parse a streamed reply chunk by chunk"""
+
+    @abstractmethod
+    def feed(self, chunk: str) -> Optional[Any]:
+        """Consume the next chunk; return the parsed result as soon as it is complete, else None."""
+        pass
@@ -8,6 +8,10 @@ SystemAndUserMsg = Tuple[Message, Message]
 class PromptBuilderPort(ABC):
     """
     Hexagonal *outbound* port for building any style of prompts.
+
+    The system message may mark its leading static segment with
+    `Message.prefix_len` (identified by `Message.prefix_hash`), which LLM
+    adapters can serve from a provider-side context cache.
     """
 
     @abstractmethod
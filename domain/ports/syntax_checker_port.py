@@ -0,0 +1,14 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+
+class SyntaxCheckerPort(ABC):
+    """Hexagonal *outbound* port that compiles, but never runs, a generated program."""
+
+    @abstractmethod
+    async def check(self, code: str) -> Optional[str]:
+        """The syntax error in `code`, or None when it compiles (or cannot be checked)."""
+        pass
+
+    async def close(self) -> None:
+        pass
@@ -3,5 +3,11 @@ from .qa import QAService
 from .curriculum import CurriculumService
 from .critic import CriticService
 from .planner import PlannerService
+from .lexical_index import BM25Index
+from .candidate_ranker import CandidateRanker, CandidateScore
+from .preflight import PreflightValidator
 
-__all__ = ["SkillService", "QAService", "CurriculumService", "CriticService", "PlannerService"]
+__all__ = [
+    "SkillService", "QAService", "CurriculumService", "CriticService", "PlannerService", "BM25Index",
+    "CandidateRanker", "CandidateScore", "PreflightValidator",
+]
@@ -0,0 +1,301 @@
+from __future__ import annotations
+import hashlib
+import re
+from functools import lru_cache
+from typing import Collection, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from ..models import Skill
+
+_COMMENT = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+_QUOTED = re.compile(r"'(?:\\.|[^'\\\n])*'|\"(?:\\.|[^\"\\\n])*\"")
+_TEMPLATE = re.compile(r"`(?:\\.|[^`\\])*`", re.DOTALL)
+_INTERPOLATION = re.compile(r"\$\{([^}]*)\}")
+_IDENTIFIER = re.compile(r"[A-Za-z_$][\w$]*")
+_FUNCTION = re.compile(r"\bfunction\s*\*?\s*([A-Za-z_$][\w$]*)\s*\(")
+_BINDING = re.compile(r"\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*(=\s*(?:async\s+)?(?:function\b|\([^)]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>))?")
+_DESTRUCTURING = re.compile(r"\b(?:const|let|var)\s*[{\[]([^}\]]*)[}\]]")
+_ARROW_PARAMETER = re.compile(r"(?<![\w$.])([A-Za-z_$][\w$]*)\s*=>")
+_AFTER_PARAMETERS = re.compile(r"\s*(=>|\{)")
+_HEAD = re.compile(r"([A-Za-z_$][\w$]*)\s*$")
+_CALL = re.compile(r"(?<![\w$.])([A-Za-z_$][\w$]*)\s*\(")
+_CONSTRUCTION = re.compile(r"\bnew\s+[A-Za-z_$][\w$.]*")
+_ENDLESS_LOOP = re.compile(r"\bwhile\s*\(\s*(?:true|1)\s*\)\s*\{|\bfor\s*\(\s*;\s*;\s*\)\s*\{")
+_LOOP_EXIT = re.compile(r"\b(?:break|return|throw)\b")
+_LITERAL = re.compile(r"(['\"`])([^'\"`\\$]*)\1")
+
+# keywords that can precede `(`; the first four head blocks that bind no parameters
+_BLOCK_KEYWORDS = frozenset({"if", "for", "while", "switch"})
+_KEYWORDS = _BLOCK_KEYWORDS | {
+    "catch", "function", "return", "typeof", "await", "async", "yield", "void", "delete", "in", "of",
+    "throw", "new", "super", "import", "else", "do", "case", "instanceof",
+}
+
+# callable without a definition in the program: keywords followed by `(`, JavaScript
+# globals and what the Mineflayer server puts in the evaluation sandbox
+JS_GLOBALS = _KEYWORDS | frozenset({
+    "Array", "Boolean", "Date", "Error", "JSON", "Map", "Math", "Number", "Object", "Promise", "RegExp", "Set", "String", "Symbol",
+    "parseInt", "parseFloat", "isNaN", "isFinite", "encodeURIComponent", "decodeURIComponent",
+    "require", "setTimeout", "clearTimeout", "setInterval", "clearInterval",
+    "Vec3", "Movements", "pathfinder",
+})
+
+
+def _strip(code: str) -> str:
+    """Drop comments and string contents; template literals keep only their `${...}` expressions."""
+    code = _COMMENT.sub(" ", code)
+    code = _QUOTED.sub("''", code)
+    return _TEMPLATE.sub(lambda m: " ".join(_INTERPOLATION.findall(m.group(0))) or "''", code)
+
+
+class _Scan(NamedTuple):
+    code: str
+    # top-level function names
+    declared: FrozenSet[str]
+    # name -> (start, end) ranges where a local binding of it is visible
+    scopes: Dict[str, Tuple[Tuple[int, int], ...]]
+    # positions of `(` opening a parameter list followed by a body, e.g. `name(a) {`
+    definitions: FrozenSet[int]
+
+    def is_bound(self, name: str, position: int) -> bool:
+        return any(start <= position <= end for start, end in self.scopes.get(name, ()))
+
+
+def _pairs(code: str, opening: str, closing: str) -> Dict[int, int]:
+    pairs, stack = {}, []
+    for i, c in enumerate(code):
+        if c == opening:
+            stack.append(i)
+        elif c == closing and stack:
+            pairs[stack.pop()] = i
+    return pairs
+
+
+def _body_end(code: str, start: int, braces: Dict[int, int]) -> int:
+    """End of the arrow-function body starting at `start`: its block, or its expression."""
+    while start < len(code) and code[start].isspace():
+        start += 1
+    if start < len(code) and code[start] == "{":
+        return braces.get(start, len(code))
+    depth = 0
+    for end in range(start, len(code)):
+        c = code[end]
+        if c in "([{":
+            depth += 1
+        elif c in ")]}":
+            if depth == 0:
+                return end
+            depth -= 1
+        elif c in ",;" and depth == 0:
+            return end
+    return len(code)
+
+
+@lru_cache(maxsize=4096)
+def _scan(code: str) -> _Scan:
+    """
+    A regex scan with brace matching, not a parser. `const`/`let`/`var`/`function`
+    inside a body are visible in their enclosing block; function, arrow and
+    `catch` parameters in their parameter list and body.
+    """
+    code = _strip(code)
+    braces, parens = _pairs(code, "{", "}"), _pairs(code, "(", ")")
+    enclosing: List[Optional[int]] = []
+    stack: List[int] = []
+    for i, c in enumerate(code):
+        enclosing.append(stack[-1] if stack else None)
+        if c == "{":
+            stack.append(i)
+        elif c == "}" and stack:
+            stack.pop()
+
+    declared: Set[str] = set()
+    scopes: Dict[str, List[Tuple[int, int]]] = {}
+    definitions: Set[int] = set()
+
+    def bind(names, start: int, end: int) -> None:
+        for name in names:
+            scopes.setdefault(name, []).append((start, end))
+
+    def block_of(position: int) -> Optional[Tuple[int, int]]:
+        opening = enclosing[position]
+        return None if opening is None else (opening, braces.get(opening, len(code)))
+
+    for match in _FUNCTION.finditer(code):
+        block = block_of(match.start())
+        if block is None:
+            declared.add(match.group(1))
+        else:
+            bind([match.group(1)], *block)
+    for match in _BINDING.finditer(code):
+        block = block_of(match.start())
+        if block is not None:
+            bind([match.group(1)], *block)
+        elif match.group(2):
+            declared.add(match.group(1))
+    for match in _DESTRUCTURING.finditer(code):
+        block = block_of(match.start())
+        if block is not None:
+            bind(_IDENTIFIER.findall(match.group(1)), *block)
+
+    for opening, closing in parens.items():
+        after = _AFTER_PARAMETERS.match(code, closing + 1)
+        if after is None:
+            continue
+        head = _HEAD.search(code, max(0, opening - 64), opening)
+        head = head.group(1) if head else None
+        if head in _BLOCK_KEYWORDS:
+            continue
+        if after.group(1) == "{":
+            end = braces.get(after.end() - 1, len(code))
+            if head not in _KEYWORDS:
+                definitions.add(opening)
+        else:
+            end = _body_end(code, after.end(), braces)
+        bind(_IDENTIFIER.findall(code, opening + 1, closing), opening, end)
+    for match in _ARROW_PARAMETER.finditer(code):
+        if match.group(1) not in _KEYWORDS:
+            bind([match.group(1)], match.start(), _body_end(code, match.end(), braces))
+
+    return _Scan(code, frozenset(declared), {name: tuple(ranges) for name, ranges in scopes.items()}, frozenset(definitions))
+
+
+def parse_js(code: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+    """
+    (top-level function names, referenced identifiers) of a JavaScript source.
+
+    Every identifier that is not bound where it appears counts as a reference,
+    so callbacks passed by name are found too.
+    """
+    scan = _scan(code)
+    references = {
+        match.group(0) for match in _IDENTIFIER.finditer(scan.code)
+        if not scan.is_bound(match.group(0), match.start())
+    }
+    return scan.declared, frozenset(references)
+
+
+def normalized_code_hash(code: str) -> str:
+    """
+    Hash of a program with comments, whitespace and its own top-level function
+    names removed, so `mineWoodLog` and `collectWoodLogs` with the same body
+    hash alike. String literals are kept: `"oak_log"` and `"birch_log"` differ.
+    """
+    own_names = parse_js(code)[0]
+    code = _COMMENT.sub(" ", code)
+    if own_names:
+        code = re.sub(r"(?<![\w$])(?:" + "|".join(map(re.escape, own_names)) + r")(?![\w$])", "_", code)
+    code = re.sub(r"\s*([^\w$\s])\s*", r"\1", re.sub(r"\s+", " ", code)).strip()
+    return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+
+def helper_closure(code: str, helpers: Sequence[Skill]) -> List[Skill]:
+    """
+    The helpers `code` needs: every helper declaring a function that `code`
+    references, then everything those reference in turn. Functions `code`
+    declares itself shadow helpers of the same name. Input order is kept.
+    """
+    declared_by: Dict[str, List[int]] = {}
+    for i, helper in enumerate(helpers):
+        for name in parse_js(helper.code)[0]:
+            declared_by.setdefault(name, []).append(i)
+
+    root_declared, root_references = parse_js(code)
+    needed: Set[int] = set()
+    frontier = [root_references - root_declared]
+    while frontier:
+        references = frontier.pop()
+        for name in references:
+            for i in declared_by.get(name, ()):
+                if i not in needed:
+                    needed.add(i)
+                    frontier.append(parse_js(helpers[i].code)[1] - root_declared)
+    return [helper for i, helper in enumerate(helpers) if i in needed]
+
+
+def called_functions(code: str) -> FrozenSet[str]:
+    """
+    Names `code` calls as plain functions that it does not define itself:
+    method calls, constructors, names bound where they are called (locals,
+    parameters) and `JS_GLOBALS` are left out.
+    """
+    scan = _scan(code)
+    # blank out `new X` keeping offsets, so positions still match the scan
+    blanked = _CONSTRUCTION.sub(lambda match: " " * len(match.group(0)), scan.code)
+    calls = set()
+    for match in _CALL.finditer(blanked):
+        name = match.group(1)
+        if name in JS_GLOBALS or name in scan.declared or match.end() - 1 in scan.definitions:
+            continue
+        if not scan.is_bound(name, match.start()):
+            calls.add(name)
+    return frozenset(calls)
+
+
+def unbounded_loops(code: str) -> int:
+    """Number of `while (true)` / `for (;;)` loops whose body has no `break`, `return` or `throw`."""
+    code = _strip(code)
+    count = 0
+    for match in _ENDLESS_LOOP.finditer(code):
+        depth, end = 1, match.end()
+        while end < len(code) and depth:
+            depth += (code[end] == "{") - (code[end] == "}")
+            end += 1
+        if not _LOOP_EXIT.search(code, match.end(), end):
+            count += 1
+    return count
+
+
+def defined_names(helpers: Sequence[Skill]) -> Set[str]:
+    """Names a program may call because one of `helpers` provides them."""
+    names = {helper.name for helper in helpers}
+    for helper in helpers:
+        names |= parse_js(helper.code)[0]
+    return names
+
+
+def string_arguments(code: str, functions: Collection[str]) -> List[Tuple[str, int, str]]:
+    """
+    (function, argument index, value) for every plain string literal passed to
+    a call of one of `functions`; arguments built at runtime are skipped.
+    """
+    if not functions:
+        return []
+    code = _COMMENT.sub(" ", code)
+    calls = re.compile(r"(?<![\w$.])(" + "|".join(map(re.escape, functions)) + r")\s*\(")
+    found = []
+    for match in calls.finditer(code):
+        for index, argument in enumerate(_arguments(code, match.end())):
+            literal = _LITERAL.fullmatch(argument.strip())
+            if literal:
+                found.append((match.group(1), index, literal.group(2)))
+    return found
+
+
+def _arguments(code: str, start: int) -> List[str]:
+    """The top-level comma-separated arguments of the call whose `(` ends at `start`."""
+    arguments, current, depth, quote, i = [], [], 0, None, start
+    while i < len(code):
+        c = code[i]
+        if quote:
+            if c == "\\":
+                current.append(code[i:i + 2])
+                i += 2
+                continue
+            quote = None if c == quote else quote
+        elif c in "'\"`":
+            quote = c
+        elif c in "([{":
+            depth += 1
+        elif c in ")]}":
+            if depth == 0:
+                break
+            depth -= 1
+        elif c == "," and depth == 0:
+            arguments.append("".join(current))
+            current = []
+            i += 1
+            continue
+        current.append(c)
+        i += 1
+    arguments.append("".join(current))
+    return arguments if any(argument.strip() for argument in arguments) else []
@@ -0,0 +1,63 @@
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import FrozenSet, List, Sequence, Tuple
+
+from ..models import CodeSnippet, Skill
+from .call_graph import called_functions, defined_names, parse_js, unbounded_loops
+
+
+@dataclass(frozen=True)
+class CandidateScore:
+    """Static checks of one planner candidate; `key` orders candidates best first."""
+    parsed: bool
+    unknown_calls: FrozenSet[str]
+    unbounded_loops: int
+    similarity: float
+
+    @property
+    def key(self) -> Tuple[bool, int, int, float]:
+        return (self.parsed, -len(self.unknown_calls), -self.unbounded_loops, self.similarity)
+
+
+class CandidateRanker:
+    """
+    Orders planner candidates without executing them, by in turn:
+
+    1. the reply parsed into an executable function,
+    2. fewer calls to functions neither the program nor the helpers define,
+    3. fewer `while (true)` / `for (;;)` loops without an exit,
+    4. higher identifier overlap (Jaccard) with the closest known-good skill.
+
+    Ties keep the input order, so earlier (cooler) candidates win.
+    """
+
+    def score(self, code_snippet: CodeSnippet, helpers: Sequence[Skill], known_good: Sequence[Skill]) -> CandidateScore:
+        code = code_snippet.main_function_code or ""
+        if code_snippet.execution_code is None:
+            return CandidateScore(False, frozenset(), 0, 0.0)
+        return CandidateScore(
+            parsed=True,
+            unknown_calls=called_functions(code) - defined_names(helpers),
+            unbounded_loops=unbounded_loops(code),
+            similarity=self._similarity(code, known_good),
+        )
+
+    def rank(
+        self,
+        candidates: Sequence[Tuple[CodeSnippet, str]],
+        helpers: Sequence[Skill],
+        known_good: Sequence[Skill],
+    ) -> List[Tuple[CodeSnippet, str, CandidateScore]]:
+        """(code snippet, reply) pairs with their scores, best first."""
+        scored = [(snippet, reply, self.score(snippet, helpers, known_good)) for snippet, reply in candidates]
+        return sorted(scored, key=lambda candidate: candidate[2].key, reverse=True)
+
+    @staticmethod
+    def _similarity(code: str, known_good: Sequence[Skill]) -> float:
+        identifiers = parse_js(code)[1]
+        best = 0.0
+        for skill in known_good:
+            other = parse_js(skill.code)[1]
+            if identifiers or other:
+                best = max(best, len(identifiers & other) / len(identifiers | other))
+        return best
@@ -1,5 +1,8 @@
+import hashlib
+import json
+from typing import Optional
 from ..models import Observation, Task
-from ..ports import LLMPort, PromptBuilderPort, ParserPort
+from ..ports import LLMPort, PromptBuilderPort, ParserPort, KeyValuePort
 
 class CriticService:
     """
@@ -10,22 +13,39 @@ class CriticService:
     • Build a critique prompt from (intention, result, context).  
     • Call the LLM via injected `LLMPort`.  
     • Parse the reply into a domain `Critique` object.  
+
+    With a `verdict_cache`, verdicts are remembered by a hash of the critique
+    prompt, so re-evaluating an identical (task, observation) is an exact lookup.
     """
 
     def __init__(
         self,
         llm: LLMPort,
         prompt_builder: PromptBuilderPort,
-        parser: ParserPort
+        parser: ParserPort,
+        verdict_cache: Optional[KeyValuePort] = None,
     ):
         self._llm = llm
         self._prompt_builder = prompt_builder
         self._parser = parser
+        self._verdict_cache = verdict_cache
 
     async def evaluate(self, observation: Observation, task: Task) -> tuple[bool, str]:
         system_msg, user_msg = self._prompt_builder.build_prompt(observation=observation, task=task)
+        key = None
+        if self._verdict_cache is not None:
+            key = "critic:" + hashlib.sha256(
+                f"{system_msg.content}\x00{user_msg.content}".encode("utf-8")
+            ).hexdigest()
+            cached = self._verdict_cache.lookup(key)
+            if cached is not None:
+                verdict = json.loads(cached)
+                return verdict["success"], verdict["critique"]
+
         response = await self._llm.chat(messages=[system_msg, user_msg])
         success, critique = self._parser.parse(response.content)
+        if key is not None:
+            self._verdict_cache.store(key, json.dumps({"success": success, "critique": critique}))
         return success, critique
 
 
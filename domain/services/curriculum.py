@@ -1,4 +1,6 @@
-from typing import List
+import asyncio
+import re
+from typing import List, Optional, Sequence
 from .qa import QAService
 from ..ports import LLMPort, PromptBuilderPort
 from ..models import Task, Observation
@@ -15,6 +17,11 @@ class CurriculumService:
     • Call the LLM via injected `LLMPort`.
     • Parse the reply into a domain `Task` object.
     ---------------
+
+    QA answers are fetched concurrently (at most `max_concurrent_answers` in
+    flight, each bounded by `answer_timeout` seconds); questions that fail or
+    time out are dropped. With `batch_answers=True` all questions are answered
+    by a single LLM call instead.
     """
 
     def __init__(
@@ -25,11 +32,17 @@ class CurriculumService:
         parser: ParserPort,
         # TODO: add warmup thresholds
         # warmup_thresholds: WarmupThresholds,
+        max_concurrent_answers: int = 4,
+        answer_timeout: Optional[float] = 60.0,
+        batch_answers: bool = False,
     ):
         self._llm = llm
         self._qa_service = qa_service
         self._prompt_builder = prompt_builder
         self._parser = parser
+        self._max_concurrent_answers = max_concurrent_answers
+        self._answer_timeout = answer_timeout
+        self._batch_answers = batch_answers
         # self._warmup = warmup_thresholds
         self._completed_tasks: List[Task] = []
         self._failed_tasks: List[Task] = []
@@ -50,17 +63,29 @@ class CurriculumService:
     def get_failed_tasks(self) -> List[Task]:
         return self._failed_tasks
 
-    async def get_next_task(self, observation: Observation) -> Task:
+    async def flush(self) -> None:
+        """Wait for the QA answers still being written to the cache."""
+        await self._qa_service.flush()
+
+    async def gather_qa(self, observation: Observation) -> List[tuple[str, str]]:
+        """The QA phase of `get_next_task`: questions about the observation and their answers."""
         # 1. generate questions from the current observation and task history
         questions = await self._qa_service.get_questions(
             observation=observation,
             completed_tasks=self._completed_tasks,
             failed_tasks=self._failed_tasks
         )
-        
+
         # 2. answer the questions
-        answers = [await self._qa_service.get_answer(q) for q in questions]
-        qa_text = "\\n".join([f"Q: {q}\\nA: {a}" for q, a in zip(questions, answers)])
+        return await self._answer_questions(questions)
+
+    async def get_next_task(
+        self, observation: Observation, qa_pairs: Optional[List[tuple[str, str]]] = None
+    ) -> Task:
+        """Propose the next task; `qa_pairs` from an earlier `gather_qa` skip the QA phase."""
+        if qa_pairs is None:
+            qa_pairs = await self.gather_qa(observation)
+        qa_text = "\\n".join([f"Q: {q}\\nA: {a}" for q, a in qa_pairs])
         
         # 3. build the prompt for the next task
 
@@ -78,6 +103,49 @@ class CurriculumService:
         task = self._parser.parse(response.content)
         return task
 
+    async def _answer_questions(self, questions: Sequence[str]) -> List[tuple[str, str]]:
+        if self._batch_answers:
+            answers = await self._qa_service.get_answers_batched(questions)
+            return [(q, a) for q, a in zip(questions, answers) if a]
+
+        semaphore = asyncio.Semaphore(self._max_concurrent_answers)
+
+        async def answer(question: str) -> str:
+            async with semaphore:
+                return await asyncio.wait_for(self._qa_service.get_answer(question), timeout=self._answer_timeout)
+
+        results = await asyncio.gather(*(answer(q) for q in questions), return_exceptions=True)
+        qa_pairs = []
+        for question, result in zip(questions, results):
+            if isinstance(result, BaseException):
+                logging.warning(f"Dropping QA question '{question}': {result!r}")
+                continue
+            qa_pairs.append((question, result))
+        return qa_pairs
+
+_WORD = re.compile(r"[a-z_]+")
+
+
+def observation_similarity(before: Observation, after: Observation) -> float:
+    """
+    How much of what the curriculum asks about survived between two observations,
+    in [0, 1]: 0 when the biome changed, otherwise the Jaccard similarity of the
+    item / block / entity names in inventory, equipment and surroundings (counts,
+    position and time are ignored).
+    """
+    if before.biome != after.biome:
+        return 0.0
+
+    def words(observation: Observation) -> set:
+        text = " ".join(str(field) for field in (
+            observation.inventory, observation.equipment, observation.nearby_blocks, observation.nearby_entities,
+        ))
+        return set(_WORD.findall(text.lower()))
+
+    a, b = words(before), words(after)
+    return len(a & b) / len(a | b) if a | b else 1.0
+
+
 # ------------------------------------------------------------
 # Test
 # ------------------------------------------------------------
@@ -0,0 +1,96 @@
+from __future__ import annotations
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Tuple
+
+_CAMEL = re.compile(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])")
+_WORD = re.compile(r"[A-Za-z]+")
+_STOPWORDS = frozenset(
+    "a an and any as at be by for from get in into is it of on or some the then to up use using with".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase word tokens with camelCase / snake_case identifiers split apart and
+    a light plural fold, so "Mine 3 iron ores" and `mineIronOre` share tokens.
+    Numbers and stopwords are dropped.
+    """
+    tokens = []
+    for word in _WORD.findall(_CAMEL.sub(" ", text)):
+        word = word.lower()
+        if word in _STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        tokens.append(word)
+    return tokens
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index over short documents (skill names + descriptions).
+
+    Pure Python and fully in memory; sized for libraries of a few thousand
+    entries where a search is a handful of dictionary lookups.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self._k1 = k1
+        self._b = b
+        self._postings: Dict[str, Dict[str, int]] = {}  # term -> {doc_id: term frequency}
+        self._lengths: Dict[str, int] = {}
+        self._terms: Dict[str, List[str]] = {}  # doc_id -> its distinct terms, for removal
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._lengths
+
+    def add(self, doc_id: str, text: str) -> None:
+        """Index `text` under `doc_id`, replacing any previous version."""
+        self.remove(doc_id)
+        tokens = tokenize(text)
+        frequencies = Counter(tokens)
+        for term, frequency in frequencies.items():
+            self._postings.setdefault(term, {})[doc_id] = frequency
+        self._terms[doc_id] = list(frequencies)
+        self._lengths[doc_id] = len(tokens)
+        self._total_length += len(tokens)
+
+    def remove(self, doc_id: str) -> None:
+        length = self._lengths.pop(doc_id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(doc_id):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+
+    def clear(self) -> None:
+        self._postings.clear()
+        self._lengths.clear()
+        self._terms.clear()
+        self._total_length = 0
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) pairs with a positive score, best first."""
+        if not self._lengths:
+            return []
+        n = len(self._lengths)
+        average_length = self._total_length / n or 1.0
+        scores: Dict[str, float] = {}
+        for term in set(tokenize(query)):
+            postings = self._postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, frequency in postings.items():
+                norm = self._k1 * (1 - self._b + self._b * self._lengths[doc_id] / average_length)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * frequency * (self._k1 + 1) / (frequency + norm)
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
@@ -1,7 +1,10 @@
-from typing import List, Sequence, Optional
+import asyncio
+import logging
+from typing import List, Sequence, Optional, Tuple
 from ..ports import LLMPort, PromptBuilderPort
-from ..models import Task, CodeSnippet, Observation, Skill
-from ..ports.parser_port import ParserPort
+from ..models import Task, CodeSnippet, Observation, Skill, Message
+from ..ports.parser_port import ParserPort, IncrementalParserPort
+from .candidate_ranker import CandidateRanker
 
 class PlannerService:
     """
@@ -12,6 +15,13 @@ class PlannerService:
     • Build a prompt from (skillset, code_snippet, observation, task, critique).
     • Call the LLM via injected `LLMPort`.
     • Parse the reply into a domain `CodeSnippet` object.
+
+    When the LLM streams and the parser can parse incrementally, generation is
+    cut off as soon as the code block is complete.
+
+    With `candidates > 1` the LLM is asked for that many replies at once, at
+    temperatures spread over `temperature_range`, and `CandidateRanker` picks
+    the one sent to the environment (no streaming in this mode).
     """
 
     def __init__(self, 
@@ -19,29 +29,100 @@ class PlannerService:
                  prompt_builder: PromptBuilderPort, 
                  parser: ParserPort,
                  max_code_generation_tries: int = 5,
+                 candidates: int = 1,
+                 temperature_range: Tuple[float, float] = (0.2, 1.0),
+                 ranker: Optional[CandidateRanker] = None,
                  ):
         self._llm = llm
         self._prompt_builder = prompt_builder
         self._parser = parser
         self._max_code_generation_tries = max_code_generation_tries
+        self._candidates = candidates
+        self._temperature_range = temperature_range
+        self._ranker = ranker or CandidateRanker()
 
     async def generate_code(self, 
         skillset: Sequence[Skill], 
         code_snippet: Optional[CodeSnippet],
         observation: Observation, 
         task: Task, 
-        critique: Optional[str]) -> CodeSnippet:
+        critique: Optional[str],
+        static_skillset: Sequence[Skill] = (),
+        helpers: Sequence[Skill] = ()) -> CodeSnippet:
+        """
+        `static_skillset` holds programs shared by every call (primitives); they lead the prompt.
+        `helpers` are the functions the generated code may call besides `skillset`; candidates are checked against them.
+        """
         
         system_msg, user_msg = self._prompt_builder.build_prompt(
             skillset=skillset,
             code_snippet=code_snippet,
             observation=observation,
             task=task,
-            critique=critique
+            critique=critique,
+            static_skillset=static_skillset,
         )
+        if self._candidates > 1:
+            return await self._best_of_n(
+                [system_msg, user_msg],
+                helpers=[*static_skillset, *helpers, *skillset],
+                known_good=skillset,
+            )
+        incremental_parser = self._parser.incremental() if self._llm.supports_streaming else None
+        if incremental_parser is not None:
+            return await self._stream_code([system_msg, user_msg], incremental_parser)
+
         response = await self._llm.chat(messages=[system_msg, user_msg])
         code_snippet = self._parser.parse(response.content)
         return code_snippet, response.content
+
+    async def _stream_code(self, messages: Sequence[Message], incremental_parser: IncrementalParserPort) -> tuple[CodeSnippet, str]:
+        chunks = []
+        code_snippet = None
+        stream = self._llm.chat_stream(messages)
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                code_snippet = incremental_parser.feed(chunk)
+                if code_snippet is not None:
+                    break
+        finally:
+            # stops the generation of the tokens after the code block
+            await stream.aclose()
+
+        llm_response = "".join(chunks)
+        if code_snippet is None:
+            code_snippet = self._parser.parse(llm_response)
+        return code_snippet, llm_response
+
+    def _temperatures(self) -> List[float]:
+        low, high = self._temperature_range
+        return [low + (high - low) * i / (self._candidates - 1) for i in range(self._candidates)]
+
+    async def _best_of_n(
+        self, messages: Sequence[Message], helpers: Sequence[Skill], known_good: Sequence[Skill]
+    ) -> tuple[CodeSnippet, str]:
+        temperatures = self._temperatures()
+        replies = await asyncio.gather(
+            *(self._llm.chat(messages=messages, temperature=temperature) for temperature in temperatures),
+            return_exceptions=True,
+        )
+        candidates = []
+        for temperature, reply in zip(temperatures, replies):
+            if isinstance(reply, BaseException):
+                logging.warning(f"Planner candidate at temperature {temperature:.2f} failed: {reply!r}")
+                continue
+            candidates.append((self._parser.parse(reply.content), reply.content))
+        if not candidates:
+            raise replies[0]
+
+        code_snippet, llm_response, score = self._ranker.rank(candidates, helpers, known_good)[0]
+        logging.info(
+            f"Picked '{code_snippet.function_name}' of {len(candidates)} planner candidates "
+            f"(unknown calls: {sorted(score.unknown_calls)}, unbounded loops: {score.unbounded_loops}, "
+            f"similarity: {score.similarity:.2f})"
+        )
+        return code_snippet, llm_response
     
 # ------------------------------------------------------------
 # Test
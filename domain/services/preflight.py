@@ -0,0 +1,89 @@
+from __future__ import annotations
+import difflib
+import re
+from typing import Collection, Dict, List, Mapping, Optional, Sequence
+
+from ..models import CodeSnippet, Skill
+from ..ports import SyntaxCheckerPort
+from .call_graph import called_functions, defined_names, string_arguments
+
+# Minecraft names taken by the primitive skills: function -> {argument index: kind}
+NAME_ARGUMENTS: Dict[str, Dict[int, str]] = {
+    "mineBlock": {1: "block"},
+    "craftItem": {1: "item"},
+    "smeltItem": {1: "item", 2: "item"},
+    "placeItem": {1: "item"},
+    "killMob": {1: "entity"},
+    "shoot": {1: "item", 2: "entity"},
+}
+_BY_NAME = re.compile(r"\bmcData\.(items|blocks|entities)ByName(?:\.([A-Za-z_]\w*)|\[\s*(['\"])([^'\"]*)\3\s*\])")
+_KIND = {"items": "item", "blocks": "block", "entities": "entity"}
+
+
+class PreflightValidator:
+    """
+    Static checks of a generated program before it reaches the environment.
+    `validate` returns one sentence per problem, meant to go back to the planner
+    as critique; an empty list lets the program run.
+
+    - the reply contained an executable `async function name(bot)`,
+    - every function it calls is defined by the program or one of the helpers,
+    - Minecraft names passed to the primitives or looked up in `mcData.*ByName`
+      exist in `names` (kind -> names, e.g. from a minecraft-data index),
+    - the program compiles (`syntax_checker`).
+    """
+
+    def __init__(
+        self,
+        names: Optional[Mapping[str, Collection[str]]] = None,
+        syntax_checker: Optional[SyntaxCheckerPort] = None,
+        name_arguments: Mapping[str, Mapping[int, str]] = NAME_ARGUMENTS,
+    ):
+        self._names = names
+        self._syntax_checker = syntax_checker
+        self._name_arguments = name_arguments
+
+    async def validate(self, code_snippet: CodeSnippet, helpers: Sequence[Skill]) -> List[str]:
+        if code_snippet.execution_code is None:
+            return ["No `async function functionName(bot) { ... }` was found in the reply; write the program as one."]
+        code = code_snippet.main_function_code
+        problems = []
+
+        undefined = sorted(called_functions(code) - defined_names(helpers))
+        if undefined:
+            problems.append(
+                f"{', '.join(undefined)} {'is' if len(undefined) == 1 else 'are'} called but not defined; "
+                "define them in the code or use the functions you were given."
+            )
+        if self._names is not None:
+            problems.extend(self._unknown_names(code))
+        if self._syntax_checker is not None:
+            error = await self._syntax_checker.check(f"{code}\n{code_snippet.execution_code}")
+            if error:
+                problems.append(f"The code does not compile: {error}.")
+        return problems
+
+    async def close(self) -> None:
+        """Release the syntax checker (a checker that restarts lazily serves later calls again)."""
+        if self._syntax_checker is not None:
+            await self._syntax_checker.close()
+
+    def _unknown_names(self, code: str) -> List[str]:
+        used = [
+            (self._name_arguments[function][index], value)
+            for function, index, value in string_arguments(code, self._name_arguments)
+            if index in self._name_arguments[function]
+        ]
+        for match in _BY_NAME.finditer(code):
+            used.append((_KIND[match.group(1)], match.group(2) or match.group(4)))
+
+        problems, seen = [], set()
+        for kind, value in used:
+            known = self._names.get(kind)
+            if known is None or value in known or (kind, value) in seen:
+                continue
+            seen.add((kind, value))
+            close = difflib.get_close_matches(value, known, n=1)
+            hint = f" Did you mean '{close[0]}'?" if close else ""
+            problems.append(f"'{value}' is not a Minecraft {kind} name.{hint}")
+        return problems
@@ -1,11 +1,27 @@
-from typing import List, Optional, Sequence
+import asyncio
+import logging
+from typing import List, Optional, Sequence, Set
 from ..ports import LLMPort, DatabasePort, PromptBuilderPort
 from ..models import Task, Observation, Message
 from ..ports.parser_port import ParserPort
 
+
+def _is_unknown(answer: str) -> bool:
+    """True for the "Answer: Unknown" reply the QA prompts ask for; such answers are never cached."""
+    text = answer.strip()
+    if text.lower().startswith("answer"):
+        text = text.partition(":")[2]
+    return text.strip().rstrip(".").lower() == "unknown"
+
+
 class QAService:
     """
     Service for question answering.
+
+    Answers are cached in `database`: an exact repeat of a question is answered
+    from the key/value store, and a new question within `cache_max_distance`
+    (cosine) of a stored one reuses its answer instead of calling the LLM.
+    Set `cache_max_distance=None` to disable the cache.
     """
     def __init__(self,
                  llm: LLMPort,
@@ -13,13 +29,20 @@ class QAService:
                  answer_prompt_builder: PromptBuilderPort,
                  parser: ParserPort,
                  database: DatabasePort,
-                 resume: bool = False
+                 resume: bool = False,
+                 cache_max_distance: Optional[float] = 0.1,
+                 batch_answer_prompt_builder: Optional[PromptBuilderPort] = None,
+                 answer_parser: Optional[ParserPort] = None,
                  ):
         self._llm = llm
         self._question_prompt_builder = question_prompt_builder
         self._answer_prompt_builder = answer_prompt_builder
         self._parser = parser
         self._database = database
+        self._batch_answer_prompt_builder = batch_answer_prompt_builder
+        self._answer_parser = answer_parser
+        self._cache_max_distance = cache_max_distance
+        self._pending_writes: Set[asyncio.Task] = set()
         self.question_answer_pairs: List[tuple[str, str]] = []
 
         if resume and self._database:
@@ -48,10 +71,88 @@ class QAService:
         return questions
 
     async def get_answer(self, question: str) -> str:
+        if self._cache_enabled:
+            cached = await self._cached_answer(question)
+            if cached is not None:
+                return cached
+
         system_msg, user_msg = self._answer_prompt_builder.build_prompt(question=question)
         response = await self._llm.chat([system_msg, user_msg])
+
+        if self._cache_enabled and not _is_unknown(response.content):
+            self._write_back(question, response.content)
         return response.content
 
+    async def get_answers_batched(self, questions: Sequence[str]) -> List[str]:
+        """
+        Answer all questions with a single LLM call (cached questions are skipped).
+        Unanswered questions come back as "".
+        """
+        if self._batch_answer_prompt_builder is None or self._answer_parser is None:
+            raise ValueError("Batched answering requires batch_answer_prompt_builder and answer_parser.")
+
+        answers = [""] * len(questions)
+        misses = []
+        for i, question in enumerate(questions):
+            cached = None
+            if self._cache_enabled:
+                cached = await self._cached_answer(question)
+            if cached is not None:
+                answers[i] = cached
+            else:
+                misses.append(i)
+        if not misses:
+            return answers
+
+        system_msg, user_msg = self._batch_answer_prompt_builder.build_prompt(
+            questions=[questions[i] for i in misses]
+        )
+        response = await self._llm.chat([system_msg, user_msg])
+        parsed = self._answer_parser.parse(response.content)
+
+        for i, text in zip(misses, parsed):
+            if not text:
+                continue
+            # same shape as a single `get_answer` reply so cached entries are interchangeable
+            answers[i] = f"Answer: {text}"
+            if self._cache_enabled and not _is_unknown(text):
+                self._write_back(questions[i], answers[i])
+        return answers
+
+    @property
+    def _cache_enabled(self) -> bool:
+        return self._database is not None and self._cache_max_distance is not None
+
+    async def _cached_answer(self, question: str) -> Optional[str]:
+        """Exact match first (no embedding call), then the nearest stored question."""
+        cached = self._database.lookup(question)
+        if cached is not None and not _is_unknown(cached):
+            return cached
+        cached = await self._database.semantic_lookup(question, max_distance=self._cache_max_distance)
+        if cached is None or _is_unknown(cached):
+            # "Unknown" entries written before they were skipped count as misses
+            return None
+        # the next exact repeat of this wording skips the embedding call
+        self._database.store(question, cached)
+        return cached
+
+    def _write_back(self, question: str, answer: str) -> None:
+        """Store the pair; the embedding and vector write run in the background so the caller does not wait."""
+        self._database.store(question, answer)
+        task = asyncio.create_task(self._database.semantic_store(question, answer))
+        self._pending_writes.add(task)
+        task.add_done_callback(self._on_write_done)
+
+    def _on_write_done(self, task: asyncio.Task) -> None:
+        self._pending_writes.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.warning(f"Failed to cache QA answer: {task.exception()}")
+
+    async def flush(self) -> None:
+        """Wait for all pending cache writes."""
+        if self._pending_writes:
+            await asyncio.gather(*self._pending_writes, return_exceptions=True)
+
     async def generate_qa(self, observation: Observation, task: Task) -> List[tuple[str, str]]:
         system_msg, user_msg = self._question_prompt_builder.build_prompt(
             observation=observation,
@@ -1,6 +1,11 @@
-from typing import List, Sequence
+import asyncio
+import json
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
 from ..ports import LLMPort, DatabasePort, PromptBuilderPort
 from ..models import Skill, Task, CodeSnippet
+from .lexical_index import BM25Index, tokenize
+from .call_graph import helper_closure, normalized_code_hash
 
 class SkillService:
     """
@@ -11,6 +16,21 @@ class SkillService:
     • Add a new skill to the skill library.
     • Retrieve skillset relevant to a given task.
     ---------------
+
+    Retrieval is hybrid: a BM25 index over skill names (camelCase split) and
+    descriptions sits next to the vector database. When every word of the task
+    appears in a skill's name ("Craft furnace" -> `craftFurnace`) the lexical
+    ranking is returned without an embedding call; otherwise the lexical and
+    vector rankings are merged with reciprocal rank fusion.
+
+    A library persisted by an earlier run is picked up lazily: the first
+    retrieval indexes whatever `database.get_all()` returns. Call `clear` to
+    start from an empty library instead.
+
+    With `dedupe`, a new skill whose code matches a stored one up to names,
+    comments and whitespace, or whose description lies within
+    `duplicate_max_distance` of a stored one, is not added: its name becomes an
+    alias of the existing (canonical) skill, searchable in the lexical index.
     """
 
     def __init__(
@@ -18,16 +38,190 @@ class SkillService:
         llm: LLMPort,
         prompt_builder: PromptBuilderPort,
         database: DatabasePort,
+        hybrid_retrieval: bool = True,
+        retrieval_top_k: int = 5,
+        rrf_k: int = 60,
+        dedupe: bool = True,
+        duplicate_max_distance: float = 0.05,
     ):
         self._llm = llm
         self._prompt_builder = prompt_builder
         self._database = database
+        self._hybrid_retrieval = hybrid_retrieval
+        self._retrieval_top_k = retrieval_top_k
+        self._rrf_k = rrf_k
+        self._dedupe = dedupe
+        self._duplicate_max_distance = duplicate_max_distance
+        self._lexical_index = BM25Index()
+        self._skills: Dict[str, Skill] = {}
+        self._code_hashes: Dict[str, str] = {}  # normalized code hash -> canonical name
+        self._aliases: Dict[str, List[str]] = {}  # canonical name -> alias names
+        self._canonical: Dict[str, str] = {}  # alias name -> canonical name
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        # agents sharing the library add one skill at a time, so each sees the others' duplicates
+        self._add_lock = asyncio.Lock()
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            skills = await self._database.get_all()
+            for skill in skills:
+                if skill.name not in self._skills:  # added during this run; newer than the stored copy
+                    self._load_aliases(skill.name)
+                    self._index(skill)
+            self._loaded = True
+        if skills:
+            logging.info(f"Resumed skill library with {len(skills)} skills")
+
+    async def add_skill(self, skill: Skill, task: Optional[Task] = None) -> Skill:
+        """
+        Add `skill`; with the `task` it solved, later retrievals for that exact command return it first.
+        Returns the library entry: `skill` itself, or the canonical skill it was merged into.
+        """
+        async with self._add_lock:
+            canonical = await self._find_duplicate(skill) if self._dedupe else None
+            if canonical is not None:
+                logging.info(f"Skill '{skill.name}' duplicates '{canonical.name}'; keeping it as an alias")
+                self._add_alias(canonical, skill.name)
+                stored = canonical
+            else:
+                await self._database.add([skill])
+                self._index(skill)
+                stored = skill
+        if task is not None:
+            self._database.store(self._task_key(task.command), stored.name)
+        return stored
+
+    def aliases(self, name: str) -> List[str]:
+        return list(self._aliases.get(name, ()))
+
+    async def _find_duplicate(self, skill: Skill) -> Optional[Skill]:
+        await self._ensure_loaded()
+        if skill.name in self._skills:
+            return None  # a new version of a skill replaces the old one
+        name = self._canonical.get(skill.name) or self._code_hashes.get(normalized_code_hash(skill.code))
+        if name is None and skill.description:
+            near = await self._database.query(skill.description, max_distance=self._duplicate_max_distance)
+            name = next((other.name for other in near if other.name in self._skills), None)
+        return self._skills.get(name) if name else None
+
+    def _add_alias(self, canonical: Skill, alias: str) -> None:
+        aliases = self._aliases.setdefault(canonical.name, [])
+        if alias in aliases:
+            return
+        aliases.append(alias)
+        self._canonical[alias] = canonical.name
+        self._database.store(self._aliases_key(canonical.name), json.dumps(aliases))
+        self._index(canonical)
+
+    def _load_aliases(self, name: str) -> None:
+        stored = self._database.lookup(self._aliases_key(name))
+        if stored is None:
+            return
+        self._aliases[name] = json.loads(stored)
+        for alias in self._aliases[name]:
+            self._canonical[alias] = name
+
+    @staticmethod
+    def _task_key(command: str) -> str:
+        return f"task:{command}"
+
+    @staticmethod
+    def _aliases_key(name: str) -> str:
+        return f"aliases:{name}"
 
-    async def add_skill(self, skill: Skill):
-        await self._database.add([skill])
+    def _index(self, skill: Skill) -> None:
+        previous = self._skills.get(skill.name)
+        if previous is not None and self._code_hashes.get(normalized_code_hash(previous.code)) == skill.name:
+            del self._code_hashes[normalized_code_hash(previous.code)]
+        self._skills[skill.name] = skill
+        self._code_hashes.setdefault(normalized_code_hash(skill.code), skill.name)
+        names = " ".join([skill.name, *self._aliases.get(skill.name, ())])
+        self._lexical_index.add(skill.name, f"{names} {skill.description or ''}")
 
     async def retrieve_skillset(self, task: Task) -> Sequence[Skill]:
-        return await self._database.query(task.command)
+        await self._ensure_loaded()
+        if not self._hybrid_retrieval or not self._skills:
+            return await self._database.query(task.command)
+
+        lexical, shortcut = self._lexical_candidates(task)
+        if shortcut is not None:
+            return shortcut
+
+        vector = await self._database.query(task.command)
+        return self._fuse(lexical, vector)
+
+    async def retrieve_skillsets(self, tasks: Sequence[Task]) -> List[Sequence[Skill]]:
+        """`retrieve_skillset` for several tasks, with one batched vector search for those that need it."""
+        await self._ensure_loaded()
+        results: List[Sequence[Skill]] = [[] for _ in tasks]
+        lexical: Dict[int, List[str]] = {}
+        pending: List[int] = []
+        for i, task in enumerate(tasks):
+            if self._hybrid_retrieval and self._skills:
+                lexical[i], shortcut = self._lexical_candidates(task)
+                if shortcut is not None:
+                    results[i] = shortcut
+                    continue
+            pending.append(i)
+
+        if pending:
+            vectors = await self._database.query_many([tasks[i].command for i in pending])
+            for i, vector in zip(pending, vectors):
+                results[i] = self._fuse(lexical[i], vector) if i in lexical else vector
+        return results
+
+    def _lexical_candidates(self, task: Task) -> Tuple[List[str], Optional[List[Skill]]]:
+        """BM25 ranking for the task, plus the final result when no vector search is needed."""
+        lexical = [name for name, _ in self._lexical_index.search(task.command, k=self._retrieval_top_k)]
+        solved_by = self._database.lookup(self._task_key(task.command))
+        if solved_by in self._skills:
+            logging.info(f"'{task.command}' was solved by '{solved_by}'; skipping vector search")
+            ranked = [solved_by] + [name for name in lexical if name != solved_by]
+            return lexical, [self._skills[name] for name in ranked[:self._retrieval_top_k]]
+        if lexical and self._exact_hit(task.command, lexical[0]):
+            logging.info(f"Lexical hit '{lexical[0]}' for '{task.command}'; skipping vector search")
+            return lexical, [self._skills[name] for name in lexical]
+        return lexical, None
+
+    def available_helpers(self, helpers: Sequence[Skill]) -> List[Skill]:
+        """`helpers` followed by the library skills not shadowed by one of them."""
+        candidates = {helper.name: helper for helper in helpers}
+        for name, skill in self._skills.items():
+            candidates.setdefault(name, skill)
+        return list(candidates.values())
+
+    def resolve_helpers(self, code_snippet: CodeSnippet, helpers: Sequence[Skill]) -> List[Skill]:
+        """
+        The transitive closure of `helpers` and library skills that the snippet calls,
+        so the environment compiles only what the step needs.
+        """
+        code = f"{code_snippet.main_function_code}\n{code_snippet.execution_code}"
+        return helper_closure(code, self.available_helpers(helpers))
+
+    def _exact_hit(self, command: str, name: str) -> bool:
+        """True when every word of the command is part of the skill's name or one of its aliases."""
+        query_terms = set(tokenize(command))
+        return bool(query_terms) and any(
+            query_terms <= set(tokenize(candidate)) for candidate in [name, *self._aliases.get(name, ())]
+        )
+
+    def _fuse(self, lexical: List[str], vector: Sequence[Skill]) -> List[Skill]:
+        """Reciprocal rank fusion of the two rankings."""
+        scores: Dict[str, float] = {}
+        skills: Dict[str, Skill] = {}
+        for rank, name in enumerate(lexical):
+            scores[name] = scores.get(name, 0.0) + 1.0 / (self._rrf_k + rank + 1)
+            skills[name] = self._skills[name]
+        for rank, skill in enumerate(vector):
+            scores[skill.name] = scores.get(skill.name, 0.0) + 1.0 / (self._rrf_k + rank + 1)
+            skills.setdefault(skill.name, skill)
+        ranked = sorted(scores, key=lambda name: -scores[name])
+        return [skills[name] for name in ranked[:self._retrieval_top_k]]
 
     def _generate_description(self, code_snippet: str) -> str:
         """
@@ -41,6 +235,12 @@ class SkillService:
     
     async def clear(self) -> None:
         await self._database.clear()
+        self._lexical_index.clear()
+        self._skills.clear()
+        self._code_hashes.clear()
+        self._aliases.clear()
+        self._canonical.clear()
+        self._loaded = True
 
     def show_all(self) -> None:
         self._database.show_all()
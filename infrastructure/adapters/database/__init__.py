@@ -1,3 +1,7 @@
 from .chroma_database import ChromaDatabase
+from .numpy_database import NumpyVectorDatabase
+from .cached_embeddings import CachedEmbeddings
+from .sqlite_kv_store import SqliteKeyValueStore
+from .instrumented_database import InstrumentedDatabase
 
-__all__ = ["ChromaDatabase"]
\ No newline at end of file
+__all__ = ["ChromaDatabase", "NumpyVectorDatabase", "CachedEmbeddings", "SqliteKeyValueStore", "InstrumentedDatabase"]
\ No newline at end of file
@@ -0,0 +1,184 @@
+from __future__ import annotations
+import hashlib
+import inspect
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Disk-backed cache in front of any LangChain `Embeddings`.
+
+    - Vectors are stored as float32 blobs in SQLite (WAL), keyed by a hash of
+      (model, kind, text). Query and document embeddings are kept apart since
+      providers embed them with different task types.
+    - `embed_documents` and `embed_queries` deduplicate the misses of a call and
+      send them to the wrapped model in batches of `batch_size`.
+    - Entries beyond `max_entries` are evicted least recently used first.
+
+    Drop-in for the `embedding_model` of `ChromaDatabase`.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        path: str | Path = "ckpt/embedding_cache.sqlite3",
+        *,
+        model_name: Optional[str] = None,
+        max_entries: int = 100_000,
+        batch_size: int = 100,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._embeddings = embeddings
+        self._model_name = model_name or getattr(embeddings, "model", None) or type(embeddings).__name__
+        self._max_entries = max_entries
+        self._batch_size = batch_size
+        self._clock = clock
+        # providers with task types (Google) embed queries in bulk via embed_documents(task_type=...)
+        self._batched_queries = "task_type" in inspect.signature(embeddings.embed_documents).parameters
+        self.hits = 0
+        self.misses = 0
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            "key TEXT PRIMARY KEY, vector BLOB NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS embeddings_accessed_at ON embeddings(accessed_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    @property
+    def model(self) -> str:
+        return self._model_name
+
+    def __len__(self) -> int:
+        return self._size
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": self._size}
+
+    def key_for(self, text: str, kind: str) -> str:
+        return hashlib.sha256(f"{self._model_name}\x00{kind}\x00{text}".encode("utf-8")).hexdigest()
+
+    # --- Embeddings interface ---
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self._embed_many(texts, "document", self._embeddings.embed_documents)
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Query embeddings for several texts, with the misses embedded in batches."""
+        return self._embed_many(texts, "query", self._embed_query_batch)
+
+    def _embed_query_batch(self, texts: List[str]) -> List[List[float]]:
+        if hasattr(self._embeddings, "embed_queries"):
+            return self._embeddings.embed_queries(texts)
+        if self._batched_queries:
+            return self._embeddings.embed_documents(texts, task_type="RETRIEVAL_QUERY")
+        return [self._embeddings.embed_query(text) for text in texts]
+
+    def _embed_many(
+        self, texts: List[str], kind: str, embed: Callable[[List[str]], List[List[float]]]
+    ) -> List[List[float]]:
+        keys = [self.key_for(text, kind) for text in texts]
+        found = self._get_many(keys)
+
+        missing: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+
+        missing_keys = list(missing)
+        for start in range(0, len(missing_keys), self._batch_size):
+            batch = missing_keys[start:start + self._batch_size]
+            vectors = embed([missing[key] for key in batch])
+            found.update(self._put_many(batch, vectors))
+
+        return [found[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self.key_for(text, "query")
+        found = self._get_many([key])
+        if key in found:
+            self.hits += 1
+            return found[key]
+        self.misses += 1
+        return self._put_many([key], [self._embeddings.embed_query(text)])[key]
+
+    # --- storage ---
+
+    def _get_many(self, keys: List[str]) -> Dict[str, List[float]]:
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, List[float]] = {}
+        now = self._clock()
+        with self._lock:
+            # stay well below SQLite's bound-parameter limit
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                ).fetchall()
+                for key, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32).tolist()
+                if rows:
+                    self._conn.execute(
+                        f"UPDATE embeddings SET accessed_at = ? WHERE key IN ({','.join('?' * len(rows))})",
+                        [now, *(key for key, _ in rows)],
+                    )
+        return found
+
+    def _put_many(self, keys: List[str], vectors: List[List[float]]) -> Dict[str, List[float]]:
+        now = self._clock()
+        stored: Dict[str, List[float]] = {}
+        with self._lock:
+            size = self._size
+            self._conn.execute("BEGIN")
+            try:
+                for key, vector in zip(keys, vectors):
+                    array = np.asarray(vector, dtype=np.float32)
+                    existed = self._conn.execute("SELECT 1 FROM embeddings WHERE key = ?", (key,)).fetchone()
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO embeddings (key, vector, accessed_at) VALUES (?, ?, ?)",
+                        (key, array.tobytes(), now),
+                    )
+                    if not existed:
+                        size += 1
+                    # return what a later hit would return, so hits and misses agree bit for bit
+                    stored[key] = array.tolist()
+                if size > self._max_entries:
+                    overflow = size - self._max_entries
+                    self._conn.execute(
+                        "DELETE FROM embeddings WHERE key IN "
+                        "(SELECT key FROM embeddings ORDER BY accessed_at ASC LIMIT ?)",
+                        (overflow,),
+                    )
+                    size -= overflow
+                self._conn.execute("COMMIT")
+            except BaseException:
+                # leave the connection usable for the next BEGIN
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+            self._size = size
+        return stored
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def embed_queries(embeddings: Embeddings, texts: List[str]) -> List[List[float]]:
+    """Embed several queries in one call when the model supports it (see `CachedEmbeddings.embed_queries`)."""
+    if hasattr(embeddings, "embed_queries"):
+        return embeddings.embed_queries(texts)
+    return [embeddings.embed_query(text) for text in texts]
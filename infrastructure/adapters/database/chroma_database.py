@@ -1,12 +1,17 @@
 from __future__ import annotations
 import asyncio
+import hashlib
+import logging
 from pathlib import Path
-from typing import Optional, Sequence
+from typing import List, Optional, Sequence
 
 from langchain_community.vectorstores import Chroma
 from langchain_google_genai import GoogleGenerativeAIEmbeddings
 from domain.ports.database_port import DatabasePort
 from domain.models import Skill
+from .cached_embeddings import embed_queries
+from .skill_manifest import SkillManifest
+from .sqlite_kv_store import SqliteKeyValueStore
 import chromadb
 from dataclasses import asdict
 
@@ -14,6 +19,13 @@ class ChromaDatabase(DatabasePort):
     """
     - Save the query as a vector in Chroma
     - Save the result in the content (= page_content) so that it can be retrieved with one query
+    - The collection handle and the set of stored ids are kept after initialization,
+      so `count` is free and `query` is a single vector search
+    - Exact `lookup` / `store` go to a `SqliteKeyValueStore` (by default
+      `<persist_dir>/kv.sqlite3`, namespaced by collection) and never touch Chroma
+    - Added skills are recorded in `<persist_dir>/<collection>.manifest.json`;
+      `get_all` skips stored skills whose code does not match it and `repair`
+      deletes them
     """
 
     def __init__(
@@ -23,14 +35,19 @@ class ChromaDatabase(DatabasePort):
         persist_dir: str | Path = "ckpt/vectordb",
         score_threshold: float = 0.5,
         retrieval_top_k: int = 5,
+        kv_store: Optional[SqliteKeyValueStore] = None,
     ) -> None:
         self._persist_dir = Path(persist_dir)
         self._collection_name = collection_name
         self._embeddings = embedding_model
         self._score_threshold = score_threshold
         self._retrieval_top_k = retrieval_top_k
+        self._kv = kv_store or SqliteKeyValueStore(self._persist_dir / "kv.sqlite3", namespace=collection_name)
+        self._manifest = SkillManifest(self._persist_dir / f"{collection_name}.manifest.json")
         self._client = None
+        self._collection = None
         self._vectorstore = None
+        self._ids: set[str] = set()
         self._lock = asyncio.Lock()
 
     async def _initialize(self):
@@ -43,27 +60,29 @@ class ChromaDatabase(DatabasePort):
         # This is a synchronous method that will be run in a separate thread
         self._client = chromadb.PersistentClient(path=str(self._persist_dir))
         
-        collection = self._client.get_or_create_collection(
+        self._collection = self._client.get_or_create_collection(
             name=self._collection_name,
             metadata={"hnsw:space": "cosine"},
         )
+        self._ids = set(self._collection.get(include=[])["ids"])
 
         self._vectorstore = Chroma(
             client=self._client,
-            collection_name=collection.name, # Use the name from the returned collection
+            collection_name=self._collection.name, # Use the name from the returned collection
             embedding_function=self._embeddings,
         )
 
     # --- Interface Methods ---
 
     def count(self) -> int:
-        return 0 
+        """Number of stored documents (0 until the database is initialized)."""
+        return len(self._ids)
 
     def lookup(self, key: str) -> str | None:
-        return None
+        return self._kv.get(key)
 
     def store(self, key: str, value: str) -> None:
-        pass
+        self._kv.put(key, value)
 
     async def add(self, documents: Sequence[Skill]):
         await self._initialize()
@@ -71,18 +90,63 @@ class ChromaDatabase(DatabasePort):
         metadatas = [asdict(doc) for doc in documents]
         ids = [doc.name for doc in documents]
         await asyncio.to_thread(self._vectorstore.add_texts, texts=texts, metadatas=metadatas, ids=ids)
+        self._ids.update(ids)
+        await asyncio.to_thread(self._manifest.record, documents)
+
+    async def get_all(self) -> List[Skill]:
+        valid, rejected = await self._verified()
+        if rejected:
+            logging.warning(f"Skipping skills that fail the manifest check (run repair to delete them): {rejected}")
+        return valid
+
+    async def repair(self) -> List[str]:
+        """Delete the stored skills whose code does not match the manifest; returns their names."""
+        _, rejected = await self._verified()
+        if rejected:
+            logging.warning(f"Deleting skills that fail the manifest check: {rejected}")
+            await asyncio.to_thread(self._collection.delete, ids=rejected)
+            self._ids.difference_update(rejected)
+        return rejected
+
+    async def _verified(self) -> tuple[List[Skill], List[str]]:
+        await self._initialize()
+        if not self._ids:
+            return [], []
+        result = await asyncio.to_thread(self._collection.get, include=["metadatas"])
+        skills = [Skill(**metadata) for metadata in result["metadatas"] if metadata and "code" in metadata]
+        return await asyncio.to_thread(self._manifest.verify, skills)
 
-    async def query(self, query: str) -> Sequence[Skill]:
+    async def semantic_lookup(self, key: str, max_distance: float | None = None) -> str | None:
         await self._initialize()
-        
-        # Check if collection exists and has documents
-        collections = await asyncio.to_thread(self._client.list_collections)
-        if not any(c.name == self._collection_name for c in collections):
-            return []
-            
-        collection = await asyncio.to_thread(self._client.get_collection, name=self._collection_name)
-        if await asyncio.to_thread(collection.count) == 0:
+        if not self._ids:
+            return None
+        max_distance = self._score_threshold if max_distance is None else max_distance
+        docs_and_scores = await asyncio.to_thread(
+            self._vectorstore.similarity_search_with_score, key, k=1
+        )
+        if not docs_and_scores:
+            return None
+        doc, score = docs_and_scores[0]
+        if score > max_distance:
+            return None
+        return doc.metadata.get("value")
+
+    async def semantic_store(self, key: str, value: str) -> None:
+        await self._initialize()
+        doc_id = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        await asyncio.to_thread(
+            self._vectorstore.add_texts,
+            texts=[key],
+            metadatas=[{"key": key, "value": value}],
+            ids=[doc_id],
+        )
+        self._ids.add(doc_id)
+
+    async def query(self, query: str, max_distance: float | None = None) -> Sequence[Skill]:
+        await self._initialize()
+        if not self._ids:
             return []
+        max_distance = self._score_threshold if max_distance is None else max_distance
 
         docs_and_scores = await asyncio.to_thread(
             self._vectorstore.similarity_search_with_score, query, k=self._retrieval_top_k
@@ -91,18 +155,39 @@ class ChromaDatabase(DatabasePort):
             return []
         return [
             Skill(**doc.metadata) for doc, score in docs_and_scores
-            if score <= self._score_threshold
+            if score <= max_distance
+        ]
+
+    async def query_many(self, queries: Sequence[str]) -> List[List[Skill]]:
+        """One batched embedding call and one collection query for all of `queries`."""
+        await self._initialize()
+        if not self._ids:
+            return [[] for _ in queries]
+        if not queries:
+            return []
+        return await asyncio.to_thread(self._query_many, list(queries))
+
+    def _query_many(self, queries: List[str]) -> List[List[Skill]]:
+        result = self._collection.query(
+            query_embeddings=embed_queries(self._embeddings, queries),
+            n_results=min(self._retrieval_top_k, len(self._ids)),
+            include=["metadatas", "distances"],
+        )
+        return [
+            [Skill(**metadata) for metadata, distance in zip(metadatas, distances) if distance <= self._score_threshold]
+            for metadatas, distances in zip(result["metadatas"], result["distances"])
         ]
 
     async def clear(self) -> None:
         await self._initialize()
-        # Check if collection exists before trying to delete from it
-        collections = await asyncio.to_thread(self._client.list_collections)
-        if any(c.name == self._collection_name for c in collections):
-             await asyncio.to_thread(self._client.delete_collection, name=self._collection_name)
+        await asyncio.to_thread(self._client.delete_collection, name=self._collection_name)
         
         # After deleting, we must re-initialize to recreate the collection and vectorstore
+        self._collection = None
         self._vectorstore = None
+        self._ids = set()
+        self._kv.clear()
+        self._manifest.clear()
         await self._initialize()
 
     # ---------- Show All ----------
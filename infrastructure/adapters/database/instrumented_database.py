@@ -0,0 +1,68 @@
+from __future__ import annotations
+from typing import Sequence
+
+from domain.models import Skill
+from domain.ports import DatabasePort
+from infrastructure.metrics import DATABASE_CALL_SECONDS, Histogram
+
+
+class InstrumentedDatabase(DatabasePort):
+    """
+    `DatabasePort` decorator recording the latency of every call in `histogram`
+    (labels: collection, operation). Methods outside the port are passed through untimed.
+    """
+
+    def __init__(self, database: DatabasePort, collection: str, histogram: Histogram = DATABASE_CALL_SECONDS):
+        self._database = database
+        self._collection = collection
+        self._histogram = histogram
+
+    def __getattr__(self, name: str):
+        return getattr(self._database, name)
+
+    def _time(self, operation: str):
+        return self._histogram.time(self._collection, operation)
+
+    def count(self) -> int:
+        with self._time("count"):
+            return self._database.count()
+
+    def lookup(self, key: str) -> str | None:
+        with self._time("lookup"):
+            return self._database.lookup(key)
+
+    def store(self, key: str, value: str) -> None:
+        with self._time("store"):
+            self._database.store(key, value)
+
+    async def add(self, documents: Sequence[Skill]):
+        with self._time("add"):
+            return await self._database.add(documents)
+
+    async def semantic_lookup(self, key: str, max_distance: float | None = None) -> str | None:
+        with self._time("semantic_lookup"):
+            return await self._database.semantic_lookup(key, max_distance=max_distance)
+
+    async def semantic_store(self, key: str, value: str) -> None:
+        with self._time("semantic_store"):
+            await self._database.semantic_store(key, value)
+
+    async def query(self, query: str, max_distance: float | None = None) -> Sequence[Skill]:
+        with self._time("query"):
+            return await self._database.query(query, max_distance=max_distance)
+
+    async def get_all(self) -> Sequence[Skill]:
+        with self._time("get_all"):
+            return await self._database.get_all()
+
+    async def query_many(self, queries: Sequence[str]) -> Sequence[Sequence[Skill]]:
+        with self._time("query_many"):
+            return await self._database.query_many(queries)
+
+    async def clear(self) -> None:
+        with self._time("clear"):
+            await self._database.clear()
+
+    async def compact(self) -> None:
+        with self._time("compact"):
+            await self._database.compact()
@@ -0,0 +1,339 @@
+from __future__ import annotations
+import asyncio
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from domain.ports.database_port import DatabasePort
+from domain.models import Skill
+from .cached_embeddings import embed_queries
+from .skill_manifest import SkillManifest
+from .sqlite_kv_store import SqliteKeyValueStore
+
+
+class NumpyVectorDatabase(DatabasePort):
+    """
+    In-process exact vector index for small libraries (up to ~100k entries).
+
+    - Unit-normalised embeddings live in one contiguous float32 matrix; a query is
+      a single matrix-vector product plus `argpartition` top-k.
+    - Scores are cosine distances (1 - cosine similarity), the same scale as
+      `ChromaDatabase` with `hnsw:space=cosine`, so thresholds carry over.
+    - Persisted as a snapshot, `<name>.npy` (loaded with `mmap_mode="r"`) next to
+      `<name>.json` holding ids and metadata, plus `<name>.log.jsonl`, an append-only
+      journal of the upserts and removals since. An insert appends one line; once
+      the journal outgrows `max(compact_after, count())` entries it is folded into
+      a new snapshot (amortised O(1) per insert). Neither holds the query lock.
+      `compact` at shutdown (`SharedServices.close`) makes the next start a pure mmap load.
+    - Exact `lookup` / `store` go to a `SqliteKeyValueStore` (by default
+      `<persist_dir>/kv.sqlite3`, namespaced by collection).
+    - Added skills are recorded in `<name>.manifest.json`; `get_all` skips stored
+      skills whose code does not match it and `repair` deletes them.
+    """
+
+    def __init__(
+        self,
+        collection_name: str,
+        embedding_model: Embeddings,
+        persist_dir: str | Path = "ckpt/vectordb",
+        score_threshold: float = 0.5,
+        retrieval_top_k: int = 5,
+        kv_store: Optional[SqliteKeyValueStore] = None,
+        compact_after: int = 1024,
+    ) -> None:
+        self._persist_dir = Path(persist_dir)
+        self._collection_name = collection_name
+        self._embeddings = embedding_model
+        self._score_threshold = score_threshold
+        self._retrieval_top_k = retrieval_top_k
+        self._kv = kv_store or SqliteKeyValueStore(self._persist_dir / "kv.sqlite3", namespace=collection_name)
+        self._manifest = SkillManifest(self._persist_dir / f"{collection_name}.manifest.json")
+
+        self._matrix: Optional[np.ndarray] = None  # rows [0, _size) are live; may be a read-only memmap
+        self._size = 0
+        self._ids: List[str] = []
+        self._metadatas: List[dict] = []
+        self._rows: dict[str, int] = {}
+        # `_lock` guards the in-memory index (queries); `_write_lock` orders journal
+        # appends and compaction, so a slow disk never blocks a query
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._compact_after = compact_after
+        self._journal_entries = 0
+        self._init_lock = asyncio.Lock()
+        self._loaded = False
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self._persist_dir / f"{self._collection_name}.npy"
+
+    @property
+    def _meta_path(self) -> Path:
+        return self._persist_dir / f"{self._collection_name}.json"
+
+    @property
+    def _journal_path(self) -> Path:
+        return self._persist_dir / f"{self._collection_name}.log.jsonl"
+
+    async def _initialize(self):
+        async with self._init_lock:
+            if not self._loaded:
+                await asyncio.to_thread(self._load)
+                self._loaded = True
+
+    def _load(self):
+        if self._vectors_path.exists() and self._meta_path.exists():
+            with open(self._meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            matrix = np.load(self._vectors_path, mmap_mode="r")
+            if matrix.shape[0] != len(meta["ids"]):
+                raise ValueError(f"{self._vectors_path} has {matrix.shape[0]} rows but {len(meta['ids'])} ids")
+            self._matrix = matrix
+            self._size = matrix.shape[0]
+            self._ids = list(meta["ids"])
+            self._metadatas = list(meta["metadatas"])
+            self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        self._replay()
+
+    def _replay(self) -> None:
+        """Apply the journal on top of the snapshot; a torn last line (crash mid-append) is skipped."""
+        if not self._journal_path.exists():
+            return
+        with open(self._journal_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    logging.warning(f"Skipping a torn entry in {self._journal_path}")
+                    continue
+                self._journal_entries += 1
+                if "remove" in entry:
+                    self._drop(entry["remove"])
+                else:
+                    vector = np.frombuffer(base64.b64decode(entry["vector"]), dtype=np.float32)
+                    self._put(entry["id"], vector, entry["metadata"])
+
+    # --- Interface Methods ---
+
+    def count(self) -> int:
+        return self._size
+
+    def lookup(self, key: str) -> str | None:
+        return self._kv.get(key)
+
+    def store(self, key: str, value: str) -> None:
+        self._kv.put(key, value)
+
+    async def add(self, documents: Sequence[Skill]):
+        await self._initialize()
+        texts = [doc.description for doc in documents]
+        metadatas = [asdict(doc) for doc in documents]
+        ids = [doc.name for doc in documents]
+        await asyncio.to_thread(self._upsert, ids, texts, metadatas)
+        await asyncio.to_thread(self._manifest.record, documents)
+
+    async def get_all(self) -> List[Skill]:
+        valid, rejected = await self._verified()
+        if rejected:
+            logging.warning(f"Skipping skills that fail the manifest check (run repair to delete them): {rejected}")
+        return valid
+
+    async def repair(self) -> List[str]:
+        """Delete the stored skills whose code does not match the manifest; returns their names."""
+        _, rejected = await self._verified()
+        if rejected:
+            logging.warning(f"Deleting skills that fail the manifest check: {rejected}")
+            await asyncio.to_thread(self._remove, rejected)
+        return rejected
+
+    async def _verified(self) -> Tuple[List[Skill], List[str]]:
+        await self._initialize()
+        with self._lock:
+            skills = [Skill(**metadata) for metadata in self._metadatas[:self._size] if "code" in metadata]
+        return await asyncio.to_thread(self._manifest.verify, skills)
+
+    async def semantic_lookup(self, key: str, max_distance: float | None = None) -> str | None:
+        await self._initialize()
+        if self._size == 0:
+            return None
+        max_distance = self._score_threshold if max_distance is None else max_distance
+        hits = await asyncio.to_thread(self._search, key, 1)
+        if not hits or hits[0][1] > max_distance:
+            return None
+        return hits[0][0].get("value")
+
+    async def semantic_store(self, key: str, value: str) -> None:
+        await self._initialize()
+        doc_id = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        await asyncio.to_thread(self._upsert, [doc_id], [key], [{"key": key, "value": value}])
+
+    async def query(self, query: str, max_distance: float | None = None) -> Sequence[Skill]:
+        await self._initialize()
+        if self._size == 0:
+            return []
+        max_distance = self._score_threshold if max_distance is None else max_distance
+        hits = await asyncio.to_thread(self._search, query, self._retrieval_top_k)
+        return [Skill(**metadata) for metadata, distance in hits if distance <= max_distance]
+
+    async def query_many(self, queries: Sequence[str]) -> List[List[Skill]]:
+        """One batched embedding call and one matrix-matrix product for all of `queries`."""
+        await self._initialize()
+        if self._size == 0 or not queries:
+            return [[] for _ in queries]
+        hits = await asyncio.to_thread(self._search_many, list(queries), self._retrieval_top_k)
+        return [
+            [Skill(**metadata) for metadata, distance in query_hits if distance <= self._score_threshold]
+            for query_hits in hits
+        ]
+
+    async def clear(self) -> None:
+        await self._initialize()
+        with self._lock:
+            self._matrix = None
+            self._size = 0
+            self._ids = []
+            self._metadatas = []
+            self._rows = {}
+        self._kv.clear()
+        self._manifest.clear()
+        with self._write_lock:
+            for path in (self._vectors_path, self._meta_path, self._journal_path):
+                path.unlink(missing_ok=True)
+            self._journal_entries = 0
+
+    # --- index ---
+
+    def _search(self, text: str, k: int) -> List[Tuple[dict, float]]:
+        """Top-k (metadata, cosine distance) pairs, nearest first."""
+        query = np.asarray([self._embeddings.embed_query(text)], dtype=np.float32)
+        return self._top_k(query, k)[0]
+
+    def _search_many(self, texts: List[str], k: int) -> List[List[Tuple[dict, float]]]:
+        return self._top_k(np.asarray(embed_queries(self._embeddings, texts), dtype=np.float32), k)
+
+    def _top_k(self, queries: np.ndarray, k: int) -> List[List[Tuple[dict, float]]]:
+        queries = self._normalize(queries)
+        with self._lock:
+            if self._size == 0:
+                return [[] for _ in queries]
+            similarities = queries @ self._matrix[:self._size].T  # (queries, rows)
+            k = min(k, self._size)
+            top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+            results = []
+            for scores, candidates in zip(similarities, top):
+                candidates = candidates[np.argsort(-scores[candidates])]
+                results.append([(self._metadatas[row], float(1.0 - scores[row])) for row in candidates])
+            return results
+
+    def _upsert(self, ids: List[str], texts: List[str], metadatas: List[dict]) -> None:
+        vectors = self._normalize(np.asarray(self._embeddings.embed_documents(texts), dtype=np.float32))
+        with self._lock:
+            for doc_id, vector, metadata in zip(ids, vectors, metadatas):
+                self._put(doc_id, vector, metadata)
+        self._append([
+            {"id": doc_id, "metadata": metadata, "vector": base64.b64encode(vector.tobytes()).decode("ascii")}
+            for doc_id, vector, metadata in zip(ids, vectors, metadatas)
+        ])
+
+    def _put(self, doc_id: str, vector: np.ndarray, metadata: dict) -> None:
+        row = self._rows.get(doc_id)
+        if row is None:
+            row = self._size
+            self._reserve(row + 1, vector.shape[0])
+            self._size += 1
+            self._ids.append(doc_id)
+            self._metadatas.append(metadata)
+            self._rows[doc_id] = row
+        else:
+            self._reserve(self._size, vector.shape[0])  # make a loaded memmap writable
+            self._metadatas[row] = metadata
+        self._matrix[row] = vector
+
+    def _remove(self, ids: List[str]) -> None:
+        with self._lock:
+            removed = self._drop(ids)
+        if removed:
+            self._append([{"remove": list(ids)}])
+
+    def _drop(self, ids: List[str]) -> bool:
+        drop = {self._rows[doc_id] for doc_id in ids if doc_id in self._rows}
+        if not drop:
+            return False
+        keep = [row for row in range(self._size) if row not in drop]
+        self._matrix = np.array(self._matrix[keep], dtype=np.float32)
+        self._size = len(keep)
+        self._ids = [self._ids[row] for row in keep]
+        self._metadatas = [self._metadatas[row] for row in keep]
+        self._rows = {doc_id: row for row, doc_id in enumerate(self._ids)}
+        return True
+
+    def _reserve(self, rows: int, dim: int) -> None:
+        """Make `_matrix` a writable in-memory array with room for `rows` rows (amortised doubling)."""
+        writable = isinstance(self._matrix, np.ndarray) and not isinstance(self._matrix, np.memmap)
+        if writable and self._matrix.shape[0] >= rows:
+            return
+        capacity = max(rows, 2 * self._size, 64)
+        matrix = np.empty((capacity, dim), dtype=np.float32)
+        if self._matrix is not None:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def _append(self, entries: List[dict]) -> None:
+        with self._write_lock:
+            self._persist_dir.mkdir(parents=True, exist_ok=True)
+            with open(self._journal_path, "a", encoding="utf-8") as f:
+                f.write("".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in entries))
+            self._journal_entries += len(entries)
+            if self._journal_entries > max(self._compact_after, self._size):
+                self._snapshot()
+
+    async def compact(self) -> None:
+        """Fold the journal into a fresh snapshot."""
+        await self._initialize()
+        await asyncio.to_thread(self._compact)
+
+    def _compact(self) -> None:
+        with self._write_lock:
+            if self._journal_entries:
+                self._snapshot()
+
+    def _snapshot(self) -> None:
+        """Write the snapshot and truncate the journal; the caller holds `_write_lock`."""
+        with self._lock:
+            # rows a concurrent upsert rewrites after this point are journalled again
+            # once it gets `_write_lock`, so replay repairs anything torn here
+            matrix, size, ids, metadatas = self._matrix, self._size, list(self._ids), list(self._metadatas)
+        if size == 0:
+            for path in (self._vectors_path, self._meta_path):
+                path.unlink(missing_ok=True)
+        else:
+            self._persist_dir.mkdir(parents=True, exist_ok=True)
+            tmp_vectors = self._vectors_path.with_suffix(".tmp.npy")
+            tmp_meta = self._meta_path.with_suffix(".tmp.json")
+            np.save(tmp_vectors, matrix[:size])
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"ids": ids, "metadatas": metadatas}, f, ensure_ascii=False)
+            os.replace(tmp_vectors, self._vectors_path)
+            os.replace(tmp_meta, self._meta_path)
+        # a crash before this line replays the journal over the new snapshot: upserts are idempotent
+        self._journal_path.unlink(missing_ok=True)
+        self._journal_entries = 0
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+    # ---------- Show All ----------
+    def show_all(self) -> None:
+        for metadata in self._metadatas:
+            print(metadata)
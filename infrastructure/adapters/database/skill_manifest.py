@@ -0,0 +1,93 @@
+from __future__ import annotations
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from domain.models import Skill
+
+
+class SkillManifest:
+    """
+    JSON map of skill name -> sha256 of its code, kept next to a persisted library.
+
+    The database records every skill it stores; on resume, stored skills whose
+    code does not match are reported so they can be skipped (and removed by an
+    explicit repair). Skills the manifest never saw (a library written before
+    manifests existed, or a crash between the two writes) are adopted as they are.
+    """
+
+    def __init__(self, path: str | Path):
+        self._path = Path(path)
+        self._entries: Optional[Dict[str, str]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(code: str) -> str:
+        return hashlib.sha256(code.encode("utf-8")).hexdigest()
+
+    def _load(self) -> Dict[str, str]:
+        if self._entries is None:
+            self._entries = {}
+            if self._path.exists():
+                try:
+                    with open(self._path, "r", encoding="utf-8") as f:
+                        self._entries = json.load(f)
+                except (OSError, json.JSONDecodeError) as e:
+                    logging.warning(f"Unreadable skill manifest {self._path}: {e}; treating it as empty")
+        return self._entries
+
+    def record(self, skills: Iterable[Skill]) -> None:
+        with self._lock:
+            entries = self._load()
+            entries.update({skill.name: self.digest(skill.code) for skill in skills})
+            self._write(entries)
+
+    def forget(self, names: Iterable[str]) -> None:
+        with self._lock:
+            entries = self._load()
+            for name in names:
+                entries.pop(name, None)
+            self._write(entries)
+
+    def verify(self, skills: Sequence[Skill]) -> Tuple[List[Skill], List[str]]:
+        """
+        Split stored `skills` into (verified skills, names whose code does not match).
+        Unrecorded skills are recorded and count as verified.
+        """
+        with self._lock:
+            entries = self._load()
+            valid, rejected, adopted = [], [], []
+            for skill in skills:
+                recorded = entries.get(skill.name)
+                if recorded is None:
+                    entries[skill.name] = self.digest(skill.code)
+                    adopted.append(skill.name)
+                    valid.append(skill)
+                elif recorded == self.digest(skill.code):
+                    valid.append(skill)
+                else:
+                    rejected.append(skill.name)
+            if adopted:
+                self._write(entries)
+            missing = set(entries) - {skill.name for skill in skills}
+        if adopted:
+            logging.info(f"Recorded {len(adopted)} skills missing from {self._path}: {sorted(adopted)}")
+        if missing:
+            logging.warning(f"Skills in {self._path} but not in the library: {sorted(missing)}")
+        return valid, rejected
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries = {}
+            self._path.unlink(missing_ok=True)
+
+    def _write(self, entries: Dict[str, str]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, ensure_ascii=False, sort_keys=True)
+        os.replace(tmp, self._path)
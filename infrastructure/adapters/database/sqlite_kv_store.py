@@ -0,0 +1,124 @@
+from __future__ import annotations
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from domain.ports import KeyValuePort
+
+
+class SqliteKeyValueStore(KeyValuePort):
+    """
+    Embedded exact-match key/value store: SQLite in WAL mode behind an in-memory LRU.
+
+    - Each thread gets its own connection, so reads from worker threads never wait
+      on each other; every connection keeps its compiled statements in SQLite's
+      statement cache (`cached_statements`), so a lookup is a cache hit or one
+      prepared-statement step.
+    - `namespace` keeps several logical stores (one per collection) in one file.
+    - Writes go through to disk before returning; the LRU holds the hottest
+      `lru_size` entries written or read through this instance.
+    """
+
+    _SELECT = "SELECT value FROM kv WHERE namespace = ? AND key = ?"
+    _UPSERT = "INSERT OR REPLACE INTO kv (namespace, key, value) VALUES (?, ?, ?)"
+
+    def __init__(
+        self,
+        path: str | Path = "ckpt/kv.sqlite3",
+        *,
+        namespace: str = "default",
+        lru_size: int = 4096,
+    ):
+        self._path = Path(path)
+        self._namespace = namespace
+        self._lru_size = lru_size
+        self._lru: OrderedDict[str, str] = OrderedDict()
+        self._lru_lock = threading.Lock()
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+            "PRIMARY KEY (namespace, key)) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                str(self._path),
+                check_same_thread=False,
+                isolation_level=None,
+                timeout=30.0,
+                cached_statements=64,
+            )
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def __len__(self) -> int:
+        return self._connection().execute(
+            "SELECT COUNT(*) FROM kv WHERE namespace = ?", (self._namespace,)
+        ).fetchone()[0]
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "lru_entries": len(self._lru)}
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lru_lock:
+            value = self._lru.get(key)
+            if value is not None:
+                self._lru.move_to_end(key)
+                self.hits += 1
+                return value
+        row = self._connection().execute(self._SELECT, (self._namespace, key)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._remember(key, row[0])
+        return row[0]
+
+    def put(self, key: str, value: str) -> None:
+        self._connection().execute(self._UPSERT, (self._namespace, key, value))
+        self._remember(key, value)
+
+    # KeyValuePort
+    lookup = get
+    store = put
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM kv WHERE namespace = ? AND key = ?", (self._namespace, key))
+        with self._lru_lock:
+            self._lru.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove every entry of this namespace."""
+        self._connection().execute("DELETE FROM kv WHERE namespace = ?", (self._namespace,))
+        with self._lru_lock:
+            self._lru.clear()
+
+    def _remember(self, key: str, value: str) -> None:
+        with self._lru_lock:
+            self._lru[key] = value
+            self._lru.move_to_end(key)
+            while len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+
+    def close(self) -> None:
+        with self._connections_lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+        self._local = threading.local()
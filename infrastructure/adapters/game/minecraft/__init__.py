@@ -2,5 +2,10 @@ from .minecraft_observation_builder import MinecraftObservationBuilder
 from .mineflayer_environment import MineflayerEnvironment
 from .mineflayer_process import MineflayerProcessManager
 from .mineflayer_api_client import MineflayerAPIClient
+from .node_syntax_checker import NodeSyntaxChecker
+from .minecraft_names import load_minecraft_names
 
-__all__ = ["MinecraftObservationBuilder", "MineflayerEnvironment", "MineflayerProcessManager", "MineflayerAPIClient"]
\ No newline at end of file
+__all__ = [
+    "MinecraftObservationBuilder", "MineflayerEnvironment", "MineflayerProcessManager", "MineflayerAPIClient",
+    "NodeSyntaxChecker", "load_minecraft_names",
+]
\ No newline at end of file
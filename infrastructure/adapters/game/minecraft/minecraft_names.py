@@ -0,0 +1,40 @@
+import json
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, FrozenSet
+
+DATA_DIR = Path(__file__).parent / "data"
+KINDS = ("item", "block", "entity")
+
+
+@lru_cache(maxsize=None)
+def load_minecraft_names(version: str = "1.18.1") -> Dict[str, FrozenSet[str]]:
+    """Item, block and entity names of `version` from the bundled index, keyed by kind."""
+    with open(DATA_DIR / f"names_{version}.json", encoding="utf-8") as f:
+        index = json.load(f)
+    return {kind: frozenset(index[kind]) for kind in KINDS}
+
+
+def build_index(minecraft_data_dir: Path, version: str) -> dict:
+    """
+    Name index of a pc `version` from a minecraft-data checkout (its `data` directory,
+    the one holding `dataPaths.json`).
+    """
+    paths = json.loads((minecraft_data_dir / "dataPaths.json").read_text(encoding="utf-8"))["pc"][version]
+
+    def names(kind: str) -> list:
+        entries = json.loads((minecraft_data_dir / paths[kind] / f"{kind}.json").read_text(encoding="utf-8"))
+        return sorted({entry["name"] for entry in entries})
+
+    return {"version": version, "item": names("items"), "block": names("blocks"), "entity": names("entities")}
+
+
+if __name__ == "__main__":
+    # python -m infrastructure.adapters.game.minecraft.minecraft_names <minecraft-data>/data 1.18.1
+    import sys
+
+    data_dir, version = Path(sys.argv[1]), sys.argv[2] if len(sys.argv) > 2 else "1.18.1"
+    DATA_DIR.mkdir(exist_ok=True)
+    with open(DATA_DIR / f"names_{version}.json", "w", encoding="utf-8") as f:
+        json.dump(build_index(data_dir, version), f, indent=0)
+        f.write("\n")
@@ -27,6 +27,13 @@ console.log("--- All modules loaded ---");
 let bot = null;
 let mcData;
 
+// One server per bot. Server i of a multi-agent run uses MINEFLAYER_INDEX=i:
+// API on 3000 + 3i, viewer on 3001 + 3i, inventory on 3002 + 3i (each overridable).
+const serverIndex = Number(process.env.MINEFLAYER_INDEX || 0);
+const port = Number(process.env.MINEFLAYER_PORT || 3000 + 3 * serverIndex);
+const viewerPort = Number(process.env.VIEWER_PORT || 3001 + 3 * serverIndex);
+const inventoryPort = Number(process.env.INVENTORY_PORT || 3002 + 3 * serverIndex);
+
 const app = express();
 
 app.use(bodyParser.json({ limit: "50mb" }));
@@ -43,13 +50,13 @@ app.post("/start", (req, res) => {
     bot = mineflayer.createBot({
         host: "localhost", // minecraft server ip
         port: req.body.port, // minecraft server port
-        username: "bot",
+        username: req.body.username || "bot",
         version: "1.18.1",
         viewDistance: 'far',
         disableChatSigning: true,
         checkTimeoutInterval: 10 * 60 * 1000,
     });
-    inventoryViewer(bot, { port: 3002, host: '0.0.0.0' });
+    inventoryViewer(bot, { port: inventoryPort, host: '0.0.0.0' });
     
     // Initialize mcData immediately since we know the version
     mcData = require("minecraft-data")("1.18.1");
@@ -86,7 +93,7 @@ app.post("/start", (req, res) => {
         console.log("✅ Bot spawned");
 
         MineflayerViewer(bot, {
-            port: 3001,
+            port: viewerPort,
             firstPerson: true,
             host: '0.0.0.0',
             viewDistance: 10,
@@ -96,7 +103,7 @@ app.post("/start", (req, res) => {
             staticPath: path.join(__dirname, 'node_modules/prismarine-viewer/public')
         });
         
-        console.log("--- MineflayerViewer started on port 3001 ---");
+        console.log(`--- MineflayerViewer started on port ${viewerPort} ---`);
         await bot.waitForTicks(10);
         bot.chat('/tick freeze');
 
@@ -577,7 +584,6 @@ app.post("/pause", (req, res) => {
 
 console.log("--- Express routes configured ---");
 
-const port = 3000;
 app.listen(port, () => {
     console.log(`✅ Mineflayer Express Server is running on port ${port}`);
 });
\ No newline at end of file
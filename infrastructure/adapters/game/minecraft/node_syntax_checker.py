@@ -0,0 +1,77 @@
+import asyncio
+import itertools
+import json
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from domain.ports import SyntaxCheckerPort
+
+WORKER_SCRIPT = Path(__file__).parent / "syntax_worker.js"
+
+
+class NodeSyntaxChecker(SyntaxCheckerPort):
+    """
+    Compiles generated JavaScript with `vm.Script` in one long-lived `node`
+    process (`syntax_worker.js`), so a check costs a pipe round trip instead of
+    a process start. Checks are serialized; the worker is started on first use
+    and restarted after a crash or timeout. Without `node` on the PATH every
+    check is skipped.
+    """
+
+    def __init__(self, node: str = "node", timeout: float = 5.0):
+        self._node = node
+        self._timeout = timeout
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+        self._ids = itertools.count(1)
+        self._unavailable = False
+
+    async def check(self, code: str) -> Optional[str]:
+        async with self._lock:
+            process = await self._worker()
+            if process is None:
+                return None
+            request_id = next(self._ids)
+            try:
+                process.stdin.write(json.dumps({"id": request_id, "code": code}).encode("utf-8") + b"\n")
+                await process.stdin.drain()
+                line = await asyncio.wait_for(process.stdout.readline(), self._timeout)
+                if not line:
+                    raise ConnectionError("syntax worker exited")
+            except (asyncio.TimeoutError, ConnectionError) as e:
+                logging.warning(f"Syntax check skipped: {e!r}")
+                await self._stop()
+                return None
+            return json.loads(line)["error"]
+
+    async def close(self) -> None:
+        async with self._lock:
+            await self._stop()
+
+    async def _worker(self) -> Optional[asyncio.subprocess.Process]:
+        if self._process is not None and self._process.returncode is None:
+            return self._process
+        if self._unavailable:
+            return None
+        if shutil.which(self._node) is None:
+            logging.warning(f"'{self._node}' not found; generated code will not be syntax checked.")
+            self._unavailable = True
+            return None
+        self._process = await asyncio.create_subprocess_exec(
+            self._node, str(WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            # compile errors come back on stdout; keep node's own noise out of the agent's stderr
+            stderr=asyncio.subprocess.DEVNULL,
+        )
+        return self._process
+
+    async def _stop(self) -> None:
+        if self._process is None:
+            return
+        if self._process.returncode is None:
+            self._process.kill()
+            await self._process.wait()
+        self._process = None
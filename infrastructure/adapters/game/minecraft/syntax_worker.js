@@ -0,0 +1,25 @@
+// Long-lived syntax checker for generated programs.
+// Reads one JSON request per line on stdin ({ id, code }) and writes one JSON reply
+// per line on stdout ({ id, error }). The code is compiled inside the same async
+// wrapper the Mineflayer server evaluates it in, so top-level `await` is allowed,
+// but it is never run.
+const readline = require("readline");
+const vm = require("vm");
+
+const FILENAME = "generated_code.js";
+
+function check(code) {
+    try {
+        new vm.Script(`(async () => {\n${code}\n})()`, { filename: FILENAME });
+        return null;
+    } catch (e) {
+        const line = /generated_code\.js:(\d+)/.exec(e.stack || "");
+        const where = line ? ` (line ${Number(line[1]) - 1})` : "";
+        return `${e.name}: ${e.message}${where}`;
+    }
+}
+
+readline.createInterface({ input: process.stdin }).on("line", (line) => {
+    const { id, code } = JSON.parse(line);
+    process.stdout.write(JSON.stringify({ id, error: check(code) }) + "\n");
+});
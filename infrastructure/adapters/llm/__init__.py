@@ -1,4 +1,12 @@
-from .ollama_llm import LangchainOllamaLLM
+from .ollama_llm import OllamaLLM, LangchainOllamaLLM
 from .gemini_llm import GeminiLLM
+from .caching_llm import CachingLLM, SqliteResponseCache
+from .rate_limited_llm import QuotaScheduler, RateLimitedLLM
+from .resilient_llm import ResilientLLM, LatencyTracker
+from .model_router import ModelRouter
+from .instrumented_llm import InstrumentedLLM
 
-__all__ = ["LangchainOllamaLLM", "GeminiLLM"]
\ No newline at end of file
+__all__ = [
+    "OllamaLLM", "LangchainOllamaLLM", "GeminiLLM", "CachingLLM", "SqliteResponseCache", "QuotaScheduler", "RateLimitedLLM",
+    "ResilientLLM", "LatencyTracker", "ModelRouter", "InstrumentedLLM",
+]
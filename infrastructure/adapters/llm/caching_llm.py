@@ -0,0 +1,183 @@
+from __future__ import annotations
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Optional, Sequence
+
+from domain.exceptions import LLMError
+from domain.ports.llm_port import LLMPort, sampling
+from domain.models import Message
+
+CACHE_MODES = ("read_write", "record", "replay")
+
+
+class SqliteResponseCache:
+    """
+    Content-addressed reply store in a SQLite file, shared by every `CachingLLM`
+    that points at it. Evicts least recently used entries beyond `max_entries`
+    and treats entries older than `ttl_seconds` as misses.
+    """
+
+    def __init__(
+        self,
+        path: str | Path = "ckpt/llm_cache.sqlite3",
+        *,
+        max_entries: int = 10_000,
+        ttl_seconds: Optional[float] = None,
+        clock: Callable[[], float] = time.time,
+    ):
+        self._max_entries = max_entries
+        self._ttl_seconds = ttl_seconds
+        self._clock = clock
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, content TEXT NOT NULL, created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses(accessed_at)")
+        self._size = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._size
+
+    def get(self, key: str) -> Optional[str]:
+        now = self._clock()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            content, created_at = row
+            if self._ttl_seconds is not None and now - created_at > self._ttl_seconds:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._size -= 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+            return content
+
+    def put(self, key: str, content: str) -> None:
+        now = self._clock()
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM responses WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, content, created_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, content, now, now),
+            )
+            if not existed:
+                self._size += 1
+            if self._size > self._max_entries:
+                overflow = self._size - self._max_entries
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self._size -= overflow
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+class CachingLLM(LLMPort):
+    """
+    `LLMPort` decorator that memoises replies in a `SqliteResponseCache`.
+
+    The key is a hash of (model, role, content) over the whole message sequence,
+    so identical QA / curriculum / skill-description prompts are answered from
+    disk across restarts.
+
+    Modes:
+    - "read_write": serve hits, call the wrapped LLM on misses and store the reply.
+    - "record":     always call the wrapped LLM and overwrite the stored reply.
+    - "replay":     never call the wrapped LLM; a miss raises `LLMError`.
+    """
+
+    def __init__(
+        self,
+        llm: LLMPort,
+        cache: SqliteResponseCache | str | Path = "ckpt/llm_cache.sqlite3",
+        *,
+        model_name: Optional[str] = None,
+        mode: str = "read_write",
+    ):
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown cache mode: {mode}. Expected one of {CACHE_MODES}")
+        self._llm = llm
+        self._cache = cache if isinstance(cache, SqliteResponseCache) else SqliteResponseCache(cache)
+        self._model_name = model_name or getattr(llm, "model_name", type(llm).__name__)
+        self._mode = mode
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model_name(self) -> str:
+        return self._model_name
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._llm.supports_streaming
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._cache)}
+
+    def key_for(self, messages: Sequence[Message], temperature: Optional[float] = None) -> str:
+        """An explicit temperature is part of the key; the model default keeps the original key."""
+        entry = [self._model_name, [[m.role, m.content] for m in messages]]
+        if temperature is not None:
+            entry.append(temperature)
+        payload = json.dumps(
+            entry,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        key = self.key_for(messages, temperature)
+
+        if self._mode != "record":
+            content = self._cache.get(key)
+            if content is not None:
+                self.hits += 1
+                return Message(role="assistant", content=content)
+
+        self.misses += 1
+        if self._mode == "replay":
+            raise LLMError(f"LLM cache miss in replay mode (key={key[:12]})")
+
+        response = await self._llm.chat(messages, **sampling(temperature))
+        self._cache.put(key, response.content)
+        return response
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        key = self.key_for(messages, temperature)
+
+        if self._mode != "record":
+            content = self._cache.get(key)
+            if content is not None:
+                self.hits += 1
+                yield content
+                return
+
+        self.misses += 1
+        if self._mode == "replay":
+            raise LLMError(f"LLM cache miss in replay mode (key={key[:12]})")
+
+        chunks = []
+        stream = self._llm.chat_stream(messages, **sampling(temperature))
+        try:
+            async for chunk in stream:
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            await stream.aclose()
+        # only reached when the consumer read the whole reply; partial replies are not cached
+        self._cache.put(key, "".join(chunks))
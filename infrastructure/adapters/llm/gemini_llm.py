@@ -1,45 +1,247 @@
-from langchain_google_genai import ChatGoogleGenerativeAI
-import os
 import asyncio
-from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
+import json
+import logging
+import os
+import time
+from typing import AsyncIterator, Dict, Optional, Sequence, Set, Tuple
+
+import httpx
 
+from domain.exceptions import LLMError, RateLimitError, TransientLLMError
 from domain.ports.llm_port import LLMPort
 from domain.models import Message
-from typing import Sequence
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
 
 
 class GeminiLLM(LLMPort):
-    def __init__(self, model_name: str = "gemini-1.5-pro-latest"):
+    """
+    Async-native adapter for the Gemini `generateContent` REST endpoint.
+
+    - Every instance talks through one pooled `httpx.AsyncClient` (shared across
+      instances unless a client is injected), so no worker thread is held per call.
+    - `max_concurrency` bounds the in-flight requests of the instance. Build one
+      instance per model and share it between services to get a per-model limit.
+    - `context_cache=True` stores a system message's static prefix (`Message.prefix_len`)
+      as a Gemini `cachedContents` entry, keyed by `Message.prefix_hash`, and reuses it
+      while it lives. Prefixes shorter than `min_cached_prefix_chars` are sent as is,
+      since the API rejects caches below a minimum token count: 32,768 tokens for
+      the Gemini 1.5 models, about 131k characters at ~4 characters per token.
+    """
+
+    _shared_client: Optional[httpx.AsyncClient] = None
+    supports_streaming = True
+
+    def __init__(
+        self,
+        model_name: str = "gemini-1.5-pro-latest",
+        *,
+        api_key: Optional[str] = None,
+        base_url: str = GEMINI_BASE_URL,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = 8,
+        timeout: float = 120.0,
+        context_cache: bool = False,
+        cache_ttl: float = 3600.0,
+        min_cached_prefix_chars: int = 131_072,
+    ):
         self.model_name = model_name
-        # Defer client initialization
-        self._llm = None
+        self._api_key = api_key
+        self._base_url = base_url.rstrip("/")
+        self._client = client
+        self._timeout = timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._context_cache = context_cache
+        self._cache_ttl = cache_ttl
+        self._min_cached_prefix_chars = min_cached_prefix_chars
+        # prefix hash -> (cachedContents name, local expiry)
+        self._cached_contents: Dict[str, Tuple[str, float]] = {}
+        self._uncacheable: Set[str] = set()
+        self._cache_lock = asyncio.Lock()
+        # prompt tokens served from cachedContents, as reported by the API
+        self.cached_prompt_tokens = 0
+
+    @classmethod
+    def shared_client(cls) -> httpx.AsyncClient:
+        """Return the process-wide pooled client, creating it on first use."""
+        if cls._shared_client is None or cls._shared_client.is_closed:
+            cls._shared_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+            )
+        return cls._shared_client
+
+    @classmethod
+    async def close_shared_client(cls) -> None:
+        if cls._shared_client is not None:
+            await cls._shared_client.aclose()
+            cls._shared_client = None
 
     @property
-    def llm(self):
-        # Initialize the client only when it's first accessed
-        if self._llm is None:
-            self._llm = ChatGoogleGenerativeAI(model=self.model_name, google_api_key=os.getenv("GOOGLE_API_KEY"))
-        return self._llm
-
-    async def chat(self, messages: Sequence[Message]) -> Message:
-        langchain_messages = [self._to_langchain(message) for message in messages]
-        
-        # Run the synchronous invoke method in a separate thread
-        response = await asyncio.to_thread(self.llm.invoke, langchain_messages)
-        
-        return Message(role="assistant", content=response.content)
-
-    def _to_langchain(self, m: Message):
-        if m.role == "system":
-            return SystemMessage(content=m.content)
-        elif m.role == "user":
-            return HumanMessage(content=m.content)
-        elif m.role == "assistant":
-            return AIMessage(content=m.content)
-        else:
-            raise ValueError(f"Unknown role: {m.role}")
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else self.shared_client()
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        url = f"{self._base_url}/v1beta/models/{self.model_name}:generateContent"
+        body = self._to_request(messages, await self._cached_content_for(messages), temperature=temperature)
+        async with self._semaphore:
+            try:
+                response = await self.client.post(
+                    url,
+                    json=body,
+                    headers=self._headers(),
+                    timeout=self._timeout,
+                )
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise self._status_error(e.response) from e
+            except httpx.RequestError as e:
+                raise TransientLLMError(f"Gemini request failed: {e!r}") from e
+
+        data = response.json()
+        self._record_usage(data)
+        return Message(role="assistant", content=self._extract_text(data))
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """Stream the reply over SSE; closing the iterator closes the connection and stops generation."""
+        url = f"{self._base_url}/v1beta/models/{self.model_name}:streamGenerateContent"
+        body = self._to_request(messages, await self._cached_content_for(messages), temperature=temperature)
+        async with self._semaphore:
+            try:
+                async with self.client.stream(
+                    "POST",
+                    url,
+                    params={"alt": "sse"},
+                    json=body,
+                    headers=self._headers(),
+                    timeout=self._timeout,
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                        raise self._status_error(response)
+                    async for line in response.aiter_lines():
+                        if not line.startswith("data:"):
+                            continue
+                        data = json.loads(line[len("data:"):])
+                        self._record_usage(data)
+                        if not data.get("candidates"):
+                            continue  # e.g. a trailing usage-only chunk
+                        text = self._extract_text(data)
+                        if text:
+                            yield text
+            except httpx.RequestError as e:
+                raise TransientLLMError(f"Gemini request failed: {e!r}") from e
+
+    async def _cached_content_for(self, messages: Sequence[Message]) -> Optional[str]:
+        """Name of the `cachedContents` entry holding the system prefix, creating it if needed."""
+        if not self._context_cache:
+            return None
+        system = next((m for m in messages if m.role == "system"), None)
+        if system is None or system.prefix_len < self._min_cached_prefix_chars:
+            return None
+        key = system.prefix_hash
+        if key in self._uncacheable:
+            return None
+
+        async with self._cache_lock:
+            entry = self._cached_contents.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                return entry[0]
+            try:
+                response = await self.client.post(
+                    f"{self._base_url}/v1beta/cachedContents",
+                    json={
+                        "model": f"models/{self.model_name}",
+                        "displayName": f"prefix-{key[:16]}",
+                        "systemInstruction": {"parts": [{"text": system.prefix}]},
+                        "ttl": f"{int(self._cache_ttl)}s",
+                    },
+                    headers=self._headers(),
+                    timeout=self._timeout,
+                )
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code < 500:
+                    # e.g. prefix below the model's minimum cache size; don't ask again
+                    self._uncacheable.add(key)
+                logging.warning(f"Could not create Gemini context cache: {e.response.status_code} {e.response.text}")
+                return None
+            except httpx.RequestError as e:
+                logging.warning(f"Could not create Gemini context cache: {e!r}")
+                return None
+
+            name = response.json()["name"]
+            # renew a little before the provider drops it
+            self._cached_contents[key] = (name, time.monotonic() + 0.9 * self._cache_ttl)
+            logging.info(f"Created Gemini context cache {name} for a {system.prefix_len} character prefix")
+            return name
+
+    def _record_usage(self, data: dict) -> None:
+        self.cached_prompt_tokens += data.get("usageMetadata", {}).get("cachedContentTokenCount", 0)
+
+    def _headers(self) -> dict:
+        return {"x-goog-api-key": self._api_key or os.getenv("GOOGLE_API_KEY", "")}
+
+    def _status_error(self, response: httpx.Response) -> LLMError:
+        message = f"Gemini returned {response.status_code}: {response.text}"
+        if response.status_code == 429:
+            try:
+                retry_after = float(response.headers["retry-after"])
+            except (KeyError, ValueError):
+                retry_after = None
+            return RateLimitError(message, retry_after=retry_after)
+        if response.status_code >= 500 or response.status_code == 408:
+            return TransientLLMError(message)
+        return LLMError(message)
+
+    def _to_request(
+        self,
+        messages: Sequence[Message],
+        cached_content: Optional[str] = None,
+        *,
+        temperature: Optional[float] = None,
+    ) -> dict:
+        """With `cached_content`, the first system message's prefix comes from the cache."""
+        system_parts = []
+        contents = []
+        prefix_cached = cached_content is not None
+        for m in messages:
+            if m.role == "system":
+                if prefix_cached:
+                    prefix_cached = False
+                    if m.content[m.prefix_len:].strip():
+                        system_parts.append({"text": m.content[m.prefix_len:]})
+                else:
+                    system_parts.append({"text": m.content})
+            elif m.role == "user":
+                contents.append({"role": "user", "parts": [{"text": m.content}]})
+            elif m.role == "assistant":
+                contents.append({"role": "model", "parts": [{"text": m.content}]})
+            else:
+                raise ValueError(f"Unknown role: {m.role}")
+
+        body = {"contents": contents}
+        if cached_content is not None:
+            # a request using cachedContent may not carry its own systemInstruction,
+            # so the dynamic rest of the system message leads the first turn
+            body["cachedContent"] = cached_content
+            if system_parts and contents:
+                contents[0]["parts"] = system_parts + contents[0]["parts"]
+            elif system_parts:
+                contents.append({"role": "user", "parts": system_parts})
+        elif system_parts:
+            body["systemInstruction"] = {"parts": system_parts}
+        if temperature is not None:
+            body["generationConfig"] = {"temperature": temperature}
+        return body
+
+    def _extract_text(self, data: dict) -> str:
+        candidates = data.get("candidates") or []
+        if not candidates:
+            raise LLMError(f"Gemini returned no candidates: {data.get('promptFeedback', data)}")
+        parts = candidates[0].get("content", {}).get("parts", [])
+        return "".join(part.get("text", "") for part in parts)
 
 
 if __name__ == "__main__":
     llm = GeminiLLM()
-    print(llm.chat([Message(role="user", content="Write a haiku about AI and summer.")]))
+    print(asyncio.run(llm.chat([Message(role="user", content="Write a haiku about AI and summer.")])))
@@ -0,0 +1,63 @@
+from __future__ import annotations
+import asyncio
+import time
+from typing import AsyncIterator, Optional, Sequence
+
+from domain.models import Message
+from domain.ports.llm_port import LLMPort, sampling
+from infrastructure.metrics import LLM_CALL_SECONDS, Histogram
+
+
+class InstrumentedLLM(LLMPort):
+    """
+    `LLMPort` decorator recording the latency of every call of one service in
+    `histogram` (labels: service, outcome = ok / error / cancelled / closed_early).
+    A stream is timed until it is exhausted or closed; one the consumer closes
+    before its end (the planner stops at the closing code fence) is
+    `closed_early`, and `cancelled` is kept for task cancellation.
+    """
+
+    def __init__(self, llm: LLMPort, service: str, histogram: Histogram = LLM_CALL_SECONDS):
+        self._llm = llm
+        self._service = service
+        self._histogram = histogram
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self._llm, "model_name", type(self._llm).__name__)
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._llm.supports_streaming
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await self._llm.chat(messages, **sampling(temperature))
+            outcome = "ok"
+            return response
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        finally:
+            self._histogram.observe(time.perf_counter() - start, self._service, outcome)
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        start = time.perf_counter()
+        outcome = "error"
+        stream = self._llm.chat_stream(messages, **sampling(temperature))
+        try:
+            async for chunk in stream:
+                yield chunk
+            outcome = "ok"
+        except asyncio.CancelledError:
+            outcome = "cancelled"
+            raise
+        except GeneratorExit:
+            # aclose() by the consumer once it has what it needs
+            outcome = "closed_early"
+            raise
+        finally:
+            await stream.aclose()
+            self._histogram.observe(time.perf_counter() - start, self._service, outcome)
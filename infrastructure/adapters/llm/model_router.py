@@ -0,0 +1,115 @@
+from __future__ import annotations
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional
+
+import yaml
+
+from domain.ports.llm_port import LLMPort
+from .gemini_llm import GeminiLLM
+from .ollama_llm import OllamaLLM
+from .rate_limited_llm import QuotaScheduler
+from .resilient_llm import ResilientLLM
+
+PROVIDERS: Dict[str, Callable[..., LLMPort]] = {
+    "gemini": GeminiLLM,
+    "ollama": OllamaLLM,
+}
+
+
+class ModelRouter:
+    """
+    Builds the `LLMPort` of each service from a declarative config:
+
+        models:     {<name>: {provider, model, rate_limits?, **adapter options}}
+        routes:     {<service>: <model name>}
+        resilience: {**ResilientLLM options, services: {<service>: {**overrides}}}  (optional)
+
+    One adapter (and one `QuotaScheduler` when `rate_limits` is set) is built per
+    model and shared by every service routed to it. With `resilience`, each service
+    gets its own `ResilientLLM` on top, so deadlines, retries and hedges go through
+    the quota; on a rate-limited model the scheduler alone retries 429s.
+    """
+
+    def __init__(
+        self,
+        models: Mapping[str, Mapping[str, Any]],
+        routes: Mapping[str, str],
+        *,
+        resilience: Optional[Mapping[str, Any]] = None,
+        providers: Mapping[str, Callable[..., LLMPort]] = PROVIDERS,
+    ):
+        for service, model in routes.items():
+            if model not in models:
+                raise ValueError(f"Route {service!r} points to unknown model {model!r}")
+        for name, spec in models.items():
+            if spec.get("provider") not in providers:
+                raise ValueError(f"Model {name!r} has unknown provider {spec.get('provider')!r}")
+            if "model" not in spec:
+                raise ValueError(f"Model {name!r} is missing 'model'")
+
+        self._models = {name: dict(spec) for name, spec in models.items()}
+        self._routes = dict(routes)
+        self._resilience = dict(resilience) if resilience is not None else None
+        self._providers = providers
+        self._backends: Dict[str, LLMPort] = {}
+        self._schedulers: Dict[str, QuotaScheduler] = {}
+
+    @classmethod
+    def from_yaml(cls, path: str | Path, **kwargs) -> "ModelRouter":
+        with open(path, "r", encoding="utf-8") as f:
+            config = yaml.safe_load(f) or {}
+        return cls(config.get("models", {}), config.get("routes", {}), resilience=config.get("resilience"), **kwargs)
+
+    @property
+    def routes(self) -> Dict[str, str]:
+        return dict(self._routes)
+
+    def model_for(self, service: str) -> str:
+        """Provider model id serving `service`."""
+        return self._models[self._route(service)]["model"]
+
+    def backend(self, name: str) -> LLMPort:
+        """Adapter for the model `name`, built on first use."""
+        if name not in self._backends:
+            spec = dict(self._models[name])
+            provider = spec.pop("provider")
+            model = spec.pop("model")
+            spec.pop("rate_limits", None)
+            self._backends[name] = self._providers[provider](model, **spec)
+            logging.info(f"Built {provider} backend {name!r} ({model})")
+        return self._backends[name]
+
+    def scheduler(self, name: str) -> Optional[QuotaScheduler]:
+        """Quota scheduler shared by every service on model `name`, if it has rate limits."""
+        rate_limits = self._models[name].get("rate_limits")
+        if rate_limits is None:
+            return None
+        if name not in self._schedulers:
+            self._schedulers[name] = QuotaScheduler(
+                rate_limits["requests_per_minute"],
+                rate_limits["tokens_per_minute"],
+            )
+        return self._schedulers[name]
+
+    def llm_for(self, service: str) -> LLMPort:
+        """The `LLMPort` `service` should talk to."""
+        name = self._route(service)
+        llm = self.backend(name)
+        scheduler = self.scheduler(name)
+        if scheduler is not None:
+            llm = scheduler.bind(llm, service)
+        if self._resilience is not None:
+            options = {k: v for k, v in self._resilience.items() if k != "services"}
+            options.update((self._resilience.get("services") or {}).get(service, {}))
+            if scheduler is not None:
+                # the scheduler re-queues a 429 behind the provider's retry_after; retrying it here too multiplies the sends
+                options["retry_rate_limits"] = False
+            llm = ResilientLLM(llm, service=service, **options)
+        return llm
+
+    def _route(self, service: str) -> str:
+        try:
+            return self._routes[service]
+        except KeyError:
+            raise KeyError(f"No model route for service {service!r}. Known routes: {list(self._routes)}") from None
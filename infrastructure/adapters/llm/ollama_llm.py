@@ -1,20 +1,162 @@
+import asyncio
+import json
+import os
+from typing import AsyncIterator, Optional, Sequence, Union
+
+import httpx
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage
 from langchain_ollama import ChatOllama
 
+from domain.exceptions import LLMError, TransientLLMError
 from domain.ports.llm_port import LLMPort
 from domain.models import Message
-from typing import Sequence
+
+OLLAMA_BASE_URL = "http://localhost:11434"
+
+
+class OllamaLLM(LLMPort):
+    """
+    Async-native adapter for the Ollama `/api/chat` endpoint.
+
+    - One pooled `httpx.AsyncClient` per process (unless a client is injected) keeps
+      the connection to the local server open between calls.
+    - `keep_alive` is sent with every request so the model stays loaded in memory
+      between calls instead of being reloaded after Ollama's 5 minute default.
+    - `max_concurrency` bounds in-flight generations; match it to OLLAMA_NUM_PARALLEL.
+    """
+
+    _shared_client: Optional[httpx.AsyncClient] = None
+    supports_streaming = True
+
+    def __init__(
+        self,
+        model_name: str = "llama3",
+        *,
+        base_url: Optional[str] = None,
+        client: Optional[httpx.AsyncClient] = None,
+        max_concurrency: int = 2,
+        keep_alive: Union[str, int] = "30m",
+        timeout: float = 300.0,
+        options: Optional[dict] = None,
+    ):
+        self.model_name = model_name
+        self._base_url = (base_url or os.getenv("OLLAMA_HOST") or OLLAMA_BASE_URL).rstrip("/")
+        self._client = client
+        self._keep_alive = keep_alive
+        self._timeout = timeout
+        self._options = options or {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    @classmethod
+    def shared_client(cls) -> httpx.AsyncClient:
+        """Return the process-wide pooled client, creating it on first use."""
+        if cls._shared_client is None or cls._shared_client.is_closed:
+            cls._shared_client = httpx.AsyncClient(
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16),
+            )
+        return cls._shared_client
+
+    @classmethod
+    async def close_shared_client(cls) -> None:
+        if cls._shared_client is not None:
+            await cls._shared_client.aclose()
+            cls._shared_client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        return self._client if self._client is not None else self.shared_client()
+
+    async def warm_up(self) -> None:
+        """Load the model into memory ahead of the first real call (a chat request without messages)."""
+        await self._post({"model": self.model_name, "messages": [], "stream": False, "keep_alive": self._keep_alive})
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        data = await self._post(self._to_request(messages, stream=False, temperature=temperature))
+        return Message(role="assistant", content=data.get("message", {}).get("content", ""))
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """Stream the NDJSON reply; closing the iterator closes the connection and stops generation."""
+        async with self._semaphore:
+            try:
+                async with self.client.stream(
+                    "POST",
+                    f"{self._base_url}/api/chat",
+                    json=self._to_request(messages, stream=True, temperature=temperature),
+                    timeout=self._timeout,
+                ) as response:
+                    if response.is_error:
+                        await response.aread()
+                        raise self._status_error(response)
+                    async for line in response.aiter_lines():
+                        if not line.strip():
+                            continue
+                        data = json.loads(line)
+                        if "error" in data:
+                            raise LLMError(f"Ollama error: {data['error']}")
+                        text = data.get("message", {}).get("content", "")
+                        if text:
+                            yield text
+                        if data.get("done"):
+                            return
+            except httpx.RequestError as e:
+                raise TransientLLMError(f"Ollama request failed: {e!r}") from e
+
+    async def _post(self, body: dict) -> dict:
+        async with self._semaphore:
+            try:
+                response = await self.client.post(f"{self._base_url}/api/chat", json=body, timeout=self._timeout)
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                raise self._status_error(e.response) from e
+            except httpx.RequestError as e:
+                raise TransientLLMError(f"Ollama request failed: {e!r}") from e
+        return response.json()
+
+    def _status_error(self, response: httpx.Response) -> LLMError:
+        message = f"Ollama returned {response.status_code}: {response.text}"
+        if response.status_code >= 500:
+            return TransientLLMError(message)
+        return LLMError(message)
+
+    def _to_request(self, messages: Sequence[Message], stream: bool, temperature: Optional[float] = None) -> dict:
+        for m in messages:
+            if m.role not in ("system", "user", "assistant"):
+                raise ValueError(f"Unknown role: {m.role}")
+        body = {
+            "model": self.model_name,
+            "messages": [{"role": m.role, "content": m.content} for m in messages],
+            "stream": stream,
+            "keep_alive": self._keep_alive,
+        }
+        options = self._options if temperature is None else {**self._options, "temperature": temperature}
+        if options:
+            body["options"] = options
+        return body
 
 
 class LangchainOllamaLLM(LLMPort):
+    """`ChatOllama` wrapper kept for LangChain users; prefer `OllamaLLM`."""
+
+    supports_streaming = True
+
     def __init__(self, model_name: str = "llama3"):
+        self.model_name = model_name
         self.llm = ChatOllama(model=model_name)
 
-    def chat(self, messages: Sequence[Message]) -> Message:
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
         langchain_messages = [self._to_langchain(message) for message in messages]
-        response = self.llm.invoke(langchain_messages)
+        response = await self._model(temperature).ainvoke(langchain_messages)
         return Message(role="assistant", content=response.content)
 
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        langchain_messages = [self._to_langchain(message) for message in messages]
+        async for chunk in self._model(temperature).astream(langchain_messages):
+            if chunk.content:
+                yield chunk.content
+
+    def _model(self, temperature: Optional[float]) -> ChatOllama:
+        return self.llm if temperature is None else self.llm.model_copy(update={"temperature": temperature})
+
     def _to_langchain(self, m: Message):
         if m.role == "system":
             return SystemMessage(content=m.content)
@@ -24,3 +166,8 @@ class LangchainOllamaLLM(LLMPort):
             return AIMessage(content=m.content)
         else:
             raise ValueError(f"Unknown role: {m.role}")
+
+
+if __name__ == "__main__":
+    llm = OllamaLLM()
+    print(asyncio.run(llm.chat([Message(role="user", content="Write a haiku about AI and summer.")])))
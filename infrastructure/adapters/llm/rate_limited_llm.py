@@ -0,0 +1,308 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterator, List, Optional, Sequence
+
+from domain.exceptions import RateLimitError
+from domain.ports.llm_port import LLMPort, sampling
+from domain.models import Message
+
+# lower value = served first
+SERVICE_PRIORITIES: Dict[str, int] = {
+    "planner": 0,
+    "critic": 1,
+    "curriculum": 2,
+    "qa": 3,
+    "skill_description": 4,
+}
+
+# tiktoken's cl100k_base once `load_token_encoding` has run; False if it is unavailable
+_encoding = None
+
+_quota_waits: ContextVar[Optional[List[float]]] = ContextVar("quota_waits", default=None)
+
+
+@contextmanager
+def record_quota_wait(waits: List[float]) -> Iterator[None]:
+    """Append to `waits` the seconds each `QuotaScheduler` admission inside the block spent queued."""
+    token = _quota_waits.set(waits)
+    try:
+        yield
+    finally:
+        _quota_waits.reset(token)
+
+
+def _load_encoding():
+    try:
+        import tiktoken
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:  # missing package or no network to fetch the BPE file
+        logging.warning(f"tiktoken unavailable, estimating tokens from length: {e}")
+        return False
+
+
+async def load_token_encoding() -> None:
+    """Load the encoding `estimate_tokens` uses in a worker thread; a cold cache downloads the BPE file."""
+    global _encoding
+    if _encoding is None:
+        _encoding = await asyncio.to_thread(_load_encoding)
+
+
+def estimate_tokens(text: str) -> int:
+    """Count tokens with tiktoken's cl100k_base, or ~4 characters per token until it is loaded or if it is unavailable."""
+    if _encoding:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return len(text) // 4 + 1
+
+
+class TokenBucket:
+    """Classic token bucket refilled continuously at `capacity` per minute."""
+
+    def __init__(self, per_minute: float, clock: Callable[[], float]):
+        self.capacity = float(per_minute)
+        self._rate = per_minute / 60.0
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated_at = clock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self._rate)
+        self._updated_at = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until `amount` tokens are available (0 if they are now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        return max(0.0, (amount - self._tokens) / self._rate)
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self._tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+
+@dataclass
+class _WaitStats:
+    served: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+    rate_limited: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "served": self.served,
+            "mean_wait": self.total_wait / self.served if self.served else 0.0,
+            "max_wait": self.max_wait,
+            "rate_limited": self.rate_limited,
+        }
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    seq: int
+    service: str = field(compare=False)
+    tokens: int = field(compare=False)
+
+
+class QuotaScheduler:
+    """
+    Admission control shared by all LLM traffic of one provider quota.
+
+    Calls wait in a priority queue (planner > critic > curriculum > qa >
+    skill_description, FIFO within a service) until both the requests-per-minute
+    and tokens-per-minute buckets can cover them. A provider 429 blocks the
+    whole queue for its `retry_after` and the call is re-queued.
+
+    `clock` and `sleep` are injectable so the scheduler can run on a fake clock.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        *,
+        expected_output_tokens: int = 512,
+        max_rate_limit_retries: int = 3,
+        default_retry_after: float = 10.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        token_counter: Callable[[str], int] = estimate_tokens,
+    ):
+        self._requests = TokenBucket(requests_per_minute, clock)
+        self._tokens = TokenBucket(tokens_per_minute, clock)
+        self._expected_output_tokens = expected_output_tokens
+        self._max_rate_limit_retries = max_rate_limit_retries
+        self._default_retry_after = default_retry_after
+        self._clock = clock
+        self._sleep = sleep
+        self._count_tokens = token_counter
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._head_changed = asyncio.Event()
+        self._blocked_until = 0.0
+        self._stats: Dict[str, _WaitStats] = {}
+
+    def bind(self, llm: LLMPort, service: str) -> "RateLimitedLLM":
+        """Return an `LLMPort` for `service` whose calls go through this scheduler."""
+        if service not in SERVICE_PRIORITIES:
+            raise ValueError(f"Unknown service: {service}. Expected one of {list(SERVICE_PRIORITIES)}")
+        return RateLimitedLLM(llm, self, service)
+
+    # --- stats ---
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._queue)
+
+    def stats(self) -> dict:
+        depth: Dict[str, int] = {}
+        for waiter in self._queue:
+            depth[waiter.service] = depth.get(waiter.service, 0) + 1
+        return {
+            "queue_depth": self.queue_depth,
+            "queue_depth_by_service": depth,
+            "services": {service: stats.as_dict() for service, stats in self._stats.items()},
+        }
+
+    # --- admission ---
+
+    async def prompt_tokens(self, messages: Sequence[Message]) -> int:
+        if self._count_tokens is estimate_tokens:
+            # never on the event loop: loading may hit the network
+            await load_token_encoding()
+        return sum(self._count_tokens(m.content) for m in messages)
+
+    def reservation(self, prompt_tokens: int) -> int:
+        """Tokens to reserve up front: the prompt plus an allowance for the reply."""
+        return prompt_tokens + self._expected_output_tokens
+
+    async def acquire(self, service: str, tokens: int) -> None:
+        waiter = _Waiter(SERVICE_PRIORITIES[service], next(self._seq), service, tokens)
+        heapq.heappush(self._queue, waiter)
+        enqueued_at = self._clock()
+        try:
+            while True:
+                if self._queue[0] is not waiter:
+                    head_changed = self._head_changed
+                    await head_changed.wait()
+                    continue
+                delay = max(
+                    self._blocked_until - self._clock(),
+                    self._requests.delay_for(1),
+                    self._tokens.delay_for(tokens),
+                )
+                if delay <= 0:
+                    break
+                await self._sleep(delay)
+        except BaseException:
+            self._remove(waiter)
+            raise
+
+        heapq.heappop(self._queue)
+        self._requests.consume(1)
+        self._tokens.consume(tokens)
+        self._notify()
+
+        wait = self._clock() - enqueued_at
+        waits = _quota_waits.get()
+        if waits is not None:
+            waits.append(wait)
+        stats = self._stats.setdefault(service, _WaitStats())
+        stats.served += 1
+        stats.total_wait += wait
+        stats.max_wait = max(stats.max_wait, wait)
+
+    def settle(self, reserved: int, prompt_tokens: int, reply: str) -> None:
+        """Correct the token bucket once the real size of the reply is known."""
+        used = prompt_tokens + self._count_tokens(reply)
+        if used > reserved:
+            self._tokens.consume(used - reserved)
+        elif used < reserved:
+            self._tokens.refund(reserved - used)
+
+    def rate_limited(self, service: str, error: RateLimitError) -> None:
+        retry_after = error.retry_after if error.retry_after is not None else self._default_retry_after
+        self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+        self._stats.setdefault(service, _WaitStats()).rate_limited += 1
+        logging.warning(f"LLM quota exceeded for {service}; pausing all LLM calls for {retry_after:.1f}s")
+
+    @property
+    def max_rate_limit_retries(self) -> int:
+        return self._max_rate_limit_retries
+
+    def _remove(self, waiter: _Waiter) -> None:
+        was_head = bool(self._queue) and self._queue[0] is waiter
+        if waiter in self._queue:
+            self._queue.remove(waiter)
+            heapq.heapify(self._queue)
+        if was_head:
+            self._notify()
+
+    def _notify(self) -> None:
+        self._head_changed.set()
+        self._head_changed = asyncio.Event()
+
+
+class RateLimitedLLM(LLMPort):
+    """`LLMPort` middleware that admits each call of one service through a `QuotaScheduler`."""
+
+    def __init__(self, llm: LLMPort, scheduler: QuotaScheduler, service: str):
+        self._llm = llm
+        self._scheduler = scheduler
+        self._service = service
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self._llm, "model_name", type(self._llm).__name__)
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._llm.supports_streaming
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        prompt_tokens = await self._scheduler.prompt_tokens(messages)
+        reserved = self._scheduler.reservation(prompt_tokens)
+        for attempt in range(self._scheduler.max_rate_limit_retries + 1):
+            await self._scheduler.acquire(self._service, reserved)
+            try:
+                response = await self._llm.chat(messages, **sampling(temperature))
+            except RateLimitError as e:
+                self._scheduler.rate_limited(self._service, e)
+                if attempt == self._scheduler.max_rate_limit_retries:
+                    raise
+                continue
+            self._scheduler.settle(reserved, prompt_tokens, response.content)
+            return response
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        prompt_tokens = await self._scheduler.prompt_tokens(messages)
+        reserved = self._scheduler.reservation(prompt_tokens)
+        for attempt in range(self._scheduler.max_rate_limit_retries + 1):
+            await self._scheduler.acquire(self._service, reserved)
+            stream = self._llm.chat_stream(messages, **sampling(temperature))
+            chunks = []
+            try:
+                async for chunk in stream:
+                    chunks.append(chunk)
+                    yield chunk
+                return
+            except RateLimitError as e:
+                self._scheduler.rate_limited(self._service, e)
+                # a stream that already produced output cannot be replayed transparently
+                if chunks or attempt == self._scheduler.max_rate_limit_retries:
+                    raise
+            finally:
+                # also when the consumer closes the stream early: the reservation is corrected to what was streamed
+                self._scheduler.settle(reserved, prompt_tokens, "".join(chunks))
+                await stream.aclose()
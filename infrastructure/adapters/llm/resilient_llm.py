@@ -0,0 +1,251 @@
+from __future__ import annotations
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Sequence, Tuple
+
+from domain.exceptions import LLMTimeoutError, RateLimitError, TransientLLMError
+from domain.ports.llm_port import LLMPort, sampling
+from domain.models import Message
+from .rate_limited_llm import record_quota_wait
+
+
+class LatencyTracker:
+    """Percentiles over the last `window` successful attempt latencies."""
+
+    def __init__(self, window: int = 500):
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, max(0, int(round(q * len(ordered))) - 1))
+        return ordered[index]
+
+    def snapshot(self) -> dict:
+        return {
+            "count": len(self._samples),
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class ResilientLLM(LLMPort):
+    """
+    `LLMPort` decorator bounding each call of one service in time.
+
+    - `deadline`: total budget of a call, retries included; `attempt_timeout`
+      bounds a single attempt. Exceeding either raises `LLMTimeoutError`.
+    - `TransientLLMError`s (network, 5xx, 429, attempt timeouts) are retried up to
+      `max_retries` times with full-jitter exponential backoff. With
+      `retry_rate_limits=False` a 429 is raised at once, for when a
+      `RateLimitedLLM` below already re-queues it.
+    - `hedge=True`: once `hedge_min_samples` latencies are known, an attempt still
+      running after the p95 latency gets a duplicate request; the first reply wins
+      and the other is cancelled.
+
+    `latency` holds the duration of each winning attempt alone: retries, backoff
+    and time queued in a `QuotaScheduler` are left out, so the hedge delay tracks
+    the provider rather than the load.
+    """
+
+    def __init__(
+        self,
+        llm: LLMPort,
+        *,
+        service: str = "",
+        deadline: float = 120.0,
+        attempt_timeout: Optional[float] = None,
+        max_retries: int = 2,
+        retry_rate_limits: bool = True,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0,
+        hedge: bool = False,
+        hedge_quantile: float = 0.95,
+        hedge_min_samples: int = 20,
+        latency_window: int = 500,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rng: Callable[[], float] = random.random,
+    ):
+        self._llm = llm
+        self._service = service or getattr(llm, "model_name", type(llm).__name__)
+        self._deadline = deadline
+        self._attempt_timeout = attempt_timeout
+        self._max_retries = max_retries
+        self._retry_rate_limits = retry_rate_limits
+        self._backoff_base = backoff_base
+        self._backoff_max = backoff_max
+        self._hedge = hedge
+        self._hedge_quantile = hedge_quantile
+        self._hedge_min_samples = hedge_min_samples
+        self._clock = clock
+        self._sleep = sleep
+        self._rng = rng
+        self.latency = LatencyTracker(latency_window)
+        self.retries = 0
+        self.timeouts = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    @property
+    def model_name(self) -> str:
+        return getattr(self._llm, "model_name", type(self._llm).__name__)
+
+    @property
+    def supports_streaming(self) -> bool:
+        return self._llm.supports_streaming
+
+    def stats(self) -> dict:
+        return {
+            "service": self._service,
+            **self.latency.snapshot(),
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+        }
+
+    def hedge_delay(self) -> Optional[float]:
+        """Seconds to wait before hedging, or None while hedging is off or uncalibrated."""
+        if not self._hedge or len(self.latency) < self._hedge_min_samples:
+            return None
+        return self.latency.percentile(self._hedge_quantile)
+
+    # --- chat ---
+
+    async def chat(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> Message:
+        start = self._clock()
+        attempt = 0
+        while True:
+            timeout = self._attempt_budget(start)
+            try:
+                response, seconds = await asyncio.wait_for(self._hedged(messages, sampling(temperature)), timeout)
+            except asyncio.TimeoutError:
+                self.timeouts += 1
+                error: TransientLLMError = LLMTimeoutError(f"{self._service}: LLM call timed out after {timeout:.1f}s")
+            except TransientLLMError as e:
+                self._raise_if_not_retried(e)
+                error = e
+            else:
+                self.latency.record(seconds)
+                return response
+
+            attempt += 1
+            await self._backoff(attempt, error, start)
+
+    async def _hedged(self, messages: Sequence[Message], options: dict) -> Tuple[Message, float]:
+        delay = self.hedge_delay()
+        if delay is None:
+            return await self._timed_chat(messages, options)
+
+        primary = asyncio.ensure_future(self._timed_chat(messages, options))
+        tasks = {primary}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if not done:
+                self.hedges += 1
+                tasks.add(asyncio.ensure_future(self._timed_chat(messages, options)))
+            error: Optional[BaseException] = None
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.hedge_wins += 1
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _timed_chat(self, messages: Sequence[Message], options: dict) -> Tuple[Message, float]:
+        """One attempt and its latency, quota wait excluded."""
+        waits: List[float] = []
+        started = self._clock()
+        response = await self._queued(self._llm.chat(messages, **options), waits)
+        return response, self._clock() - started - sum(waits)
+
+    @staticmethod
+    async def _queued(awaitable: Awaitable, waits: List[float]):
+        # a coroutine of its own so the context variable is set and reset in the task `wait_for` may run it in
+        with record_quota_wait(waits):
+            return await awaitable
+
+    # --- chat_stream ---
+
+    async def chat_stream(self, messages: Sequence[Message], *, temperature: Optional[float] = None) -> AsyncIterator[str]:
+        """Retries are only possible until the first chunk has been yielded; hedging is not applied."""
+        start = self._clock()
+        attempt = 0
+        while True:
+            stream = self._llm.chat_stream(messages, **sampling(temperature))
+            started, waits = self._clock(), []
+            yielded = completed = False
+            try:
+                while True:
+                    timeout = self._attempt_budget(start)
+                    try:
+                        chunk = await asyncio.wait_for(self._queued(stream.__anext__(), waits), timeout)
+                    except StopAsyncIteration:
+                        completed = True
+                        return
+                    except asyncio.TimeoutError:
+                        self.timeouts += 1
+                        raise LLMTimeoutError(f"{self._service}: LLM stream timed out after {timeout:.1f}s") from None
+                    yielded = True
+                    try:
+                        yield chunk
+                    except GeneratorExit:
+                        # the consumer closed the stream once it had what it needed, e.g. the planner's closing code fence
+                        completed = True
+                        raise
+            except TransientLLMError as e:
+                if yielded:
+                    raise
+                self._raise_if_not_retried(e)
+                error = e
+            finally:
+                if completed:
+                    self.latency.record(self._clock() - started - sum(waits))
+                await stream.aclose()
+
+            attempt += 1
+            await self._backoff(attempt, error, start)
+
+    # --- helpers ---
+
+    def _attempt_budget(self, start: float) -> float:
+        remaining = self._deadline - (self._clock() - start)
+        if remaining <= 0:
+            self.timeouts += 1
+            raise LLMTimeoutError(f"{self._service}: LLM call exceeded its {self._deadline:.1f}s deadline")
+        return remaining if self._attempt_timeout is None else min(remaining, self._attempt_timeout)
+
+    def _raise_if_not_retried(self, error: TransientLLMError) -> None:
+        if isinstance(error, RateLimitError) and not self._retry_rate_limits:
+            raise error
+
+    async def _backoff(self, attempt: int, error: TransientLLMError, start: float) -> None:
+        """Sleep before retry number `attempt`, or re-raise `error` when retries or time ran out."""
+        if attempt > self._max_retries:
+            raise error
+        delay = self._rng() * min(self._backoff_max, self._backoff_base * 2 ** (attempt - 1))
+        if isinstance(error, RateLimitError) and error.retry_after is not None:
+            delay = max(delay, error.retry_after)
+        if self._clock() - start + delay >= self._deadline:
+            raise error
+        self.retries += 1
+        logging.warning(f"{self._service}: retrying LLM call in {delay:.2f}s (attempt {attempt}) after: {error}")
+        await self._sleep(delay)
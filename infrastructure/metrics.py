@@ -0,0 +1,131 @@
+"""
+In-process latency histograms, rendered in the Prometheus text exposition format.
+
+Observing is a bisect and two additions on the event loop, cheap enough to leave
+on in production; `REGISTRY.render()` serves them at `/metrics`.
+"""
+from __future__ import annotations
+import time
+from bisect import bisect_left
+from typing import Dict, List, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# seconds; from a cache lookup (~1 ms) to a long env.step (10 min)
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 25.0, 60.0, 120.0, 300.0, 600.0,
+)
+
+
+class HistogramSeries:
+    """Bucket counts, sum and count of one label combination."""
+
+    __slots__ = ("_bounds", "buckets", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self._bounds = bounds
+        # non-cumulative; the last slot is +Inf
+        self.buckets = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.buckets[bisect_left(self._bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Timer:
+    __slots__ = ("_series", "_start")
+
+    def __init__(self, series: HistogramSeries):
+        self._series = series
+
+    def __enter__(self) -> "_Timer":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._series.observe(time.perf_counter() - self._start)
+
+
+class Histogram:
+    """
+    A histogram with one series per combination of `labelnames` values.
+
+        with STAGE_SECONDS.time("bot", "critic"):
+            ...
+    """
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._bounds = tuple(sorted(float(b) for b in buckets))
+        self._series: Dict[Tuple[str, ...], HistogramSeries] = {}
+
+    def labels(self, *values: str) -> HistogramSeries:
+        series = self._series.get(values)
+        if series is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}, got {values}")
+            series = self._series[values] = HistogramSeries(self._bounds)
+        return series
+
+    def observe(self, value: float, *labels: str) -> None:
+        self.labels(*labels).observe(value)
+
+    def time(self, *labels: str) -> _Timer:
+        """Context manager observing the seconds spent inside it."""
+        return _Timer(self.labels(*labels))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {_escape_help(self.documentation)}", f"# TYPE {self.name} histogram"]
+        for values, series in sorted(self._series.items()):
+            labels = [f'{name}="{_escape_label(value)}"' for name, value in zip(self.labelnames, values)]
+            cumulative = 0
+            for bound, count in zip(self._bounds + (float("inf"),), series.buckets):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_labels = ",".join(labels + [f'le="{le}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            suffix = f"{{{','.join(labels)}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {series.sum!r}")
+            lines.append(f"{self.name}_count{suffix} {series.count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._histograms: Dict[str, Histogram] = {}
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        if name in self._histograms:
+            raise ValueError(f"Metric {name} is already registered")
+        histogram = self._histograms[name] = Histogram(name, documentation, labelnames, buckets)
+        return histogram
+
+    def render(self) -> str:
+        return "".join(line + "\n" for histogram in self._histograms.values() for line in histogram.render())
+
+
+def _escape_help(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("\n", "\\n")
+
+
+def _escape_label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+REGISTRY = MetricsRegistry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "agent_stage_seconds", "Seconds spent in each stage of an agent's task loop.", ("agent", "stage"),
+)
+LLM_CALL_SECONDS = REGISTRY.histogram(
+    "llm_call_seconds", "Seconds per LLMPort call as seen by each service, cache hits included.", ("service", "outcome"),
+)
+DATABASE_CALL_SECONDS = REGISTRY.histogram(
+    "database_call_seconds", "Seconds per DatabasePort call.", ("collection", "operation"),
+)
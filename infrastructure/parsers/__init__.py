@@ -2,5 +2,6 @@ from .js_code_parser import JSParser
 from .task_parser import TaskParser
 from .critic_parser import CriticParser
 from .qa_question_parser import QAQuestionParser
+from .qa_answer_parser import QAAnswerParser
 
-__all__ = ["JSParser", "TaskParser", "CriticParser", "QAQuestionParser"]
\ No newline at end of file
+__all__ = ["JSParser", "TaskParser", "CriticParser", "QAQuestionParser", "QAAnswerParser"]
\ No newline at end of file
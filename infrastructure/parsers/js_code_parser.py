@@ -1,6 +1,10 @@
 import re
+from typing import Optional
 from domain.models import CodeSnippet
 from domain.ports import ParserPort
+from domain.ports.parser_port import IncrementalParserPort
+
+_FENCE = "```"
 
 class JSParser(ParserPort):
     def parse(self, text: str) -> CodeSnippet:
@@ -48,6 +52,9 @@ class JSParser(ParserPort):
             execution_code=execution_code
         )
 
+    def incremental(self) -> "IncrementalJSParser":
+        return IncrementalJSParser(self)
+
     def extract_plan(self, llm_response: str) -> str:
         match = re.search(
             r"Plan:\s*((?:.|\n)*?)(?=\n(?:Explain|Thought|Code):)",
@@ -61,4 +68,37 @@ class JSParser(ParserPort):
             r"Explain:\s*((?:.|\n)*?)(?=\n(?:Plan|Thought|Code):)",
             llm_response
         )
-        return match.group(1).strip() if match else ""
\ No newline at end of file
+        return match.group(1).strip() if match else ""
+
+
+class IncrementalJSParser(IncrementalParserPort):
+    """
+    Buffer a streamed planner reply and hand it to `JSParser` as soon as the
+    closing fence of the first code block has arrived. Everything the LLM
+    would generate after that point is never read.
+    """
+
+    def __init__(self, parser: Optional[JSParser] = None):
+        self._parser = parser or JSParser()
+        self._buffer = ""
+        self._scan_from = 0
+        self._fences = 0
+
+    @property
+    def text(self) -> str:
+        return self._buffer
+
+    def feed(self, chunk: str) -> Optional[CodeSnippet]:
+        self._buffer += chunk
+        # re-scan a little before the new chunk in case a fence was split across chunks
+        start = max(self._scan_from - len(_FENCE) + 1, 0)
+        while True:
+            index = self._buffer.find(_FENCE, start)
+            if index < 0:
+                break
+            self._fences += 1
+            start = index + len(_FENCE)
+            if self._fences == 2:
+                return self._parser.parse(self._buffer[:start])
+        self._scan_from = len(self._buffer)
+        return None
\ No newline at end of file
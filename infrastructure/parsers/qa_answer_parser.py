@@ -0,0 +1,43 @@
+from __future__ import annotations
+import re
+from typing import List
+from domain.ports.parser_port import ParserPort
+
+_ANSWER_LINE = re.compile(r"^\s*Answer\s*(\d+)\s*:\s*(.*?)\s*$")
+
+class QAAnswerParser(ParserPort):
+    """
+    Parse a batched LLM reply like:
+
+        Answer 1: You can find oak logs in the forest.
+        Answer 2: Craft it with 3 planks and 2 sticks
+        on a crafting table.
+
+    and return the answers ordered by their number. Continuation lines are
+    appended to the previous answer and missing numbers become "".
+    """
+
+    def parse(self, text: str) -> List[str]:
+        answers: dict[int, list[str]] = {}
+        current = None
+        for line in text.splitlines():
+            answer_match = _ANSWER_LINE.match(line)
+            if answer_match:
+                current = int(answer_match.group(1))
+                answers[current] = [answer_match.group(2)]
+            elif current is not None and line.strip():
+                answers[current].append(line.strip())
+
+        if not answers:
+            return []
+        return [" ".join(answers.get(i, [])).strip() for i in range(1, max(answers) + 1)]
+
+
+if __name__ == "__main__":
+    parser = QAAnswerParser()
+    text = """
+    Answer 1: You can find oak logs in the forest.
+    Answer 2: Craft it with 3 planks and 2 sticks
+    on a crafting table.
+    """
+    print(parser.parse(text))
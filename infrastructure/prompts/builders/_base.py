@@ -10,12 +10,20 @@ class _BasePromptBuilder(PromptBuilderPort, ABC):
     """
     (1) Variables -> (2) system -> (3) user
     Hooks to implement each variation.
+
+    Static parts go first so repeated calls share a prefix: when
+    `static_system_header` is True the whole system message is marked as the
+    cacheable prefix; otherwise `_system_header` sets `prefix_len` itself.
     """
 
+    static_system_header: bool = True
+
     # ----------------- final method -----------------
     def build_prompt(self, **kw) -> SystemAndUserMsg:
         sys_msg = self._system_header(**kw)
         user_msg = self._compose_user(**kw)
+        if self.static_system_header:
+            sys_msg.prefix_len = len(sys_msg.content)
 
         return sys_msg, user_msg
 
@@ -6,26 +6,50 @@ from infrastructure.prompts.registry import register
 
 @register("minecraft", "planner")
 class PlannerPromptBuilder(_BasePromptBuilder):
-    """PlannerService uses this prompt builder"""
+    """
+    PlannerService uses this prompt builder.
+
+    With `static_skillset` (the primitive usage docs) the system message is the
+    template filled with those programs, followed by the retrieved `skillset`,
+    so everything up to the retrieved programs is a stable cacheable prefix.
+    Without it, all programs go into the template and only the text before
+    them is marked as prefix.
+    """
+
+    static_system_header = False
 
     def _system_header(self, **kw) -> Message:
         skillset = kw["skillset"]
+        static_skillset = kw.get("static_skillset") or []
         system_base = load_prompt("minecraft", "planner", "base")
-
-        skillset_code_txt = ""
-        for skill in skillset:
-            skillset_code_txt += f"{skill.code}\n"
-        skillset_code_txt = skillset_code_txt.rstrip("\n")
-
         response_format = load_prompt("minecraft", "planner", "format")
 
-        system_header = system_base.format(programs=skillset_code_txt, response_format=response_format)
+        if not static_skillset:
+            return Message(
+                role="system",
+                content=system_base.format(programs=self._programs(skillset), response_format=response_format),
+                prefix_len=system_base.index("{programs}"),
+            )
+
+        static_header = system_base.format(programs=self._programs(static_skillset), response_format=response_format)
+        system_header = static_header
+        if skillset:
+            retrieved = load_prompt("minecraft", "planner", "retrieved").format(programs=self._programs(skillset))
+            system_header = f"{static_header}\n\n{retrieved}"
 
         return Message(
             role="system",
-            content=system_header
+            content=system_header,
+            prefix_len=len(static_header),
         )
 
+    @staticmethod
+    def _programs(skillset) -> str:
+        skillset_code_txt = ""
+        for skill in skillset:
+            skillset_code_txt += f"{skill.code}\n"
+        return skillset_code_txt.rstrip("\n")
+
     def _compose_user(
         self,
         **kw
@@ -0,0 +1,40 @@
+from __future__ import annotations
+from infrastructure.prompts.builders._base import _BasePromptBuilder
+from domain.models import Message
+from infrastructure.utils import load_prompt
+from infrastructure.prompts.registry import register
+
+@register("minecraft", "qa_answer_batch")
+class QABatchAnswerPromptBuilder(_BasePromptBuilder):
+    """QAService uses this prompt builder to answer several questions in one call"""
+
+    def _system_header(self, **kw) -> Message:
+        return Message(
+            role="system",
+            content=load_prompt("minecraft", "curriculum", "qa_answer_batch")
+        )
+
+    def _compose_user(self, **kw) -> Message:
+        questions = kw['questions']
+        return Message(
+            role="user",
+            content="\n".join(f"Question {i}: {question}" for i, question in enumerate(questions, start=1))
+        )
+
+
+# ------------------------------------------------------------
+# Test
+# ------------------------------------------------------------
+if __name__ == "__main__":
+    qa_builder = QABatchAnswerPromptBuilder()
+
+    questions = [
+        "What are the blocks that I can find in the forest in Minecraft?",
+        "How to craft a wooden pickaxe?",
+    ]
+
+    sys_msg, user_msg = qa_builder.build_prompt(questions=questions)
+    print("-------system message-------")
+    print(sys_msg)
+    print("-------user message-------")
+    print(user_msg)
@@ -21,7 +21,8 @@ def load_skills(skill_dir: str, skill_name: str = None) -> List[Skill]:
     #if the skill_name is not provided, read all the javascript files inside the directory
     if skill_name is None:
         path = Path(skill_dir)
-        for file in path.iterdir():
+        # sorted so prompts built from the skills are identical across runs
+        for file in sorted(path.iterdir()):
             if file.is_file() and file.suffix == ".js":
                 name = file.stem
                 code = file.read_text(encoding="utf-8")
@@ -2,7 +2,7 @@
 import asyncio
 import uvicorn
 import httpx
-from fastapi import Depends, FastAPI, WebSocket, WebSocketDisconnect, Request, Response
+from fastapi import Depends, FastAPI, HTTPException, WebSocket, WebSocketDisconnect, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 import os
@@ -12,7 +12,9 @@ import websockets
 from starlette.websockets import WebSocketState
 from fastapi.responses import StreamingResponse, FileResponse
 from application.agent_controller import AgentController
-from application.composition import build_agent
+from application.agent_pool import AgentPool
+from application.composition import MINEFLAYER_BASE_PORT, MINEFLAYER_PORT_STRIDE, SharedServices, build_agent, build_shared_services
+from infrastructure.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, REGISTRY as METRICS_REGISTRY
 from infrastructure.websocket.agent_ws_server import manager
 
 # --- Logging Configuration ---
@@ -34,20 +36,50 @@ app.add_middleware(
 
 # --- Agent Dependency Injection (Lazy Initialization) ---
 # Will be initialized on the first request to avoid slow startup
-agent_controller_instance: Optional[AgentController] = None
+agent_pool_instance: Optional[AgentPool] = None
+shared_services_instance: Optional[SharedServices] = None
+# The agent driven by /start, /reset and /stop; it is added with the pool so it always gets
+# the first Mineflayer server (port 3000)
+DEFAULT_AGENT_ID = "bot"
+
+def get_agent_pool() -> AgentPool:
+    """
+    Initializes and returns the pool of agents. All agents share one set of LLM
+    clients, caches and one skill library; each drives its own Mineflayer server.
+    MAX_AGENTS caps how many bots the pool runs.
+    """
+    global agent_pool_instance, shared_services_instance
+    if agent_pool_instance is None:
+        shared = shared_services_instance = build_shared_services(game="minecraft")
+        fresh_library = os.getenv("FRESH_LIBRARY", "0") == "1"
+
+        def build(agent_id: str, port: int) -> AgentController:
+            nonlocal fresh_library
+            # FRESH_LIBRARY=1 empties the shared library once, when the first agent starts
+            agent = build_agent(game="minecraft", shared=shared, agent_id=agent_id, mineflayer_port=port, fresh_library=fresh_library)
+            fresh_library = False
+            return agent
+
+        agent_pool_instance = AgentPool(
+            build,
+            base_port=MINEFLAYER_BASE_PORT,
+            port_stride=MINEFLAYER_PORT_STRIDE,
+            max_agents=int(os.getenv("MAX_AGENTS", "8")),
+        )
+        # added first so it holds the first server whichever endpoint is hit first
+        agent_pool_instance.get(DEFAULT_AGENT_ID, port=MINEFLAYER_BASE_PORT)
+    return agent_pool_instance
 
 async def get_agent_controller() -> AgentController:
     logging.info("--- GET AGENT CONTROLLER CALLED ---")
     """
-    Initializes and returns a single, shared instance of the AgentController.
+    Initializes and returns the default agent of the pool.
     This uses a lazy initialization pattern to ensure the agent is only built
     when the first request comes in, speeding up Cloud Run startup time.
     """
-    global agent_controller_instance
-    if agent_controller_instance is None:
-        agent_controller_instance = build_agent(game="minecraft")
+    controller = get_agent_pool().get(DEFAULT_AGENT_ID)
     logging.info("--- GET AGENT CONTROLLER RETURNED ---")
-    return agent_controller_instance
+    return controller
 
 # --- API Endpoints ---
 @app.post("/start")
@@ -70,6 +102,43 @@ async def stop_agent_endpoint(controller: AgentController = Depends(get_agent_co
     await controller.stop()
     return {"message": "Agent stopped successfully."}
 
+@app.get("/agents")
+async def list_agents_endpoint(pool: AgentPool = Depends(get_agent_pool)):
+    """Lists the agents of the pool with their Mineflayer port and whether they are running."""
+    return {"agents": pool.status()}
+
+@app.post("/agents/{agent_id}/start")
+async def start_pool_agent_endpoint(agent_id: str, port: Optional[int] = None, pool: AgentPool = Depends(get_agent_pool)):
+    """Starts one agent, adding it to the pool on first use. Without `port` it gets the next free Mineflayer server."""
+    try:
+        pool.start(agent_id, port)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"message": f"Agent {agent_id} started successfully.", "agents": pool.status()}
+
+@app.post("/agents/{agent_id}/stop")
+async def stop_pool_agent_endpoint(agent_id: str, pool: AgentPool = Depends(get_agent_pool)):
+    """Stops one agent of the pool; the others keep running."""
+    try:
+        await pool.stop(agent_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown agent {agent_id}")
+    return {"message": f"Agent {agent_id} stopped successfully.", "agents": pool.status()}
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Latency histograms of the agent loop stages, LLM calls and database calls, in the Prometheus text format."""
+    return Response(content=METRICS_REGISTRY.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.on_event("shutdown")
+async def stop_agents_on_shutdown():
+    """Stops every agent so pending cache writes and queued skills are saved before the process exits."""
+    if agent_pool_instance is not None:
+        await agent_pool_instance.stop_all()
+    if shared_services_instance is not None:
+        # folds the vector journals into snapshots so the next start does not replay them
+        await shared_services_instance.close()
+
 # --- Reverse Proxy Endpoints ---
 # These endpoints will proxy requests to the internal Mineflayer servers
 # (viewer and inventory) that are not exposed publicly by Cloud Run.
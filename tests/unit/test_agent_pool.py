@@ -0,0 +1,127 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.agent_controller import AgentController
+from application.agent_pool import AgentPool
+from benchmarks.curriculum_latency import _observation
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill
+from domain.services import SkillService
+from infrastructure.adapters.database import NumpyVectorDatabase
+
+
+def _controller(agent_id: str, port: int) -> Mock:
+    controller = Mock(spec=AgentController)
+    controller.agent_id = agent_id
+    controller.port = port
+    controller.is_running = False
+
+    def start():
+        controller.is_running = True
+
+    async def stop():
+        controller.is_running = False
+
+    controller.start.side_effect = start
+    controller.stop = AsyncMock(side_effect=stop)
+    return controller
+
+
+@pytest.fixture
+def pool():
+    return AgentPool(Mock(side_effect=_controller), base_port=3000, port_stride=3, max_agents=3)
+
+
+class TestAgentPool:
+    """Unit tests for AgentPool"""
+
+    def test_agents_get_consecutive_servers(self, pool):
+        """Test that each new agent talks to the next Mineflayer server"""
+        assert [pool.get(name).port for name in ("bot", "alex", "steve")] == [3000, 3003, 3006]
+        assert pool.get("alex").port == 3003
+        assert len(pool) == 3
+
+    def test_explicit_port(self, pool):
+        """Test that a given port is used and a taken one is refused"""
+        assert pool.get("bot", port=3009).port == 3009
+        assert pool.get("alex").port == 3003
+        with pytest.raises(ValueError):
+            pool.get("steve", port=3009)
+
+    def test_invalid_ids_and_capacity(self, pool):
+        """Test that ids must be Minecraft usernames and the pool stops at max_agents"""
+        with pytest.raises(ValueError):
+            pool.get("no spaces allowed")
+        for name in ("bot", "alex", "steve"):
+            pool.get(name)
+        with pytest.raises(ValueError):
+            pool.get("notch")
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop_individual_agents(self, pool):
+        """Test that stopping one agent leaves the others running"""
+        pool.start("bot")
+        pool.start("alex")
+
+        await pool.stop("bot")
+
+        assert pool.status() == [
+            {"agent_id": "bot", "port": 3000, "running": False},
+            {"agent_id": "alex", "port": 3003, "running": True},
+        ]
+        with pytest.raises(KeyError):
+            await pool.stop("steve")
+
+    @pytest.mark.asyncio
+    async def test_stop_all(self, pool):
+        """Test that stop_all stops every agent, including ones whose loop already finished"""
+        pool.start("bot")
+        idle = pool.get("alex")
+
+        await pool.stop_all()
+
+        assert not pool.get("bot").is_running
+        idle.stop.assert_awaited_once()
+
+
+class TestSharedSkillLibrary:
+    """Unit tests for agents sharing one SkillService"""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_are_merged(self, tmp_path):
+        """Test that two agents adding the same program at once store it once"""
+        database = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path)
+        service = SkillService(llm=Mock(), prompt_builder=Mock(), database=database)
+        code = "async function mineWoodLog(bot) { await mineBlock(bot, 'oak_log', 1); }"
+
+        stored = await asyncio.gather(
+            service.add_skill(Skill("mineWoodLog", code, "Mine one oak log")),
+            service.add_skill(Skill("chopTree", code.replace("mineWoodLog", "chopTree"), "Chop a tree")),
+        )
+
+        assert [skill.name for skill in stored] == ["mineWoodLog", "mineWoodLog"]
+        assert database.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_controller_joins_with_its_own_username(self):
+        """Test that each controller resets its bot under its agent id"""
+        env = Mock()
+        env.reset = AsyncMock(return_value=_observation())
+        env.close = AsyncMock()
+        curriculum = Mock()
+        curriculum.get_next_task = AsyncMock(side_effect=RuntimeError("no curriculum"))
+        skills = Mock()
+        skills.clear = AsyncMock()
+        controller = AgentController(
+            curriculum_service=curriculum, skill_service=skills, planner_service=Mock(), critic_service=Mock(),
+            env=env, agent_id="alex", speculative_curriculum=False,
+        )
+
+        controller.start()
+        with pytest.raises(RuntimeError):
+            await controller._running_task
+
+        assert env.reset.await_args.args[0]["username"] == "alex"
+        assert not controller.is_running
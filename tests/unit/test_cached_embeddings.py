@@ -0,0 +1,157 @@
+import pytest
+
+from langchain_core.embeddings import Embeddings
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill
+from infrastructure.adapters.database import CachedEmbeddings, ChromaDatabase
+
+
+class CountingEmbeddings(HashEmbeddings):
+    model = "models/test-embedding"
+
+    def __init__(self):
+        super().__init__(dim=8)
+        self.batches = []
+        self.queries = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+    def embed_query(self, text):
+        self.queries.append(text)
+        return super().embed_query(text)
+
+
+class TaskTypedEmbeddings(Embeddings):
+    """Provider whose bulk endpoint takes a task type, like GoogleGenerativeAIEmbeddings."""
+
+    def __init__(self):
+        self.calls = []
+
+    def embed_documents(self, texts, *, task_type=None):
+        self.calls.append((list(texts), task_type))
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        raise AssertionError("queries should be embedded in bulk")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return tmp_path / "embedding_cache.sqlite3"
+
+
+class TestCachedEmbeddings:
+    """Unit tests for CachedEmbeddings"""
+
+    def test_repeated_query_hits_the_cache(self, cache_path):
+        """Test that five attempts of a task embed its command once"""
+        inner = CountingEmbeddings()
+        embeddings = CachedEmbeddings(inner, cache_path)
+
+        vectors = [embeddings.embed_query("Mine 1 wood log") for _ in range(5)]
+
+        assert inner.queries == ["Mine 1 wood log"]
+        assert all(v == vectors[0] for v in vectors)
+        assert vectors[0] == pytest.approx(inner.embed_query("Mine 1 wood log"), abs=1e-6)
+        assert embeddings.stats() == {"hits": 4, "misses": 1, "entries": 1}
+
+    def test_cache_survives_restart(self, cache_path):
+        """Test that vectors persist across instances sharing the same file"""
+        CachedEmbeddings(CountingEmbeddings(), cache_path).embed_documents(["craft a table"])
+
+        inner = CountingEmbeddings()
+        CachedEmbeddings(inner, cache_path).embed_documents(["craft a table"])
+
+        assert inner.batches == []
+
+    def test_failed_write_is_rolled_back(self, cache_path):
+        """Test that a batch failing midway stores nothing and leaves the cache writable"""
+        class FlakyEmbeddings(CountingEmbeddings):
+            def embed_documents(self, texts):
+                vectors = super().embed_documents(texts)
+                # the first batch has an unstorable second vector
+                return vectors if len(self.batches) > 1 else [vectors[0], ["not", "a", "vector"]]
+
+        embeddings = CachedEmbeddings(FlakyEmbeddings(), cache_path)
+        with pytest.raises(ValueError):
+            embeddings.embed_documents(["craft a table", "mine a log"])
+
+        assert len(embeddings) == 0
+        embeddings.embed_documents(["craft a table", "mine a log"])
+        assert len(embeddings) == 2
+
+    def test_misses_are_deduplicated_and_batched(self, cache_path):
+        """Test that only unseen, distinct texts reach the model, in batches"""
+        inner = CountingEmbeddings()
+        embeddings = CachedEmbeddings(inner, cache_path, batch_size=2)
+        embeddings.embed_documents(["a"])
+
+        vectors = embeddings.embed_documents(["a", "b", "c", "b", "d"])
+
+        assert inner.batches == [["a"], ["b", "c"], ["d"]]
+        assert len(vectors) == 5
+        assert vectors[1] == vectors[3]
+
+    def test_query_misses_are_embedded_in_bulk(self, cache_path):
+        """Test that embed_queries sends the distinct misses in one call with the query task type"""
+        inner = TaskTypedEmbeddings()
+        embeddings = CachedEmbeddings(inner, cache_path)
+        embeddings.embed_queries(["a", "bb", "a"])
+
+        vectors = embeddings.embed_queries(["bb", "ccc"])
+
+        assert inner.calls == [(["a", "bb"], "RETRIEVAL_QUERY"), (["ccc"], "RETRIEVAL_QUERY")]
+        assert vectors == [[2.0, 1.0], [3.0, 1.0]]
+        assert embeddings.embed_query("a") == [1.0, 1.0]
+
+    def test_query_and_document_vectors_are_kept_apart(self, cache_path):
+        """Test that kind and model are part of the key"""
+        embeddings = CachedEmbeddings(CountingEmbeddings(), cache_path)
+        other_model = CachedEmbeddings(CountingEmbeddings(), cache_path, model_name="other")
+
+        assert embeddings.key_for("x", "query") != embeddings.key_for("x", "document")
+        assert embeddings.key_for("x", "query") != other_model.key_for("x", "query")
+
+    def test_lru_eviction(self, cache_path):
+        """Test that the least recently used vector is evicted first"""
+        clock = FakeClock()
+        inner = CountingEmbeddings()
+        embeddings = CachedEmbeddings(inner, cache_path, max_entries=2, clock=clock)
+
+        for text in ("a", "b"):
+            clock.now += 1
+            embeddings.embed_query(text)
+        clock.now += 1
+        embeddings.embed_query("a")  # touch "a" so "b" is the LRU entry
+        clock.now += 1
+        embeddings.embed_query("c")
+
+        assert len(embeddings) == 2
+        embeddings.embed_query("a")
+        embeddings.embed_query("b")
+        assert inner.queries == ["a", "b", "c", "b"]
+
+    @pytest.mark.asyncio
+    async def test_chroma_uses_the_cache_transparently(self, cache_path, tmp_path):
+        """Test that repeated retrievals embed the task command once"""
+        inner = CountingEmbeddings()
+        database = ChromaDatabase(
+            "test_skills", CachedEmbeddings(inner, cache_path), persist_dir=tmp_path / "db", score_threshold=2.0
+        )
+        await database.add([Skill(name="mineWoodLog", code="", description="mine wood log")])
+
+        for _ in range(5):
+            assert [s.name for s in await database.query("Mine 1 wood log")] == ["mineWoodLog"]
+
+        assert inner.queries == ["Mine 1 wood log"]
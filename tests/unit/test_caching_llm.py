@@ -0,0 +1,132 @@
+import pytest
+
+from domain.exceptions import LLMError
+from domain.models import Message
+from domain.ports import LLMPort
+from infrastructure.adapters.llm.caching_llm import CachingLLM, SqliteResponseCache
+
+
+class FakeLLM(LLMPort):
+    model_name = "fake-model"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def chat(self, messages, **options):
+        self.calls += 1
+        self.options = options
+        return Message(role="assistant", content=f"reply {self.calls}")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _prompt(text: str) -> list[Message]:
+    return [Message(role="system", content="sys"), Message(role="user", content=text)]
+
+
+class TestCachingLLM:
+    """Unit tests for CachingLLM"""
+
+    @pytest.fixture
+    def cache_path(self, tmp_path):
+        return tmp_path / "llm_cache.sqlite3"
+
+    @pytest.mark.asyncio
+    async def test_identical_prompt_is_served_from_cache(self, cache_path):
+        """Test that a repeated prompt does not reach the wrapped LLM"""
+        llm = FakeLLM()
+        cache = CachingLLM(llm, cache_path)
+
+        first = await cache.chat(_prompt("How to obtain iron?"))
+        second = await cache.chat(_prompt("How to obtain iron?"))
+
+        assert first.content == second.content == "reply 1"
+        assert llm.calls == 1
+        assert cache.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    @pytest.mark.asyncio
+    async def test_cache_survives_restart(self, cache_path):
+        """Test that replies persist across instances sharing the same file"""
+        await CachingLLM(FakeLLM(), cache_path).chat(_prompt("q"))
+
+        llm = FakeLLM()
+        reply = await CachingLLM(llm, cache_path).chat(_prompt("q"))
+
+        assert reply.content == "reply 1"
+        assert llm.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_key_depends_on_role_and_model(self, cache_path):
+        """Test that role and model are part of the key"""
+        cache = CachingLLM(FakeLLM(), cache_path)
+        other_model = CachingLLM(FakeLLM(), cache_path, model_name="other-model")
+
+        assert cache.key_for([Message("user", "x")]) != cache.key_for([Message("system", "x")])
+        assert cache.key_for([Message("user", "x")]) != other_model.key_for([Message("user", "x")])
+
+    @pytest.mark.asyncio
+    async def test_temperatures_are_cached_separately(self, cache_path):
+        """Test that each explicit temperature gets its own entry and is passed on"""
+        llm = FakeLLM()
+        cache = CachingLLM(llm, cache_path)
+
+        cool = await cache.chat(_prompt("q"), temperature=0.2)
+        warm = await cache.chat(_prompt("q"), temperature=0.9)
+        again = await cache.chat(_prompt("q"), temperature=0.2)
+
+        assert (cool.content, warm.content, again.content) == ("reply 1", "reply 2", "reply 1")
+        assert llm.options == {"temperature": 0.9}
+        assert cache.key_for(_prompt("q")) != cache.key_for(_prompt("q"), 0.2)
+
+    @pytest.mark.asyncio
+    async def test_lru_eviction(self, cache_path):
+        """Test that the least recently used entry is evicted first"""
+        clock = FakeClock()
+        llm = FakeLLM()
+        cache = CachingLLM(llm, SqliteResponseCache(cache_path, max_entries=2, clock=clock))
+
+        for text in ("a", "b"):
+            clock.now += 1
+            await cache.chat(_prompt(text))
+        clock.now += 1
+        await cache.chat(_prompt("a"))  # touch "a" so "b" is the LRU entry
+        clock.now += 1
+        await cache.chat(_prompt("c"))
+
+        assert llm.calls == 3
+        await cache.chat(_prompt("a"))
+        assert llm.calls == 3
+        await cache.chat(_prompt("b"))
+        assert llm.calls == 4
+
+    @pytest.mark.asyncio
+    async def test_ttl_expiry(self, cache_path):
+        """Test that entries older than the TTL are treated as misses"""
+        clock = FakeClock()
+        llm = FakeLLM()
+        cache = CachingLLM(llm, SqliteResponseCache(cache_path, ttl_seconds=10, clock=clock))
+
+        await cache.chat(_prompt("q"))
+        clock.now = 11
+        reply = await cache.chat(_prompt("q"))
+
+        assert reply.content == "reply 2"
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_record_then_replay(self, cache_path):
+        """Test that replay mode serves recorded replies and never calls the LLM"""
+        await CachingLLM(FakeLLM(), cache_path, mode="record").chat(_prompt("q"))
+
+        llm = FakeLLM()
+        replay = CachingLLM(llm, cache_path, mode="replay")
+        assert (await replay.chat(_prompt("q"))).content == "reply 1"
+        with pytest.raises(LLMError):
+            await replay.chat(_prompt("unseen"))
+        assert llm.calls == 0
@@ -0,0 +1,133 @@
+from unittest.mock import Mock
+
+from domain.models import Skill
+from domain.services import SkillService
+from domain.services.call_graph import called_functions, helper_closure, parse_js, unbounded_loops
+from infrastructure.utils import load_skills
+
+PRIMITIVES = load_skills("infrastructure/primitive_skill/definitions")
+
+
+def _names(skills):
+    return [skill.name for skill in skills]
+
+
+class TestParseJs:
+    """Unit tests for parse_js"""
+
+    def test_top_level_declarations_only(self):
+        """Test that nested functions and plain variables are not exported names"""
+        declared, _ = parse_js(
+            "async function outer(bot) { function inner() {} const local = () => 1; }\n"
+            "const arrow = async (bot) => {};\n"
+            "const value = 3;"
+        )
+        assert declared == {"outer", "arrow"}
+
+    def test_comments_and_strings_are_not_references(self):
+        """Test that names in comments, strings and template text are ignored but interpolations count"""
+        _, references = parse_js(
+            "// mineBlock(bot)\n"
+            "bot.chat('craftItem failed');\n"
+            "bot.chat(`please explore first ${describe(item)}`);"
+        )
+        assert "mineBlock" not in references
+        assert "craftItem" not in references
+        assert "explore" not in references
+        assert "describe" in references
+
+    def test_locally_bound_names_are_not_references(self):
+        """Test that a local variable does not pull in a helper of the same name"""
+        _, references = parse_js("async function f(bot) { const itemByName = mcData.itemsByName.x; }")
+        assert "itemByName" not in references
+
+
+class TestStaticChecks:
+    """Unit tests for called_functions and unbounded_loops"""
+
+    def test_called_functions(self):
+        """Test that only free calls to undefined functions are reported"""
+        code = (
+            "async function f(bot) {\n"
+            "  const near = (b) => b.position.distanceTo(bot.entity.position) < 8;\n"
+            "  if (near(bot.blockAt(new Vec3(0, 0, 0)))) await mineBlock(bot, 'oak_log', 1);\n"
+            "  bot.chat(`found ${countLogs(bot)}`);\n"
+            "  await g(bot); Math.floor(parseInt('3'));\n"
+            "}\n"
+            "async function g(bot) { await craftItem(bot, 'stick'); }"
+        )
+        assert called_functions(code) == {"mineBlock", "countLogs", "craftItem"}
+
+    def test_throw_and_construction_are_not_calls(self):
+        """Test that `throw new Error(...)` reports neither `throw` nor the constructor"""
+        code = 'async function f(bot) { if (!bot) { throw new Error("No planks"); } throw new CustomError(`x ${y}`); }'
+        assert called_functions(code) == set()
+
+    def test_called_parameters_are_bound(self):
+        """Test that function, arrow and Promise executor parameters may be called"""
+        code = (
+            "async function f(bot, callback = () => false) {\n"
+            "  callback();\n"
+            "  [1, 2].forEach(fn => fn());\n"
+            "  await new Promise((resolve, reject) => { try { resolve(callback()); } catch (err) { reject(err); } });\n"
+            "  const handler = { onDone(done) { done(); } };\n"
+            "}"
+        )
+        assert called_functions(code) == set()
+
+    def test_locals_only_shadow_their_own_scope(self):
+        """Test that a local in one function does not hide the same name called elsewhere"""
+        code = (
+            "async function f(bot) { const collect = () => 1; collect(); }\n"
+            "async function g(bot) { await collect(bot); }\n"
+            "async function h(bot) { { let mine = 1; } await mine(bot); }"
+        )
+        assert called_functions(code) == {"collect", "mine"}
+        assert "collect" in parse_js(code)[1]
+
+    def test_unbounded_loops(self):
+        """Test that endless loops without an exit are counted"""
+        code = (
+            "async function f(bot) {\n"
+            "  while (true) { await bot.waitForTicks(1); }\n"
+            "  for (;;) { if (bot.health < 5) { break; } }\n"
+            "  while (bot.inventory.items().length < 3) { await mineBlock(bot, 'dirt'); }\n"
+            "}"
+        )
+        assert unbounded_loops(code) == 1
+
+
+class TestHelperClosure:
+    """Unit tests for helper_closure"""
+
+    def test_transitive_primitives(self):
+        """Test that indirect helpers are included and unrelated ones are not"""
+        closure = helper_closure("async function craftPickaxe(bot) { await craftItem(bot, 'wooden_pickaxe', 1); }", PRIMITIVES)
+
+        assert _names(closure) == ["craftHelper", "craftItem"]
+        assert sum(len(s.code) for s in closure) < sum(len(s.code) for s in PRIMITIVES) / 4
+
+    def test_callbacks_passed_by_name(self):
+        """Test that a function referenced without being called is still shipped"""
+        helpers = [Skill("isNight", "function isNight(bot) { return bot.time.isNight; }")] + PRIMITIVES
+        closure = helper_closure("async function f(bot) { await exploreUntil(bot, v, 60, isNight); }", helpers)
+
+        assert _names(closure) == ["isNight", "exploreUntil"]
+
+    def test_main_function_shadows_helper(self):
+        """Test that a helper redefined by the generated code is not sent twice"""
+        helpers = [Skill("mineWoodLog", "async function mineWoodLog(bot) { await mineBlock(bot, 'oak_log'); }")] + PRIMITIVES
+        closure = helper_closure("async function mineWoodLog(bot) { await mineBlock(bot, 'birch_log'); }\nawait mineWoodLog(bot);", helpers)
+
+        assert _names(closure) == ["mineBlock"]
+
+    def test_skill_service_adds_library_skills(self):
+        """Test that library skills called by a retrieved skill are resolved too"""
+        service = SkillService(llm=Mock(), prompt_builder=Mock(), database=Mock())
+        service._index(Skill("mineWoodLog", "async function mineWoodLog(bot) { await mineBlock(bot, 'oak_log'); }", "wood"))
+        craft_table = Skill("craftTable", "async function craftTable(bot) { await mineWoodLog(bot); await craftItem(bot, 'crafting_table'); }")
+        snippet = Mock(main_function_code="async function main(bot) { await craftTable(bot); }", execution_code="await main(bot);")
+
+        closure = service.resolve_helpers(snippet, PRIMITIVES + [craft_table])
+
+        assert sorted(_names(closure)) == ["craftHelper", "craftItem", "craftTable", "mineBlock", "mineWoodLog"]
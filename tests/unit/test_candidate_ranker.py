@@ -0,0 +1,105 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from domain.exceptions import TransientLLMError
+from domain.models import Message, Skill
+from domain.ports import LLMPort
+from domain.services import CandidateRanker, PlannerService
+from infrastructure.parsers import JSParser
+
+MINE_BLOCK = Skill("mineBlock", "async function mineBlock(bot, name, count = 1) { /* ... */ }")
+MINE_WOOD_LOG = Skill("mineWoodLog", "async function mineWoodLog(bot) { await mineBlock(bot, 'oak_log', 1); bot.chat('Wood log mined.'); }")
+
+
+def _reply(body: str, name: str = "mineLogs") -> str:
+    return f"Explain: ...\nPlan: ...\nCode:\n```javascript\nasync function {name}(bot) {{\n{body}\n}}\n```"
+
+
+GOOD = _reply("  await mineBlock(bot, 'oak_log', 3);\n  bot.chat('Wood log mined.');")
+UNKNOWN_HELPER = _reply("  await chopTree(bot, 'oak_log', 3);")
+ENDLESS = _reply("  while (true) {\n    await mineBlock(bot, 'oak_log', 1);\n  }")
+NO_CODE = "Explain: I am not sure how to do this."
+
+
+class FakeLLM(LLMPort):
+    """Answers each temperature with a scripted reply (or error) after a short delay."""
+
+    def __init__(self, replies):
+        self._replies = replies
+        self.temperatures = []
+
+    async def chat(self, messages, *, temperature=None):
+        reply = self._replies[len(self.temperatures)]
+        self.temperatures.append(temperature)
+        await asyncio.sleep(0.01)
+        if isinstance(reply, Exception):
+            raise reply
+        return Message("assistant", reply)
+
+
+def _planner(llm, candidates: int) -> PlannerService:
+    prompt_builder = Mock()
+    prompt_builder.build_prompt.return_value = (Message("system", "sys"), Message("user", "usr"))
+    return PlannerService(llm=llm, prompt_builder=prompt_builder, parser=JSParser(), candidates=candidates)
+
+
+async def _generate(planner: PlannerService):
+    return await planner.generate_code([MINE_WOOD_LOG], None, Mock(), Mock(), None, helpers=[MINE_BLOCK])
+
+
+class TestCandidateRanker:
+    """Unit tests for CandidateRanker"""
+
+    def _rank(self, *replies):
+        parser = JSParser()
+        candidates = [(parser.parse(reply), reply) for reply in replies]
+        return [reply for _, reply, _ in CandidateRanker().rank(candidates, [MINE_BLOCK], [MINE_WOOD_LOG])]
+
+    def test_static_failures_rank_last(self):
+        """Test that unparsable, unknown-helper and endless-loop candidates lose to a clean one"""
+        assert self._rank(NO_CODE, UNKNOWN_HELPER, ENDLESS, GOOD) == [GOOD, ENDLESS, UNKNOWN_HELPER, NO_CODE]
+
+    def test_similarity_breaks_ties(self):
+        """Test that among clean candidates the one closest to a known-good skill wins"""
+        plain = _reply("  await mineBlock(bot, 'oak_log', 3);", name="other")
+        assert self._rank(plain, GOOD) == [GOOD, plain]
+
+    def test_ties_keep_order(self):
+        """Test that equal candidates keep the input order"""
+        assert self._rank(GOOD, GOOD.replace("mineLogs", "getLogs")) == [GOOD, GOOD.replace("mineLogs", "getLogs")]
+
+
+class TestBestOfNPlanner:
+    """Unit tests for PlannerService with several candidates"""
+
+    @pytest.mark.asyncio
+    async def test_best_candidate_is_returned(self):
+        """Test that candidates are requested concurrently at spread temperatures and the best one wins"""
+        llm = FakeLLM([UNKNOWN_HELPER, ENDLESS, GOOD, NO_CODE])
+
+        code_snippet, reply = await _generate(_planner(llm, candidates=4))
+
+        assert reply == GOOD
+        assert code_snippet.function_name == "mineLogs"
+        assert llm.temperatures == pytest.approx([0.2, 0.2 + 0.8 / 3, 0.2 + 1.6 / 3, 1.0])
+
+    @pytest.mark.asyncio
+    async def test_failed_candidates_are_skipped(self):
+        """Test that an LLM error on one candidate does not fail the attempt, and all failing does"""
+        code_snippet, _ = await _generate(_planner(FakeLLM([TransientLLMError("overloaded"), GOOD]), candidates=2))
+        assert code_snippet.function_name == "mineLogs"
+
+        with pytest.raises(TransientLLMError):
+            await _generate(_planner(FakeLLM([TransientLLMError("a"), TransientLLMError("b")]), candidates=2))
+
+    @pytest.mark.asyncio
+    async def test_single_candidate_uses_the_default_temperature(self):
+        """Test that candidates=1 keeps the one-call path"""
+        llm = FakeLLM([UNKNOWN_HELPER])
+
+        _, reply = await _generate(_planner(llm, candidates=1))
+
+        assert reply == UNKNOWN_HELPER
+        assert llm.temperatures == [None]
@@ -0,0 +1,76 @@
+import pytest
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill
+from infrastructure.adapters.database import ChromaDatabase
+
+
+def _skill(name: str, description: str) -> Skill:
+    return Skill(name=name, code=f"async function {name}(bot) {{}}", description=description)
+
+
+@pytest.fixture
+def database(tmp_path):
+    return ChromaDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+
+
+class TestChromaDatabase:
+    """Unit tests for ChromaDatabase against a temporary persistent client"""
+
+    @pytest.mark.asyncio
+    async def test_count_tracks_add_and_clear(self, database):
+        """Test that the in-memory count follows adds, upserts and clear"""
+        await database.add([_skill("mineWoodLog", "mine wood log"), _skill("craftTable", "craft table")])
+        assert database.count() == 2
+
+        await database.add([_skill("mineWoodLog", "mine a wood log")])
+        assert database.count() == 2
+
+        await database.clear()
+        assert database.count() == 0
+        assert await database.query("mine wood log") == []
+
+    @pytest.mark.asyncio
+    async def test_count_is_loaded_on_reopen(self, database, tmp_path):
+        """Test that a new instance picks up the persisted documents"""
+        await database.add([_skill("mineWoodLog", "mine wood log")])
+
+        reopened = ChromaDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+        assert [skill.name for skill in await reopened.query("mine wood log")] == ["mineWoodLog"]
+        assert reopened.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_query_is_a_single_vector_search(self, database, monkeypatch):
+        """Test that query no longer lists or re-fetches the collection"""
+        await database.add([_skill("mineWoodLog", "mine wood log"), _skill("smeltIron", "smelt iron ingot")])
+
+        def fail(*args, **kwargs):
+            raise AssertionError("unexpected collection round trip")
+
+        monkeypatch.setattr(database._client, "list_collections", fail)
+        monkeypatch.setattr(database._client, "get_collection", fail)
+
+        skills = await database.query("mine wood log")
+        assert skills[0].name == "mineWoodLog"
+
+    @pytest.mark.asyncio
+    async def test_empty_collection_skips_the_search(self, database):
+        """Test that querying an empty library does not embed the query"""
+        embeddings = database._embeddings
+
+        assert await database.query("anything") == []
+        assert embeddings.calls == 0
+
+    @pytest.mark.asyncio
+    async def test_query_many_matches_query(self, tmp_path):
+        """Test that query_many returns per-query results with one embedding call"""
+        embeddings = HashEmbeddings()
+        database = ChromaDatabase("test_skills", embeddings, persist_dir=tmp_path, score_threshold=0.9)
+        await database.add([_skill("mineWoodLog", "mine wood log"), _skill("craftTable", "craft table")])
+        queries = ["mine wood log", "craft table", "swim"]
+        expected = [await database.query(query) for query in queries]
+
+        calls = embeddings.calls
+        assert await database.query_many(queries) == expected
+        assert embeddings.calls == calls + 1
+        assert await database.query_many([]) == []
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from domain.models import Message, Task
+from domain.services.curriculum import CurriculumService
+from infrastructure.parsers.qa_answer_parser import QAAnswerParser
+
+QUESTIONS = [f"Question {i}?" for i in range(5)]
+
+
+@pytest.fixture
+def qa_service():
+    qa_service = Mock()
+    qa_service.get_questions = AsyncMock(return_value=QUESTIONS)
+
+    async def get_answer(question):
+        await asyncio.sleep(0.05)
+        return f"answer to {question}"
+
+    qa_service.get_answer = AsyncMock(side_effect=get_answer)
+    return qa_service
+
+
+def _curriculum(qa_service, **kwargs):
+    llm = Mock()
+    llm.chat = AsyncMock(return_value=Message(role="assistant", content="Task: Mine 1 wood log"))
+    prompt_builder = Mock()
+    prompt_builder.build_prompt.return_value = (Message("system", "sys"), Message("user", "usr"))
+    parser = Mock()
+    parser.parse.return_value = Task(command="Mine 1 wood log", reasoning="", context="")
+    service = CurriculumService(llm=llm, qa_service=qa_service, prompt_builder=prompt_builder, parser=parser, **kwargs)
+    return service, prompt_builder
+
+
+class TestCurriculumQAAnswering:
+    """Unit tests for the QA fan-out in CurriculumService.get_next_task"""
+
+    @pytest.mark.asyncio
+    async def test_answers_are_fetched_concurrently(self, qa_service):
+        """Test that five 50ms answers take far less than 250ms"""
+        service, prompt_builder = _curriculum(qa_service, max_concurrent_answers=5)
+
+        start = time.perf_counter()
+        task = await service.get_next_task(observation=Mock())
+        elapsed = time.perf_counter() - start
+
+        assert task.command == "Mine 1 wood log"
+        assert elapsed < 0.15
+        qa_text = prompt_builder.build_prompt.call_args.kwargs["qa_text"]
+        assert all(f"answer to {q}" in qa_text for q in QUESTIONS)
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, qa_service):
+        """Test that at most max_concurrent_answers answers are in flight"""
+        in_flight = 0
+        peak = 0
+
+        async def get_answer(question):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "a"
+
+        qa_service.get_answer.side_effect = get_answer
+        service, _ = _curriculum(qa_service, max_concurrent_answers=2)
+
+        await service.get_next_task(observation=Mock())
+
+        assert peak == 2
+
+    @pytest.mark.asyncio
+    async def test_slow_and_failing_answers_are_dropped(self, qa_service):
+        """Test that timeouts and errors yield partial QA context"""
+        async def get_answer(question):
+            if question == QUESTIONS[0]:
+                await asyncio.sleep(1)
+            if question == QUESTIONS[1]:
+                raise RuntimeError("LLM down")
+            return f"answer to {question}"
+
+        qa_service.get_answer.side_effect = get_answer
+        service, prompt_builder = _curriculum(qa_service, answer_timeout=0.05)
+
+        await service.get_next_task(observation=Mock())
+
+        qa_text = prompt_builder.build_prompt.call_args.kwargs["qa_text"]
+        assert QUESTIONS[0] not in qa_text
+        assert QUESTIONS[1] not in qa_text
+        assert all(f"answer to {q}" in qa_text for q in QUESTIONS[2:])
+
+    @pytest.mark.asyncio
+    async def test_batched_mode_uses_a_single_call(self, qa_service):
+        """Test that batch_answers routes through get_answers_batched"""
+        qa_service.get_answers_batched = AsyncMock(return_value=["Answer: a", "", "Answer: c", "Answer: d", "Answer: e"])
+        service, prompt_builder = _curriculum(qa_service, batch_answers=True)
+
+        await service.get_next_task(observation=Mock())
+
+        qa_service.get_answers_batched.assert_awaited_once_with(QUESTIONS)
+        qa_service.get_answer.assert_not_awaited()
+        assert QUESTIONS[1] not in prompt_builder.build_prompt.call_args.kwargs["qa_text"]
+
+
+class TestQAAnswerParser:
+    """Unit tests for QAAnswerParser"""
+
+    def test_parse_numbered_answers(self):
+        """Test multi-line answers and gaps in numbering"""
+        text = (
+            "Answer 1: Oak logs.\n"
+            "Answer 3: Use a crafting table\n"
+            "with 3 planks and 2 sticks.\n"
+        )
+        assert QAAnswerParser().parse(text) == ["Oak logs.", "", "Use a crafting table with 3 planks and 2 sticks."]
+
+    def test_parse_without_answers(self):
+        """Test that a reply without numbered answers yields no answers"""
+        assert QAAnswerParser().parse("I don't know.") == []
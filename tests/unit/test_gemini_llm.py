@@ -0,0 +1,191 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from domain.exceptions import LLMError
+from domain.models import Message
+from infrastructure.adapters.llm.gemini_llm import GeminiLLM
+
+
+class _GeminiStandIn(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Gemini `generateContent` and `cachedContents` endpoints."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        if self.path == "/v1beta/cachedContents":
+            with server.lock:
+                server.requests.append((self.path, body))
+            self._reply(200, json.dumps({"name": f"cachedContents/c{len(server.requests)}"}).encode())
+            return
+        with server.lock:
+            server.requests.append((self.path, body))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if server.status != 200:
+            payload = json.dumps({"error": {"message": "quota exceeded"}}).encode()
+        elif "streamGenerateContent" in self.path:
+            events = [
+                {"candidates": [{"content": {"role": "model", "parts": [{"text": word}]}}]}
+                for word in ("echo", ": ", "stream")
+            ] + [{"usageMetadata": {"totalTokenCount": 3}}]
+            payload = "".join(f"data: {json.dumps(event)}\r\n\r\n" for event in events).encode()
+        else:
+            user_text = body["contents"][-1]["parts"][-1]["text"]
+            payload = json.dumps({
+                "candidates": [{"content": {"role": "model", "parts": [{"text": f"echo: {user_text}"}]}}],
+                "usageMetadata": {"cachedContentTokenCount": 100 if "cachedContent" in body else 0},
+            }).encode()
+        self._reply(server.status, payload)
+
+    def _reply(self, status, payload):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _GeminiStandIn)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0.0
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_llm(server, **kwargs) -> tuple[GeminiLLM, httpx.AsyncClient]:
+    client = httpx.AsyncClient()
+    host, port = server.server_address
+    llm = GeminiLLM("gemini-test", api_key="test-key", base_url=f"http://{host}:{port}", client=client, **kwargs)
+    return llm, client
+
+
+class TestGeminiLLM:
+    """Unit tests for GeminiLLM against a local stand-in server"""
+
+    @pytest.mark.asyncio
+    async def test_chat_maps_roles_and_returns_text(self, stand_in):
+        """Test that system/user/assistant messages are mapped to the REST payload"""
+        llm, client = _make_llm(stand_in)
+        try:
+            reply = await llm.chat([
+                Message(role="system", content="be brief"),
+                Message(role="assistant", content="ok"),
+                Message(role="user", content="hello"),
+            ])
+        finally:
+            await client.aclose()
+
+        assert reply == Message(role="assistant", content="echo: hello")
+        path, body = stand_in.requests[0]
+        assert path == "/v1beta/models/gemini-test:generateContent"
+        assert body["systemInstruction"] == {"parts": [{"text": "be brief"}]}
+        assert [c["role"] for c in body["contents"]] == ["model", "user"]
+
+    @pytest.mark.asyncio
+    async def test_temperature_is_sent_as_generation_config(self, stand_in):
+        """Test that an explicit temperature is sent and the default sends none"""
+        llm, client = _make_llm(stand_in)
+        try:
+            await llm.chat([Message(role="user", content="hello")], temperature=0.7)
+            await llm.chat([Message(role="user", content="hello")])
+        finally:
+            await client.aclose()
+
+        assert stand_in.requests[0][1]["generationConfig"] == {"temperature": 0.7}
+        assert "generationConfig" not in stand_in.requests[1][1]
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, stand_in):
+        """Test that no more than max_concurrency requests are in flight"""
+        stand_in.delay = 0.05
+        llm, client = _make_llm(stand_in, max_concurrency=3)
+        try:
+            replies = await asyncio.gather(*[
+                llm.chat([Message(role="user", content=str(i))]) for i in range(12)
+            ])
+        finally:
+            await client.aclose()
+
+        assert len(replies) == 12
+        assert stand_in.max_in_flight == 3
+
+    @pytest.mark.asyncio
+    async def test_http_error_raises_llm_error(self, stand_in):
+        """Test that a non-2xx response surfaces as LLMError"""
+        stand_in.status = 429
+        llm, client = _make_llm(stand_in)
+        try:
+            with pytest.raises(LLMError, match="429"):
+                await llm.chat([Message(role="user", content="hello")])
+        finally:
+            await client.aclose()
+
+    @pytest.mark.asyncio
+    async def test_chat_stream_yields_chunks(self, stand_in):
+        """Test that the SSE stream is decoded into text chunks"""
+        llm, client = _make_llm(stand_in)
+        try:
+            chunks = [chunk async for chunk in llm.chat_stream([Message(role="user", content="hello")])]
+        finally:
+            await client.aclose()
+
+        assert chunks == ["echo", ": ", "stream"]
+        assert stand_in.requests[0][0] == "/v1beta/models/gemini-test:streamGenerateContent?alt=sse"
+
+    @pytest.mark.asyncio
+    async def test_context_cache_reuses_static_prefix(self, stand_in):
+        """Test that a marked system prefix is cached once and referenced by later calls"""
+        llm, client = _make_llm(stand_in, context_cache=True, min_cached_prefix_chars=10)
+        prefix = "static planner instructions"
+        try:
+            for suffix in (" + skills A", " + skills B"):
+                system = Message(role="system", content=prefix + suffix, prefix_len=len(prefix))
+                await llm.chat([system, Message(role="user", content="hello")])
+        finally:
+            await client.aclose()
+
+        paths = [path for path, _ in stand_in.requests]
+        assert paths.count("/v1beta/cachedContents") == 1
+        cache_body = stand_in.requests[0][1]
+        assert cache_body["systemInstruction"] == {"parts": [{"text": prefix}]}
+        _, body = stand_in.requests[-1]
+        assert body["cachedContent"] == "cachedContents/c1"
+        assert "systemInstruction" not in body
+        assert body["contents"][0]["parts"] == [{"text": " + skills B"}, {"text": "hello"}]
+        assert llm.cached_prompt_tokens == 200
+
+    @pytest.mark.asyncio
+    async def test_short_prefix_is_not_cached(self, stand_in):
+        """Test that prefixes below the minimum size are sent inline"""
+        llm, client = _make_llm(stand_in, context_cache=True, min_cached_prefix_chars=1000)
+        try:
+            await llm.chat([Message(role="system", content="short", prefix_len=5), Message(role="user", content="hi")])
+        finally:
+            await client.aclose()
+
+        assert [path for path, _ in stand_in.requests] == ["/v1beta/models/gemini-test:generateContent"]
+        assert stand_in.requests[0][1]["systemInstruction"] == {"parts": [{"text": "short"}]}
@@ -0,0 +1,214 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from domain.models import Message, Skill, Task
+from domain.ports import LLMPort
+from infrastructure.adapters.database import InstrumentedDatabase, NumpyVectorDatabase
+from infrastructure.adapters.llm import InstrumentedLLM
+from infrastructure.metrics import STAGE_SECONDS, Histogram, MetricsRegistry
+
+
+class FakeLLM(LLMPort):
+    supports_streaming = True
+
+    def __init__(self, error: Exception = None, delay: float = 0.0):
+        self._error = error
+        self._delay = delay
+
+    async def chat(self, messages, *, temperature=None):
+        await asyncio.sleep(self._delay)
+        if self._error:
+            raise self._error
+        return Message("assistant", "ok")
+
+    async def chat_stream(self, messages, *, temperature=None):
+        for chunk in ("o", "k"):
+            yield chunk
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0, float(len(text))] for text in texts]
+
+    def embed_query(self, text):
+        return [1.0, float(len(text))]
+
+
+class TestHistogram:
+    """Unit tests for Histogram"""
+
+    def test_prometheus_text_format(self):
+        """Test that buckets are cumulative, +Inf equals the count and label values are escaped"""
+        registry = MetricsRegistry()
+        histogram = registry.histogram("call_seconds", "Call latency.", ("service",), buckets=(0.1, 1.0))
+        for seconds in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(seconds, 'say "hi"')
+
+        assert registry.render() == (
+            "# HELP call_seconds Call latency.\n"
+            "# TYPE call_seconds histogram\n"
+            'call_seconds_bucket{service="say \\"hi\\"",le="0.1"} 2\n'
+            'call_seconds_bucket{service="say \\"hi\\"",le="1.0"} 3\n'
+            'call_seconds_bucket{service="say \\"hi\\"",le="+Inf"} 4\n'
+            'call_seconds_sum{service="say \\"hi\\""} 3.65\n'
+            'call_seconds_count{service="say \\"hi\\""} 4\n'
+        )
+
+    def test_timer_and_label_checks(self):
+        """Test that time() observes the block even when it raises, and a wrong label count is rejected"""
+        histogram = Histogram("stage_seconds", "Stages.", ("stage",))
+        with pytest.raises(RuntimeError):
+            with histogram.time("critic"):
+                raise RuntimeError("boom")
+
+        assert histogram.labels("critic").count == 1
+        with pytest.raises(ValueError):
+            histogram.observe(1.0, "critic", "extra")
+
+    def test_duplicate_names_are_rejected(self):
+        """Test that a registry refuses two metrics with one name"""
+        registry = MetricsRegistry()
+        registry.histogram("x_seconds", "X.")
+        with pytest.raises(ValueError):
+            registry.histogram("x_seconds", "X.")
+
+
+class TestInstrumentedLLM:
+    """Unit tests for InstrumentedLLM"""
+
+    @pytest.mark.asyncio
+    async def test_outcomes(self):
+        """Test that successful, failed and cancelled calls are recorded under their outcome"""
+        histogram = Histogram("llm_seconds", "LLM.", ("service", "outcome"))
+
+        await InstrumentedLLM(FakeLLM(), "planner", histogram).chat([Message("user", "q")])
+        with pytest.raises(TimeoutError):
+            await InstrumentedLLM(FakeLLM(error=TimeoutError()), "planner", histogram).chat([Message("user", "q")])
+        slow = asyncio.create_task(InstrumentedLLM(FakeLLM(delay=1.0), "qa", histogram).chat([Message("user", "q")]))
+        await asyncio.sleep(0)
+        slow.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await slow
+
+        assert histogram.labels("planner", "ok").count == 1
+        assert histogram.labels("planner", "error").count == 1
+        assert histogram.labels("qa", "cancelled").count == 1
+
+    @pytest.mark.asyncio
+    async def test_stream(self):
+        """Test that a stream is recorded once: ok when exhausted, closed_early when the consumer closes it after one chunk"""
+        histogram = Histogram("llm_seconds", "LLM.", ("service", "outcome"))
+        llm = InstrumentedLLM(FakeLLM(), "planner", histogram)
+
+        assert llm.supports_streaming
+        assert [chunk async for chunk in llm.chat_stream([Message("user", "q")])] == ["o", "k"]
+        stream = llm.chat_stream([Message("user", "q")])
+        await stream.__anext__()
+        await stream.aclose()
+
+        assert histogram.labels("planner", "ok").count == 1
+        assert histogram.labels("planner", "closed_early").count == 1
+        assert histogram.labels("planner", "cancelled").count == 0
+
+    @pytest.mark.asyncio
+    async def test_cancelled_stream(self):
+        """Test that a stream whose consumer task is cancelled is recorded as cancelled, not closed_early"""
+        histogram = Histogram("llm_seconds", "LLM.", ("service", "outcome"))
+
+        class SlowStream(FakeLLM):
+            async def chat_stream(self, messages, *, temperature=None):
+                yield "o"
+                await asyncio.sleep(10)
+                yield "k"
+
+        async def consume():
+            async for _ in InstrumentedLLM(SlowStream(), "planner", histogram).chat_stream([Message("user", "q")]):
+                pass
+
+        task = asyncio.create_task(consume())
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert histogram.labels("planner", "cancelled").count == 1
+        assert histogram.labels("planner", "closed_early").count == 0
+
+
+class TestInstrumentedDatabase:
+    """Unit tests for InstrumentedDatabase"""
+
+    @pytest.mark.asyncio
+    async def test_calls_are_forwarded_and_timed(self, tmp_path):
+        """Test that port methods reach the wrapped database and are recorded per operation"""
+        histogram = Histogram("db_seconds", "DB.", ("collection", "operation"))
+        backend = NumpyVectorDatabase(collection_name="skills", embedding_model=FakeEmbeddings(), persist_dir=tmp_path)
+        database = InstrumentedDatabase(backend, "skills", histogram)
+
+        database.store("mine wood", "mineWood")
+        await database.add([Skill("mineWood", "async function mineWood(bot) {}", "Mines wood.")])
+
+        assert database.lookup("mine wood") == "mineWood"
+        assert [skill.name for skill in await database.get_all()] == ["mineWood"]
+        assert [len(result) for result in await database.query_many(["Mines wood."])] == [1]
+        for operation in ("store", "add", "lookup", "get_all", "query_many"):
+            assert histogram.labels("skills", operation).count == 1
+
+    @pytest.mark.asyncio
+    async def test_compact_reaches_the_backend(self, tmp_path):
+        """Test that compact is forwarded through the port, folding the journal into a snapshot"""
+        histogram = Histogram("db_seconds", "DB.", ("collection", "operation"))
+        backend = NumpyVectorDatabase(collection_name="skills", embedding_model=FakeEmbeddings(), persist_dir=tmp_path)
+        database = InstrumentedDatabase(backend, "skills", histogram)
+        await database.add([Skill("mineWood", "async function mineWood(bot) {}", "Mines wood.")])
+        assert (tmp_path / "skills.log.jsonl").exists()
+
+        await database.compact()
+
+        assert not (tmp_path / "skills.log.jsonl").exists()
+        assert (tmp_path / "skills.npy").exists()
+        assert histogram.labels("skills", "compact").count == 1
+
+
+class TestControllerStages:
+    """Unit tests for the stage timing of AgentController"""
+
+    @pytest.mark.asyncio
+    async def test_each_stage_is_timed(self):
+        """Test that one successful task records every stage of the loop under the agent's label"""
+        from application.agent_controller import AgentController
+        from benchmarks.curriculum_latency import _observation
+        from infrastructure.parsers import JSParser
+
+        snippet = JSParser().parse("```javascript\nasync function mineLogs(bot) {\n  await mineBlock(bot, 'oak_log', 1);\n}\n```")
+        planner = Mock()
+        planner.generate_code = AsyncMock(return_value=(snippet, ""))
+        env = Mock()
+        env.reset = AsyncMock(return_value=_observation())
+        env.step = AsyncMock(return_value=_observation())
+        curriculum = Mock()
+        curriculum.get_next_task = AsyncMock(side_effect=[Task(command="Mine 1 wood log", reasoning="", context=""), None])
+        skills = Mock()
+        skills.retrieve_skillset = AsyncMock(return_value=[])
+        skills.available_helpers.side_effect = lambda helpers: list(helpers)
+        skills.resolve_helpers.return_value = []
+        critic = Mock()
+        critic.evaluate = AsyncMock(return_value=(True, ""))
+        controller = AgentController(
+            curriculum_service=curriculum, skill_service=skills, planner_service=planner, critic_service=critic,
+            env=env, speculative_curriculum=False, agent_id="stage_timer",
+        )
+        controller._skill_ingestion = Mock(start=Mock(), submit=AsyncMock(), flush=AsyncMock())
+
+        controller.start()
+        await controller._running_task
+
+        counts = {stage: STAGE_SECONDS.labels("stage_timer", stage).count for stage in (
+            "env_reset", "curriculum", "broadcast", "retrieval", "planner", "parse", "env_step", "critic", "skill_queue",
+        )}
+        assert counts == {
+            "env_reset": 1, "curriculum": 2, "broadcast": 3, "retrieval": 1, "planner": 1,
+            "parse": 1, "env_step": 1, "critic": 1, "skill_queue": 1,
+        }
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import pytest
+
+from domain.models import Message
+from domain.ports import LLMPort
+from infrastructure.adapters.llm import ModelRouter, RateLimitedLLM, ResilientLLM
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "configs" / "llm_config.yaml"
+
+
+class FakeLLM(LLMPort):
+    built = []
+
+    def __init__(self, model_name, **options):
+        self.model_name = model_name
+        self.options = options
+        FakeLLM.built.append(self)
+
+    async def chat(self, messages):
+        return Message(role="assistant", content=self.model_name)
+
+
+@pytest.fixture
+def providers():
+    FakeLLM.built = []
+    return {"gemini": FakeLLM, "ollama": FakeLLM}
+
+
+class TestModelRouter:
+    """Unit tests for ModelRouter"""
+
+    def test_shipped_config_routes(self, providers):
+        """Test that only the planner and critic use the pro model"""
+        router = ModelRouter.from_yaml(CONFIG_PATH, providers=providers)
+
+        assert router.model_for("planner") == router.model_for("critic") == "gemini-1.5-pro-latest"
+        for service in ("curriculum", "qa", "skill_description"):
+            assert router.model_for(service) == "gemini-1.5-flash-latest"
+
+    @pytest.mark.asyncio
+    async def test_one_backend_per_model(self, providers):
+        """Test that services routed to the same model share one adapter"""
+        router = ModelRouter(
+            models={
+                "big": {"provider": "gemini", "model": "big-model", "max_concurrency": 2},
+                "small": {"provider": "ollama", "model": "small-model"},
+            },
+            routes={"planner": "big", "qa": "small", "skill_description": "small"},
+            providers=providers,
+        )
+
+        qa = router.llm_for("qa")
+        skill = router.llm_for("skill_description")
+        planner = router.llm_for("planner")
+
+        assert qa is skill
+        assert [b.model_name for b in FakeLLM.built] == ["small-model", "big-model"]
+        assert FakeLLM.built[1].options == {"max_concurrency": 2}
+        assert (await planner.chat([Message("user", "hi")])).content == "big-model"
+
+    def test_rate_limits_share_a_scheduler(self, providers):
+        """Test that a model with rate_limits wraps its services in one QuotaScheduler"""
+        router = ModelRouter(
+            models={"m": {
+                "provider": "gemini",
+                "model": "m",
+                "rate_limits": {"requests_per_minute": 10, "tokens_per_minute": 1000},
+            }},
+            routes={"planner": "m", "qa": "m"},
+            providers=providers,
+        )
+
+        planner = router.llm_for("planner")
+        qa = router.llm_for("qa")
+
+        assert isinstance(planner, RateLimitedLLM) and isinstance(qa, RateLimitedLLM)
+        assert planner.model_name == "m"
+        assert router.scheduler("m") is router.scheduler("m")
+        assert "rate_limits" not in FakeLLM.built[0].options
+
+    def test_resilience_wraps_each_service(self, providers):
+        """Test that resilience defaults apply per service with overrides"""
+        router = ModelRouter(
+            models={"m": {"provider": "gemini", "model": "m"}},
+            routes={"planner": "m", "qa": "m"},
+            resilience={"deadline": 30, "services": {"qa": {"hedge": True}}},
+            providers=providers,
+        )
+
+        planner = router.llm_for("planner")
+        qa = router.llm_for("qa")
+
+        assert isinstance(planner, ResilientLLM) and isinstance(qa, ResilientLLM)
+        assert planner.hedge_delay() is None
+        assert qa._hedge and not planner._hedge
+        assert qa._deadline == planner._deadline == 30
+
+    def test_scheduler_owns_rate_limit_retries(self, providers):
+        """Test that on a rate-limited model ResilientLLM leaves 429s to the scheduler"""
+        router = ModelRouter(
+            models={
+                "limited": {"provider": "gemini", "model": "m", "rate_limits": {"requests_per_minute": 10, "tokens_per_minute": 1000}},
+                "free": {"provider": "gemini", "model": "f"},
+            },
+            routes={"planner": "limited", "qa": "free"},
+            resilience={"max_retries": 2},
+            providers=providers,
+        )
+
+        assert not router.llm_for("planner")._retry_rate_limits
+        assert router.llm_for("qa")._retry_rate_limits
+
+    def test_invalid_config(self, providers):
+        """Test that bad routes and providers fail at construction"""
+        with pytest.raises(ValueError):
+            ModelRouter({"m": {"provider": "gemini", "model": "m"}}, {"planner": "missing"}, providers=providers)
+        with pytest.raises(ValueError):
+            ModelRouter({"m": {"provider": "openai", "model": "m"}}, {"planner": "m"}, providers=providers)
+
+    def test_unrouted_service(self, providers):
+        """Test that asking for a service without a route raises KeyError"""
+        router = ModelRouter({"m": {"provider": "gemini", "model": "m"}}, {"planner": "m"}, providers=providers)
+        with pytest.raises(KeyError):
+            router.llm_for("critic")
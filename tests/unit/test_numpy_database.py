@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill
+from infrastructure.adapters.database import NumpyVectorDatabase
+
+
+def _skill(name: str, description: str) -> Skill:
+    return Skill(name=name, code=f"async function {name}(bot) {{}}", description=description)
+
+
+SKILLS = [
+    _skill("mineWoodLog", "mine wood log"),
+    _skill("craftTable", "craft crafting table"),
+    _skill("smeltIron", "smelt iron ingot in furnace"),
+]
+
+
+@pytest.fixture
+def database(tmp_path):
+    return NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+
+
+class TestNumpyVectorDatabase:
+    """Unit tests for NumpyVectorDatabase"""
+
+    @pytest.mark.asyncio
+    async def test_query_returns_nearest_first(self, database):
+        """Test cosine top-k ordering and the distance threshold"""
+        await database.add(SKILLS)
+
+        skills = await database.query("mine a wood log")
+
+        assert skills[0].name == "mineWoodLog"
+        assert "smeltIron" not in [skill.name for skill in skills]  # no shared words -> distance 1.0
+
+    @pytest.mark.asyncio
+    async def test_top_k_larger_than_library(self, tmp_path):
+        """Test that top-k is capped by the library size"""
+        database = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=2.0)
+        await database.add(SKILLS[:2])
+
+        assert len(await database.query("mine wood log")) == 2
+
+    @pytest.mark.asyncio
+    async def test_upsert_keeps_count(self, database):
+        """Test that re-adding a skill replaces it in place"""
+        await database.add(SKILLS)
+        await database.add([_skill("mineWoodLog", "chop tree")])
+
+        assert database.count() == 3
+        assert (await database.query("chop tree"))[0].description == "chop tree"
+
+    @pytest.mark.asyncio
+    async def test_persisted_and_memory_mapped(self, database, tmp_path):
+        """Test that a new instance loads the compacted .npy file with mmap and can keep writing"""
+        await database.add(SKILLS)
+        await database.compact()
+
+        reopened = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+        assert (await reopened.query("smelt iron"))[0].name == "smeltIron"
+        assert isinstance(reopened._matrix, np.memmap)
+        assert reopened.count() == 3
+
+        await reopened.add([_skill("killZombie", "kill zombie with sword")])
+        assert reopened.count() == 4
+        assert (await reopened.query("kill zombie"))[0].name == "killZombie"
+
+    @pytest.mark.asyncio
+    async def test_inserts_append_to_the_journal(self, database, tmp_path):
+        """Test that single inserts append a journal line instead of rewriting the snapshot, and replay on load"""
+        await database.add(SKILLS[:1])
+        await database.compact()
+        snapshot = (tmp_path / "test_skills.npy").stat().st_mtime_ns
+
+        await database.add(SKILLS[1:])
+        await database.semantic_store("How to obtain iron ore?", "Answer: mine it")
+        database._remove(["mineWoodLog"])
+
+        assert (tmp_path / "test_skills.npy").stat().st_mtime_ns == snapshot
+        assert len((tmp_path / "test_skills.log.jsonl").read_text().splitlines()) == 4
+        with open(tmp_path / "test_skills.log.jsonl", "a") as f:
+            f.write('{"id": "torn", "metad')  # crash mid-append
+
+        reopened = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+        assert sorted(skill.name for skill in await reopened.get_all()) == ["craftTable", "smeltIron"]
+        assert await reopened.semantic_lookup("How to obtain iron ore?", max_distance=0.01) == "Answer: mine it"
+
+    @pytest.mark.asyncio
+    async def test_journal_is_compacted(self, tmp_path):
+        """Test that the journal is folded into the snapshot once it outgrows the index"""
+        database = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, compact_after=2)
+        for skill in SKILLS + [_skill("mineWoodLog", "chop tree")]:  # 4 entries > max(2, 3 rows)
+            await database.add([skill])
+
+        assert not (tmp_path / "test_skills.log.jsonl").exists()
+        reopened = NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path)
+        assert sorted(skill.name for skill in await reopened.get_all()) == sorted(skill.name for skill in SKILLS)
+
+    @pytest.mark.asyncio
+    async def test_query_many_matches_query(self, database):
+        """Test that the batched search returns the same rankings as single queries"""
+        await database.add(SKILLS)
+        queries = ["mine wood log", "smelt iron", "craft table", "swim"]
+
+        expected = [await database.query(query) for query in queries]
+        assert await database.query_many(queries) == expected
+
+    @pytest.mark.asyncio
+    async def test_clear(self, database, tmp_path):
+        """Test that clear empties the index and removes the files"""
+        await database.add(SKILLS)
+        await database.clear()
+
+        assert database.count() == 0
+        assert await database.query("mine wood log") == []
+        assert list(tmp_path.glob("test_skills.*")) == []
+
+    @pytest.mark.asyncio
+    async def test_semantic_key_value(self, database):
+        """Test semantic_store / semantic_lookup with a distance bound"""
+        await database.semantic_store("How to obtain iron ore?", "Answer: mine stone with a stone pickaxe")
+
+        assert await database.semantic_lookup("How to obtain iron ore?", max_distance=0.01) == \
+            "Answer: mine stone with a stone pickaxe"
+        assert await database.semantic_lookup("What do cows drop?", max_distance=0.1) is None
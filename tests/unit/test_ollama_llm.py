@@ -0,0 +1,188 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from domain.exceptions import LLMError, TransientLLMError
+from domain.models import Message
+from infrastructure.adapters.llm.ollama_llm import OllamaLLM
+
+
+class _OllamaStandIn(BaseHTTPRequestHandler):
+    """Minimal stand-in for the Ollama `/api/chat` endpoint (JSON and NDJSON streaming)."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with server.lock:
+            server.requests.append((self.path, body))
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        time.sleep(server.delay)
+        with server.lock:
+            server.in_flight -= 1
+
+        if server.status != 200:
+            payload = json.dumps({"error": "model 'missing' not found"}).encode()
+        elif body.get("stream", True):
+            lines = [
+                {"model": body["model"], "message": {"role": "assistant", "content": word}, "done": False}
+                for word in ("echo", ": ", "stream")
+            ] + [{"model": body["model"], "message": {"role": "assistant", "content": ""}, "done": True}]
+            payload = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        else:
+            user_text = body["messages"][-1]["content"] if body["messages"] else ""
+            payload = json.dumps({
+                "model": body["model"],
+                "message": {"role": "assistant", "content": f"echo: {user_text}"},
+                "done": True,
+            }).encode()
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _OllamaStandIn)
+    server.lock = threading.Lock()
+    server.requests = []
+    server.in_flight = 0
+    server.max_in_flight = 0
+    server.delay = 0.0
+    server.status = 200
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_llm(server, **kwargs) -> tuple[OllamaLLM, httpx.AsyncClient]:
+    client = httpx.AsyncClient()
+    host, port = server.server_address
+    llm = OllamaLLM("llama-test", base_url=f"http://{host}:{port}", client=client, **kwargs)
+    return llm, client
+
+
+class TestOllamaLLM:
+    """Unit tests for OllamaLLM against a local stand-in server"""
+
+    @pytest.mark.asyncio
+    async def test_chat_sends_messages_and_keep_alive(self, stand_in):
+        """Test the request payload and the decoded reply"""
+        llm, client = _make_llm(stand_in, keep_alive="1h", options={"temperature": 0})
+        try:
+            reply = await llm.chat([
+                Message(role="system", content="be brief"),
+                Message(role="user", content="hello"),
+            ])
+        finally:
+            await client.aclose()
+
+        assert reply == Message(role="assistant", content="echo: hello")
+        path, body = stand_in.requests[0]
+        assert path == "/api/chat"
+        assert body["model"] == "llama-test"
+        assert body["stream"] is False
+        assert body["keep_alive"] == "1h"
+        assert body["options"] == {"temperature": 0}
+        assert [m["role"] for m in body["messages"]] == ["system", "user"]
+
+    @pytest.mark.asyncio
+    async def test_temperature_overrides_the_options(self, stand_in):
+        """Test that a per-call temperature replaces the configured one and keeps the other options"""
+        llm, client = _make_llm(stand_in, options={"temperature": 0, "num_ctx": 8192})
+        try:
+            await llm.chat([Message(role="user", content="hello")], temperature=0.9)
+        finally:
+            await client.aclose()
+
+        assert stand_in.requests[0][1]["options"] == {"temperature": 0.9, "num_ctx": 8192}
+
+    @pytest.mark.asyncio
+    async def test_chat_does_not_block_the_event_loop(self, stand_in):
+        """Test that other coroutines keep running while a generation is in flight"""
+        stand_in.delay = 0.2
+        llm, client = _make_llm(stand_in)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            await llm.chat([Message(role="user", content="hello")])
+        finally:
+            task.cancel()
+            await client.aclose()
+
+        assert ticks >= 10
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self, stand_in):
+        """Test that no more than max_concurrency generations are in flight"""
+        stand_in.delay = 0.05
+        llm, client = _make_llm(stand_in, max_concurrency=2)
+        try:
+            replies = await asyncio.gather(*[
+                llm.chat([Message(role="user", content=str(i))]) for i in range(6)
+            ])
+        finally:
+            await client.aclose()
+
+        assert len(replies) == 6
+        assert stand_in.max_in_flight == 2
+
+    @pytest.mark.asyncio
+    async def test_chat_stream_yields_chunks(self, stand_in):
+        """Test that the NDJSON stream is decoded into text chunks"""
+        llm, client = _make_llm(stand_in)
+        try:
+            chunks = [chunk async for chunk in llm.chat_stream([Message(role="user", content="hello")])]
+        finally:
+            await client.aclose()
+
+        assert chunks == ["echo", ": ", "stream"]
+        assert stand_in.requests[0][1]["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_warm_up_loads_the_model(self, stand_in):
+        """Test that warm_up sends an empty chat request with keep_alive"""
+        llm, client = _make_llm(stand_in)
+        try:
+            await llm.warm_up()
+        finally:
+            await client.aclose()
+
+        body = stand_in.requests[0][1]
+        assert body["messages"] == []
+        assert body["keep_alive"] == "30m"
+
+    @pytest.mark.asyncio
+    async def test_http_errors(self, stand_in):
+        """Test that 4xx surfaces as LLMError and 5xx as TransientLLMError"""
+        llm, client = _make_llm(stand_in)
+        try:
+            stand_in.status = 404
+            with pytest.raises(LLMError, match="404"):
+                await llm.chat([Message(role="user", content="hello")])
+            stand_in.status = 503
+            with pytest.raises(TransientLLMError):
+                await llm.chat([Message(role="user", content="hello")])
+        finally:
+            await client.aclose()
@@ -0,0 +1,106 @@
+import pytest
+from unittest.mock import Mock
+
+from domain.models import Message, Task
+from domain.ports import LLMPort
+from domain.services.planner import PlannerService
+from infrastructure.parsers.js_code_parser import IncrementalJSParser, JSParser
+
+REPLY = (
+    "Explain: nothing yet\n"
+    "Plan:\n1) mine a log\n"
+    "Code:\n"
+    "```javascript\n"
+    "async function mineOneLog(bot) {\n"
+    "  await mineBlock(bot, \"oak_log\", 1);\n"
+    "}\n"
+    "```\n"
+    "That's it! This function mines one oak log and reports back when done."
+)
+
+
+class StreamingFakeLLM(LLMPort):
+    supports_streaming = True
+
+    def __init__(self, reply: str, chunk_size: int = 7):
+        self._chunks = [reply[i:i + chunk_size] for i in range(0, len(reply), chunk_size)]
+        self.yielded = 0
+        self.closed = False
+
+    async def chat(self, messages):
+        raise AssertionError("planner should stream")
+
+    async def chat_stream(self, messages):
+        try:
+            for chunk in self._chunks:
+                self.yielded += 1
+                yield chunk
+        finally:
+            self.closed = True
+
+
+def _planner(llm) -> PlannerService:
+    prompt_builder = Mock()
+    prompt_builder.build_prompt.return_value = (Message("system", "sys"), Message("user", "usr"))
+    return PlannerService(llm=llm, prompt_builder=prompt_builder, parser=JSParser())
+
+
+class TestIncrementalJSParser:
+    """Unit tests for IncrementalJSParser"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 3, 50, len(REPLY)])
+    def test_snippet_is_returned_once_fence_closes(self, chunk_size):
+        """Test that the snippet appears exactly when the closing fence is complete"""
+        parser = IncrementalJSParser()
+        closing_fence_end = REPLY.index("```\nThat's") + 3
+        result = None
+        consumed = 0
+        for i in range(0, len(REPLY), chunk_size):
+            chunk = REPLY[i:i + chunk_size]
+            consumed += len(chunk)
+            result = parser.feed(chunk)
+            if result is not None:
+                break
+
+        assert result == JSParser().parse(REPLY)
+        assert consumed >= closing_fence_end
+        assert consumed < closing_fence_end + chunk_size
+
+    def test_no_snippet_without_closing_fence(self):
+        """Test that an unterminated code block yields nothing"""
+        parser = IncrementalJSParser()
+        assert parser.feed("Code:\n```javascript\nasync function f(bot) {}\n``") is None
+
+
+class TestPlannerStreaming:
+    """Unit tests for early-exit streaming in PlannerService.generate_code"""
+
+    @pytest.mark.asyncio
+    async def test_generation_stops_after_code_block(self):
+        """Test that the trailing tokens are never read and the stream is closed"""
+        llm = StreamingFakeLLM(REPLY)
+        planner = _planner(llm)
+
+        code_snippet, llm_response = await planner.generate_code([], None, Mock(), Task("Mine 1 log", "", ""), None)
+
+        assert code_snippet.function_name == "mineOneLog"
+        assert code_snippet.execution_code == "await mineOneLog(bot);"
+        assert "That's it" not in llm_response
+        assert llm.yielded < len(llm._chunks)
+        assert llm.closed
+        assert JSParser().extract_plan(llm_response).strip() == "1) mine a log"
+
+    @pytest.mark.asyncio
+    async def test_non_streaming_adapter_uses_chat(self):
+        """Test that adapters without streaming keep the single-call path"""
+        llm = Mock(spec=LLMPort)
+        llm.supports_streaming = False
+
+        async def chat(messages):
+            return Message("assistant", REPLY)
+
+        llm.chat = chat
+        code_snippet, llm_response = await _planner(llm).generate_code([], None, Mock(), Task("t", "", ""), None)
+
+        assert code_snippet.function_name == "mineOneLog"
+        assert llm_response == REPLY
@@ -0,0 +1,202 @@
+import asyncio
+import shutil
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from domain.models import CodeSnippet
+from domain.services import PreflightValidator
+from domain.services.call_graph import string_arguments
+from infrastructure.adapters.game.minecraft import NodeSyntaxChecker, load_minecraft_names
+from infrastructure.parsers import JSParser
+from infrastructure.utils import load_skills
+
+PRIMITIVES = load_skills("infrastructure/primitive_skill/definitions")
+requires_node = pytest.mark.skipif(shutil.which("node") is None, reason="node is not installed")
+
+
+def _snippet(body: str) -> CodeSnippet:
+    return JSParser().parse(f"```javascript\nasync function mineLogs(bot) {{\n{body}\n}}\n```")
+
+
+@pytest.fixture
+def checker():
+    return NodeSyntaxChecker()
+
+
+class TestStringArguments:
+    """Unit tests for string_arguments"""
+
+    def test_literal_arguments_only(self):
+        """Test that string literals are found by position and runtime values are skipped"""
+        code = (
+            "// mineBlock(bot, 'commented_out')\n"
+            "await mineBlock(bot, 'oak_log', 3);\n"
+            "await smeltItem(bot, \"raw_iron\", `coal`, count);\n"
+            "await craftItem(bot, name, 1); bot.mineBlock('not_a_call');"
+        )
+        assert string_arguments(code, ["mineBlock", "smeltItem", "craftItem"]) == [
+            ("mineBlock", 1, "oak_log"), ("smeltItem", 1, "raw_iron"), ("smeltItem", 2, "coal"),
+        ]
+
+
+class TestPreflightValidator:
+    """Unit tests for PreflightValidator"""
+
+    @pytest.mark.asyncio
+    async def test_clean_program_passes(self):
+        """Test that a program using primitives with valid names has no problems"""
+        validator = PreflightValidator(names=load_minecraft_names())
+        snippet = _snippet(
+            "  await mineBlock(bot, 'oak_log', 3);\n"
+            "  await craftItem(bot, 'oak_planks', 4);\n"
+            "  const table = bot.findBlock({ matching: mcData.blocksByName.crafting_table.id });"
+        )
+
+        assert await validator.validate(snippet, PRIMITIVES) == []
+
+    @pytest.mark.asyncio
+    async def test_every_primitive_passes(self, checker):
+        """Test that the primitive library itself (throw new Error, called parameters, Promise executors) passes"""
+        validator = PreflightValidator(names=load_minecraft_names(), syntax_checker=checker)
+        problems = {}
+        for skill in PRIMITIVES:
+            snippet = CodeSnippet(function_name=skill.name, main_function_code=skill.code, execution_code=f"await {skill.name}(bot);")
+            problems[skill.name] = await validator.validate(snippet, PRIMITIVES)
+        await validator.close()
+
+        assert problems == {skill.name: [] for skill in PRIMITIVES}
+
+    @pytest.mark.asyncio
+    async def test_missing_function(self):
+        """Test that a reply without a function is rejected"""
+        problems = await PreflightValidator().validate(JSParser().parse("I cannot do that."), PRIMITIVES)
+        assert len(problems) == 1 and "async function" in problems[0]
+
+    @pytest.mark.asyncio
+    async def test_undefined_helper(self):
+        """Test that calling a function nobody defines is reported"""
+        problems = await PreflightValidator().validate(_snippet("  await chopTree(bot);"), PRIMITIVES)
+        assert problems == ["chopTree is called but not defined; define them in the code or use the functions you were given."]
+
+    @pytest.mark.asyncio
+    async def test_misspelled_names_get_a_hint(self):
+        """Test that unknown item, block and mcData names are reported with the closest real name"""
+        validator = PreflightValidator(names=load_minecraft_names())
+        snippet = _snippet(
+            "  await mineBlock(bot, 'oak_logs', 3);\n"
+            "  await killMob(bot, 'zombie', 300);\n"
+            "  const id = mcData.itemsByName['wooden_pickax'].id;"
+        )
+
+        assert await validator.validate(snippet, PRIMITIVES) == [
+            "'oak_logs' is not a Minecraft block name. Did you mean 'oak_log'?",
+            "'wooden_pickax' is not a Minecraft item name. Did you mean 'wooden_pickaxe'?",
+        ]
+
+    @requires_node
+    @pytest.mark.asyncio
+    async def test_syntax_error(self, checker):
+        """Test that code that does not compile is reported with its line"""
+        validator = PreflightValidator(syntax_checker=checker)
+        problems = await validator.validate(_snippet("  await mineBlock(bot, 'oak_log', 3;"), PRIMITIVES)
+
+        await checker.close()
+        assert len(problems) == 1
+        assert problems[0].startswith("The code does not compile: SyntaxError")
+        assert "(line 2)" in problems[0]
+
+
+class TestNodeSyntaxChecker:
+    """Unit tests for NodeSyntaxChecker"""
+
+    @requires_node
+    @pytest.mark.asyncio
+    async def test_one_worker_serves_every_check(self, checker):
+        """Test that valid code passes, top-level await is allowed and the process is reused"""
+        assert await checker.check("await bot.chat('hi');") is None
+        worker = checker._process
+        assert await checker.check("const x = ;") is not None
+        assert checker._process is worker
+        await checker.close()
+
+    @requires_node
+    @pytest.mark.asyncio
+    async def test_restarts_after_a_crash(self, checker):
+        """Test that a dead worker is replaced on the next check"""
+        await checker.check("1;")
+        checker._process.kill()
+        await checker._process.wait()
+
+        assert await checker.check("const x = ;") is not None
+        await checker.close()
+
+    @pytest.mark.asyncio
+    async def test_missing_node_skips_the_check(self):
+        """Test that without node every check passes"""
+        checker = NodeSyntaxChecker(node="definitely-not-node")
+        assert await checker.check("const x = ;") is None
+
+
+class TestControllerPreflight:
+    """Unit tests for the pre-flight step of AgentController"""
+
+    @pytest.mark.asyncio
+    async def test_failed_check_skips_the_environment(self):
+        """Test that a rejected program is not executed and its problems become the next critique"""
+        from application.agent_controller import AgentController
+        from benchmarks.curriculum_latency import _observation
+        from domain.models import Task
+
+        bad, good = _snippet("  await chopTree(bot);"), _snippet("  await mineBlock(bot, 'oak_log', 1);")
+        planner = Mock()
+        planner.generate_code = AsyncMock(side_effect=[(bad, ""), (good, "")])
+        env = Mock()
+        env.reset = AsyncMock(return_value=_observation())
+        env.step = AsyncMock(return_value=_observation())
+        curriculum = Mock()
+        curriculum.get_next_task = AsyncMock(side_effect=[Task(command="Mine 1 wood log", reasoning="", context=""), None])
+        skills = Mock()
+        skills.retrieve_skillset = AsyncMock(return_value=[])
+        skills.available_helpers.side_effect = lambda helpers: list(helpers)
+        skills.resolve_helpers.return_value = []
+        critic = Mock()
+        critic.evaluate = AsyncMock(return_value=(True, ""))
+        controller = AgentController(
+            curriculum_service=curriculum, skill_service=skills, planner_service=planner, critic_service=critic,
+            env=env, speculative_curriculum=False, preflight=PreflightValidator(),
+        )
+        controller._skill_ingestion = Mock(start=Mock(), submit=AsyncMock(), flush=AsyncMock())
+
+        with patch("application.agent_controller.websocket_manager") as websocket:
+            websocket.broadcast = AsyncMock()
+            controller.start()
+            await controller._running_task
+
+        env.step.assert_awaited_once()
+        assert env.step.await_args.args[0] is good
+        assert "chopTree is called but not defined" in planner.generate_code.await_args_list[1].args[4]
+        rejected = [call.args[0] for call in websocket.broadcast.await_args_list if "chopTree" in call.args[0]["critique"]]
+        assert len(rejected) >= 1 and rejected[0]["success"] is False and "plan" in rejected[0]
+
+    @pytest.mark.asyncio
+    async def test_stop_closes_the_syntax_checker(self):
+        """Test that stopping the agent releases the validator's node worker"""
+        from application.agent_controller import AgentController
+
+        async def never(*args):
+            await asyncio.Event().wait()
+
+        env = Mock(reset=AsyncMock(side_effect=never), close=AsyncMock())
+        skills = Mock(clear=AsyncMock())
+        preflight = Mock(close=AsyncMock())
+        controller = AgentController(
+            curriculum_service=Mock(flush=AsyncMock()), skill_service=skills, planner_service=Mock(), critic_service=Mock(),
+            env=env, speculative_curriculum=False, preflight=preflight,
+        )
+
+        controller.start()
+        await asyncio.sleep(0.01)
+        await controller.stop()
+
+        preflight.close.assert_awaited_once()
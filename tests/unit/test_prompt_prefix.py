@@ -0,0 +1,94 @@
+from types import SimpleNamespace
+
+import pytest
+
+import infrastructure.prompts.builders  # noqa: F401  registers the builders
+from domain.models import Message, Skill
+from domain.ports import LLMPort
+from infrastructure.prompts.registry import get
+from infrastructure.utils import load_skills
+
+PRIMITIVE_USAGE = load_skills("infrastructure/primitive_skill/usage")
+
+
+class PrefixReuseLLM(LLMPort):
+    """Fake local model with a KV cache: counts prompt tokens shared with the previous prompt."""
+
+    def __init__(self):
+        self._last_tokens: list[str] = []
+        self.reused_tokens = 0
+        self.prompt_tokens = 0
+
+    async def chat(self, messages):
+        tokens = " ".join(f"<{m.role}> {m.content}" for m in messages).split()
+        reused = 0
+        for old, new in zip(self._last_tokens, tokens):
+            if old != new:
+                break
+            reused += 1
+        self.reused_tokens += reused
+        self.prompt_tokens += len(tokens)
+        self._last_tokens = tokens
+        return Message(role="assistant", content="ok")
+
+
+def _planner_prompt(retrieved, critique, **kwargs):
+    return get("minecraft", "planner").build_prompt(
+        skillset=retrieved,
+        code_snippet=None,
+        observation="Biome: plains",
+        task=SimpleNamespace(command="Mine 1 wood log", context=""),
+        critique=critique,
+        **kwargs,
+    )
+
+
+ATTEMPTS = [
+    ([Skill("mineWoodLog", "async function mineWoodLog(bot) { /* a */ }")], ""),
+    ([Skill("craftPlanks", "async function craftPlanks(bot) { /* b */ }")], "No wood log in inventory."),
+]
+
+
+class TestStablePrefix:
+    """Unit tests for prefix marking in the prompt builders"""
+
+    def test_message_prefix_hash(self):
+        """Test that prefix_hash identifies the prefix and equality ignores the marker"""
+        a = Message("system", "static part | dynamic A", prefix_len=13)
+        b = Message("system", "static part | dynamic B", prefix_len=13)
+
+        assert a.prefix == "static part |"
+        assert a.prefix_hash == b.prefix_hash
+        assert Message("system", "x").prefix_hash is None
+        assert Message("system", "x", prefix_len=1) == Message("system", "x")
+
+    def test_static_system_prompts_are_fully_marked(self):
+        """Test that builders with template-only system prompts mark the whole message"""
+        system, _ = get("minecraft", "critic").build_prompt(
+            observation="Biome: plains", task=SimpleNamespace(command="Mine 1 wood log", context="")
+        )
+        assert system.prefix_len == len(system.content) > 0
+
+    def test_planner_prefix_is_stable_across_attempts(self):
+        """Test that only the retrieved programs follow the static planner prefix"""
+        first, _ = _planner_prompt(*ATTEMPTS[0], static_skillset=PRIMITIVE_USAGE)
+        second, _ = _planner_prompt(*ATTEMPTS[1], static_skillset=PRIMITIVE_USAGE)
+
+        assert first.prefix_hash == second.prefix_hash
+        assert all(skill.code in first.prefix for skill in PRIMITIVE_USAGE)
+        assert "mineWoodLog" not in first.prefix
+        assert "mineWoodLog" in first.content[first.prefix_len:]
+
+    @pytest.mark.asyncio
+    async def test_prefix_tokens_are_reused(self):
+        """Test that the static-first layout lets a KV cache reuse the whole static prefix"""
+        static_first = PrefixReuseLLM()
+        mixed = PrefixReuseLLM()
+        for retrieved, critique in ATTEMPTS:
+            await static_first.chat(_planner_prompt(retrieved, critique, static_skillset=PRIMITIVE_USAGE))
+            # previous layout: primitives and retrieved skills interleaved in one program list
+            await mixed.chat(_planner_prompt(PRIMITIVE_USAGE + retrieved, critique))
+
+        system, _ = _planner_prompt(*ATTEMPTS[1], static_skillset=PRIMITIVE_USAGE)
+        assert static_first.reused_tokens >= len(f"<system> {system.prefix}".split())
+        assert static_first.reused_tokens > mixed.reused_tokens
@@ -0,0 +1,160 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from domain.models import Message
+from domain.services.qa import QAService
+
+
+@pytest.fixture
+def llm():
+    llm = Mock()
+    llm.chat = AsyncMock(return_value=Message(role="assistant", content="Answer: mine iron ore"))
+    return llm
+
+
+@pytest.fixture
+def database():
+    database = Mock()
+    database.lookup.return_value = None
+    database.semantic_lookup = AsyncMock(return_value=None)
+    database.semantic_store = AsyncMock(return_value=None)
+    return database
+
+
+@pytest.fixture
+def answer_prompt_builder():
+    builder = Mock()
+    builder.build_prompt.return_value = (Message("system", "sys"), Message("user", "q"))
+    return builder
+
+
+def _service(llm, database, answer_prompt_builder, **kwargs) -> QAService:
+    return QAService(
+        llm=llm,
+        question_prompt_builder=Mock(),
+        answer_prompt_builder=answer_prompt_builder,
+        parser=Mock(),
+        database=database,
+        **kwargs,
+    )
+
+
+class TestQAAnswerCache:
+    """Unit tests for the semantic answer cache in QAService.get_answer"""
+
+    @pytest.mark.asyncio
+    async def test_cache_hit_skips_llm(self, llm, database, answer_prompt_builder):
+        """Test that a near-duplicate question is answered from the cache"""
+        database.semantic_lookup.return_value = "Answer: cached"
+        service = _service(llm, database, answer_prompt_builder, cache_max_distance=0.05)
+
+        answer = await service.get_answer("How to obtain iron ore in plains?")
+
+        assert answer == "Answer: cached"
+        database.semantic_lookup.assert_awaited_once_with("How to obtain iron ore in plains?", max_distance=0.05)
+        llm.chat.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_exact_repeat_skips_semantic_lookup(self, llm, database, answer_prompt_builder):
+        """Test that an exact repeat is answered from the key/value store without an embedding"""
+        database.lookup.return_value = "Answer: exact"
+        service = _service(llm, database, answer_prompt_builder)
+
+        assert await service.get_answer("How to obtain iron ore in plains?") == "Answer: exact"
+        database.semantic_lookup.assert_not_awaited()
+        llm.chat.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_semantic_hit_is_stored_for_exact_repeats(self, llm, database, answer_prompt_builder):
+        """Test that a near-duplicate hit is remembered under the new wording"""
+        database.semantic_lookup.return_value = "Answer: cached"
+        service = _service(llm, database, answer_prompt_builder)
+
+        await service.get_answer("How do I get iron ore in plains?")
+
+        database.store.assert_called_once_with("How do I get iron ore in plains?", "Answer: cached")
+
+    @pytest.mark.asyncio
+    async def test_cache_miss_calls_llm_and_writes_back(self, llm, database, answer_prompt_builder):
+        """Test that a miss is answered by the LLM and stored in the background"""
+        service = _service(llm, database, answer_prompt_builder)
+
+        answer = await service.get_answer("How to obtain iron ore in plains?")
+        await service.flush()
+
+        assert answer == "Answer: mine iron ore"
+        llm.chat.assert_awaited_once()
+        database.semantic_store.assert_awaited_once_with("How to obtain iron ore in plains?", "Answer: mine iron ore")
+        database.store.assert_called_once_with("How to obtain iron ore in plains?", "Answer: mine iron ore")
+
+    @pytest.mark.asyncio
+    async def test_failed_write_back_does_not_raise(self, llm, database, answer_prompt_builder):
+        """Test that a failing cache write only logs"""
+        database.semantic_store.side_effect = RuntimeError("disk full")
+        service = _service(llm, database, answer_prompt_builder)
+
+        assert await service.get_answer("q") == "Answer: mine iron ore"
+        await service.flush()
+
+    @pytest.mark.asyncio
+    async def test_cache_disabled(self, llm, database, answer_prompt_builder):
+        """Test that cache_max_distance=None bypasses the cache entirely"""
+        service = _service(llm, database, answer_prompt_builder, cache_max_distance=None)
+
+        await service.get_answer("q")
+        await service.flush()
+
+        database.lookup.assert_not_called()
+        database.semantic_lookup.assert_not_awaited()
+        database.semantic_store.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_unknown_answers_are_not_cached(self, llm, database, answer_prompt_builder):
+        """Test that an "Answer: Unknown" reply is returned but not stored, and a stored one is a miss"""
+        llm.chat.return_value = Message(role="assistant", content="Answer: Unknown.")
+        database.lookup.return_value = "Answer: Unknown"
+        database.semantic_lookup.return_value = "Answer: unknown"
+        service = _service(llm, database, answer_prompt_builder)
+
+        assert await service.get_answer("How to obtain diamonds?") == "Answer: Unknown."
+        await service.flush()
+
+        llm.chat.assert_awaited_once()
+        database.store.assert_not_called()
+        database.semantic_store.assert_not_awaited()
+
+
+class TestFlushOnStop:
+    """Unit tests for flushing the QA cache when an agent stops"""
+
+    @pytest.mark.asyncio
+    async def test_stop_waits_for_pending_writes(self, llm, database, answer_prompt_builder):
+        """Test that AgentController.stop waits for background cache writes through the curriculum"""
+        import asyncio
+        from application.agent_controller import AgentController
+        from domain.services import CurriculumService
+
+        written = asyncio.Event()
+
+        async def slow_store(question, answer):
+            await asyncio.sleep(0.01)
+            written.set()
+
+        database.semantic_store.side_effect = slow_store
+        service = _service(llm, database, answer_prompt_builder)
+        curriculum = CurriculumService(llm=Mock(), qa_service=service, prompt_builder=Mock(), parser=Mock())
+
+        async def never(*args):
+            await asyncio.Event().wait()
+
+        controller = AgentController(
+            curriculum_service=curriculum, skill_service=Mock(clear=AsyncMock()), planner_service=Mock(),
+            critic_service=Mock(), env=Mock(reset=AsyncMock(side_effect=never), close=AsyncMock()),
+            speculative_curriculum=False,
+        )
+        controller.start()
+        await service.get_answer("How to obtain iron ore in plains?")
+        await controller.stop()
+
+        assert written.is_set()
@@ -0,0 +1,240 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from domain.exceptions import RateLimitError
+from domain.models import Message
+from domain.ports import LLMPort
+from infrastructure.adapters.llm import ResilientLLM
+from infrastructure.adapters.llm.rate_limited_llm import QuotaScheduler
+
+
+class FakeClock:
+    """Virtual time: `sleep` advances the clock instead of waiting."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        await asyncio.sleep(0)
+        self.now += seconds
+
+
+class FakeLLM(LLMPort):
+    model_name = "fake-model"
+
+    def __init__(self, clock, failures=0, retry_after=5.0):
+        self.clock = clock
+        self.failures = failures
+        self.retry_after = retry_after
+        self.calls = []
+
+    async def chat(self, messages):
+        self.calls.append((messages[-1].content, self.clock()))
+        if self.failures:
+            self.failures -= 1
+            raise RateLimitError("quota exceeded", retry_after=self.retry_after)
+        return Message(role="assistant", content="ok")
+
+
+def _prompt(text):
+    return [Message(role="user", content=text)]
+
+
+def _scheduler(clock, rpm=60, tpm=1_000_000, **kwargs):
+    return QuotaScheduler(
+        rpm, tpm,
+        expected_output_tokens=0,
+        clock=clock,
+        sleep=clock.sleep,
+        token_counter=len,
+        **kwargs,
+    )
+
+
+class TestQuotaScheduler:
+    """Unit tests for QuotaScheduler / RateLimitedLLM on a fake clock"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.mark.asyncio
+    async def test_requests_per_minute(self, clock):
+        """Test that calls beyond the RPM burst are spaced by 60/rpm seconds"""
+        fake = FakeLLM(clock)
+        llm = _scheduler(clock, rpm=2).bind(fake, "qa")
+
+        for i in range(4):
+            await llm.chat(_prompt(f"q{i}"))
+
+        assert [t for _, t in fake.calls] == [0.0, 0.0, 30.0, 60.0]
+
+    @pytest.mark.asyncio
+    async def test_tokens_per_minute(self, clock):
+        """Test that a call waits until the token bucket covers its estimate"""
+        fake = FakeLLM(clock)
+        # reply "ok" costs 2 tokens on top of the prompt
+        llm = _scheduler(clock, tpm=60).bind(fake, "qa")
+
+        await llm.chat(_prompt("x" * 40))
+        await llm.chat(_prompt("x" * 40))
+
+        # 60 - 42 = 18 tokens left; 22 more arrive at 1 token/s
+        assert fake.calls[1][1] == pytest.approx(22.0)
+
+    @pytest.mark.asyncio
+    async def test_priority_order(self, clock):
+        """Test that queued planner calls are admitted before earlier QA calls"""
+        fake = FakeLLM(clock)
+        scheduler = _scheduler(clock, rpm=1)
+        qa = scheduler.bind(fake, "qa")
+        planner = scheduler.bind(fake, "planner")
+        skill = scheduler.bind(fake, "skill_description")
+
+        await qa.chat(_prompt("warm-up"))  # drain the single-request burst
+        calls = [
+            asyncio.create_task(skill.chat(_prompt("skill"))),
+            asyncio.create_task(qa.chat(_prompt("qa"))),
+            asyncio.create_task(planner.chat(_prompt("planner"))),
+        ]
+        await asyncio.sleep(0)
+        assert scheduler.stats()["queue_depth"] == 3
+        await asyncio.gather(*calls)
+
+        assert [text for text, _ in fake.calls] == ["warm-up", "planner", "qa", "skill"]
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_error_pauses_and_retries(self, clock):
+        """Test that a 429 blocks the queue for retry_after and the call is retried"""
+        fake = FakeLLM(clock, failures=1, retry_after=5.0)
+        scheduler = _scheduler(clock)
+        llm = scheduler.bind(fake, "critic")
+
+        reply = await llm.chat(_prompt("q"))
+
+        assert reply.content == "ok"
+        assert [t for _, t in fake.calls] == [0.0, 5.0]
+        assert scheduler.stats()["services"]["critic"]["rate_limited"] == 1
+
+    @pytest.mark.asyncio
+    async def test_rate_limit_retries_exhausted(self, clock):
+        """Test that RateLimitError propagates once the retries are used up"""
+        fake = FakeLLM(clock, failures=10)
+        llm = _scheduler(clock, max_rate_limit_retries=2).bind(fake, "qa")
+
+        with pytest.raises(RateLimitError):
+            await llm.chat(_prompt("q"))
+        assert len(fake.calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_cancelled_waiter_leaves_queue(self, clock):
+        """Test that a cancelled call does not block the ones behind it"""
+        fake = FakeLLM(clock)
+        scheduler = _scheduler(clock, rpm=1)
+        llm = scheduler.bind(fake, "qa")
+
+        await llm.chat(_prompt("warm-up"))
+        blocked = asyncio.create_task(scheduler.bind(fake, "planner").chat(_prompt("cancelled")))
+        queued = asyncio.create_task(llm.chat(_prompt("queued")))
+        await asyncio.sleep(0)
+        blocked.cancel()
+        await queued
+
+        assert [text for text, _ in fake.calls] == ["warm-up", "queued"]
+        assert scheduler.stats()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_wait_time_stats(self, clock):
+        """Test that per-service wait times are reported"""
+        fake = FakeLLM(clock)
+        scheduler = _scheduler(clock, rpm=1)
+        llm = scheduler.bind(fake, "curriculum")
+
+        await llm.chat(_prompt("a"))
+        await llm.chat(_prompt("b"))
+
+        stats = scheduler.stats()["services"]["curriculum"]
+        assert stats["served"] == 2
+        assert stats["max_wait"] == pytest.approx(60.0)
+        assert stats["mean_wait"] == pytest.approx(30.0)
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_is_settled(self, clock):
+        """Test that closing a stream early corrects the reservation with the chunks streamed so far"""
+        class StreamingLLM(FakeLLM):
+            async def chat_stream(self, messages):
+                for chunk in ("abc", "def"):
+                    yield chunk
+
+        scheduler = QuotaScheduler(60, 1_000_000, expected_output_tokens=100, clock=clock, sleep=clock.sleep, token_counter=len)
+        scheduler.settle = Mock(wraps=scheduler.settle)
+        stream = scheduler.bind(StreamingLLM(clock), "planner").chat_stream(_prompt("q"))
+
+        assert await stream.__anext__() == "abc"
+        await stream.aclose()
+
+        scheduler.settle.assert_called_once_with(101, 1, "abc")
+
+    @pytest.mark.asyncio
+    async def test_encoding_is_loaded_off_the_event_loop(self, monkeypatch):
+        """Test that the tiktoken encoding is loaded in a worker thread and a failed load falls back to the heuristic"""
+        import threading
+        from infrastructure.adapters.llm import rate_limited_llm
+
+        threads = []
+
+        def failing_load():
+            threads.append(threading.get_ident())
+            return False
+
+        monkeypatch.setattr(rate_limited_llm, "_encoding", None)
+        monkeypatch.setattr(rate_limited_llm, "_load_encoding", failing_load)
+        scheduler = QuotaScheduler(60, 1_000_000)
+
+        assert await scheduler.prompt_tokens(_prompt("x" * 40)) == 11
+        assert threads and threads[0] != threading.get_ident()
+        await scheduler.prompt_tokens(_prompt("y"))
+        assert len(threads) == 1
+
+    def test_unknown_service(self, clock):
+        """Test that binding an unknown service is rejected"""
+        with pytest.raises(ValueError):
+            _scheduler(clock).bind(FakeLLM(clock), "unknown")
+
+
+class TestResilientOverQuota:
+    """Unit tests for a ResilientLLM on top of a RateLimitedLLM"""
+
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+
+    @pytest.mark.asyncio
+    async def test_quota_wait_is_not_latency(self, clock):
+        """Test that time queued for quota is left out of the recorded latency"""
+        llm = ResilientLLM(_scheduler(clock, rpm=1).bind(FakeLLM(clock), "qa"), service="qa", clock=clock)
+
+        await llm.chat(_prompt("a"))
+        await llm.chat(_prompt("b"))
+
+        assert clock() == pytest.approx(60.0)
+        assert llm.latency.percentile(1.0) == pytest.approx(0.0)
+
+    @pytest.mark.asyncio
+    async def test_rate_limits_are_retried_by_the_scheduler_only(self, clock):
+        """Test that with retry_rate_limits=False a 429 is sent 1 + max_rate_limit_retries times, not multiplied"""
+        fake = FakeLLM(clock, failures=10)
+        llm = ResilientLLM(
+            _scheduler(clock, max_rate_limit_retries=2).bind(fake, "qa"),
+            service="qa", retry_rate_limits=False, clock=clock, sleep=clock.sleep, deadline=1000,
+        )
+
+        with pytest.raises(RateLimitError):
+            await llm.chat(_prompt("q"))
+        assert len(fake.calls) == 3
+        assert llm.stats()["retries"] == 0
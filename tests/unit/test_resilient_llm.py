@@ -0,0 +1,188 @@
+import asyncio
+
+import pytest
+
+from domain.exceptions import LLMError, LLMTimeoutError, TransientLLMError
+from domain.models import Message
+from domain.ports import LLMPort
+from infrastructure.adapters.llm import LatencyTracker, ResilientLLM
+
+
+class ScriptedLLM(LLMPort):
+    """Each call pops the next (delay, outcome) step; outcome is a reply or an exception."""
+
+    model_name = "fake-model"
+    supports_streaming = True
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+        self.calls = 0
+        self.cancelled = 0
+
+    async def chat(self, messages):
+        self.calls += 1
+        delay, outcome = self.steps.pop(0) if self.steps else (0, "ok")
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return Message(role="assistant", content=outcome)
+
+
+def _resilient(llm, **kwargs):
+    async def no_sleep(seconds):
+        no_sleep.slept.append(seconds)
+    no_sleep.slept = []
+    kwargs.setdefault("sleep", no_sleep)
+    kwargs.setdefault("rng", lambda: 1.0)
+    return ResilientLLM(llm, service="qa", **kwargs), no_sleep.slept
+
+
+PROMPT = [Message(role="user", content="q")]
+
+
+class TestResilientLLM:
+    """Unit tests for ResilientLLM"""
+
+    @pytest.mark.asyncio
+    async def test_transient_errors_are_retried_with_backoff(self):
+        """Test exponential backoff between retries of transient failures"""
+        llm = ScriptedLLM([(0, TransientLLMError("503")), (0, TransientLLMError("503")), (0, "ok")])
+        resilient, slept = _resilient(llm, backoff_base=0.5)
+
+        reply = await resilient.chat(PROMPT)
+
+        assert reply.content == "ok"
+        assert slept == [0.5, 1.0]
+        assert resilient.stats()["retries"] == 2
+
+    @pytest.mark.asyncio
+    async def test_permanent_errors_are_not_retried(self):
+        """Test that a non-transient LLMError propagates immediately"""
+        llm = ScriptedLLM([(0, LLMError("400 bad request"))])
+        resilient, _ = _resilient(llm)
+
+        with pytest.raises(LLMError, match="400"):
+            await resilient.chat(PROMPT)
+        assert llm.calls == 1
+
+    @pytest.mark.asyncio
+    async def test_retries_exhausted(self):
+        """Test that the last transient error surfaces after max_retries"""
+        llm = ScriptedLLM([(0, TransientLLMError("503"))] * 5)
+        resilient, _ = _resilient(llm, max_retries=1)
+
+        with pytest.raises(TransientLLMError):
+            await resilient.chat(PROMPT)
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_latency_is_the_winning_attempt(self):
+        """Test that failed attempts and backoff are not counted in the recorded latency"""
+        llm = ScriptedLLM([(0, TransientLLMError("503")), (0.01, "ok")])
+        resilient, _ = _resilient(llm, backoff_base=0.2, sleep=asyncio.sleep)
+
+        await resilient.chat(PROMPT)
+
+        assert len(resilient.latency) == 1
+        assert resilient.latency.percentile(1.0) < 0.1
+
+    @pytest.mark.asyncio
+    async def test_attempt_timeout_then_retry(self):
+        """Test that a stalled attempt is abandoned and retried"""
+        llm = ScriptedLLM([(10, "slow"), (0, "fast")])
+        resilient, _ = _resilient(llm, attempt_timeout=0.05)
+
+        reply = await resilient.chat(PROMPT)
+
+        assert reply.content == "fast"
+        assert llm.cancelled == 1
+        assert resilient.stats()["timeouts"] == 1
+
+    @pytest.mark.asyncio
+    async def test_deadline(self):
+        """Test that the total deadline bounds the call including retries"""
+        llm = ScriptedLLM([(10, "slow")] * 5)
+        resilient, _ = _resilient(llm, deadline=0.05, sleep=asyncio.sleep)
+
+        with pytest.raises(LLMTimeoutError):
+            await resilient.chat(PROMPT)
+
+    @pytest.mark.asyncio
+    async def test_hedge_after_p95(self):
+        """Test that a slow attempt gets a duplicate and the faster reply wins"""
+        llm = ScriptedLLM([(0.01, "ok")] * 20 + [(10, "straggler"), (0.01, "hedge")])
+        resilient, _ = _resilient(llm, hedge=True, hedge_min_samples=20)
+        for _ in range(20):
+            await resilient.chat(PROMPT)
+
+        reply = await asyncio.wait_for(resilient.chat(PROMPT), 1)
+
+        assert reply.content == "hedge"
+        assert llm.cancelled == 1
+        stats = resilient.stats()
+        assert stats["hedges"] == stats["hedge_wins"] == 1
+
+    @pytest.mark.asyncio
+    async def test_no_hedge_before_calibration(self):
+        """Test that hedging waits for enough latency samples"""
+        llm = ScriptedLLM([(0.05, "ok")])
+        resilient, _ = _resilient(llm, hedge=True, hedge_min_samples=20)
+
+        await resilient.chat(PROMPT)
+
+        assert llm.calls == 1
+        assert resilient.hedge_delay() is None
+
+    @pytest.mark.asyncio
+    async def test_stream_retried_before_first_chunk(self):
+        """Test that a stream failing before any output is retried"""
+        llm = ScriptedLLM([(0, TransientLLMError("reset")), (0, "ok")])
+        resilient, _ = _resilient(llm)
+
+        chunks = [chunk async for chunk in resilient.chat_stream(PROMPT)]
+
+        assert chunks == ["ok"]
+        assert llm.calls == 2
+
+    @pytest.mark.asyncio
+    async def test_stream_closed_early_is_recorded(self):
+        """Test that a stream the consumer closes after its first chunk still records its latency"""
+        class ChunkedLLM(ScriptedLLM):
+            async def chat_stream(self, messages):
+                for chunk in ("a", "b", "c"):
+                    yield chunk
+
+        resilient, _ = _resilient(ChunkedLLM([]))
+        stream = resilient.chat_stream(PROMPT)
+
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+
+        assert len(resilient.latency) == 1
+
+
+class TestLatencyTracker:
+    """Unit tests for LatencyTracker"""
+
+    def test_percentiles(self):
+        """Test nearest-rank percentiles"""
+        tracker = LatencyTracker()
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        snapshot = tracker.snapshot()
+        assert snapshot["count"] == 100
+        assert snapshot["p50"] == pytest.approx(0.050)
+        assert snapshot["p95"] == pytest.approx(0.095)
+        assert snapshot["p99"] == pytest.approx(0.099)
+
+    def test_window(self):
+        """Test that only the most recent samples are kept"""
+        tracker = LatencyTracker(window=2)
+        for seconds in (10.0, 1.0, 2.0):
+            tracker.record(seconds)
+        assert tracker.percentile(1.0) == 2.0
@@ -0,0 +1,112 @@
+from unittest.mock import Mock
+
+import pytest
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill, Task
+from domain.services import SkillService
+from domain.services.call_graph import normalized_code_hash
+from infrastructure.adapters.database import NumpyVectorDatabase
+
+MINE_WOOD_LOG = Skill(
+    "mineWoodLog",
+    "async function mineWoodLog(bot) {\n  // one log\n  await mineBlock(bot, 'oak_log', 1);\n}",
+    "Mine one oak log from a nearby tree",
+)
+
+
+@pytest.fixture
+def open_database(tmp_path):
+    def open_database():
+        return NumpyVectorDatabase("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+    return open_database
+
+
+def _service(database, **kwargs) -> SkillService:
+    return SkillService(llm=Mock(), prompt_builder=Mock(), database=database, **kwargs)
+
+
+class TestNormalizedCodeHash:
+    """Unit tests for normalized_code_hash"""
+
+    def test_names_comments_and_whitespace_are_ignored(self):
+        """Test that a renamed, reformatted copy hashes alike"""
+        renamed = "async function collectWoodLogs(bot){ await mineBlock(bot,'oak_log',1); } // copy"
+        assert normalized_code_hash(MINE_WOOD_LOG.code) == normalized_code_hash(renamed)
+
+    def test_literals_matter(self):
+        """Test that a different block name is a different program"""
+        birch = MINE_WOOD_LOG.code.replace("oak_log", "birch_log")
+        assert normalized_code_hash(MINE_WOOD_LOG.code) != normalized_code_hash(birch)
+
+
+class TestSkillDedupe:
+    """Unit tests for near-duplicate collapse in SkillService.add_skill"""
+
+    @pytest.mark.asyncio
+    async def test_exact_duplicate_becomes_an_alias(self, open_database):
+        """Test that a renamed copy is not stored and is searchable under its alias"""
+        database = open_database()
+        service = _service(database)
+        await service.add_skill(MINE_WOOD_LOG)
+
+        stored = await service.add_skill(
+            Skill("collectWoodLogs", "async function collectWoodLogs(bot) { await mineBlock(bot, 'oak_log', 1); }", "Collect logs."),
+            task=Task(command="Collect wood logs", reasoning="", context=""),
+        )
+
+        assert stored.name == "mineWoodLog"
+        assert database.count() == 1
+        assert service.aliases("mineWoodLog") == ["collectWoodLogs"]
+        skills = await service.retrieve_skillset(Task(command="Collect wood logs", reasoning="", context=""))
+        assert [skill.name for skill in skills] == ["mineWoodLog"]
+
+    @pytest.mark.asyncio
+    async def test_near_duplicate_description(self, open_database):
+        """Test that a different program with a near-identical description is merged"""
+        database = open_database()
+        service = _service(database, duplicate_max_distance=0.2)
+        await service.add_skill(MINE_WOOD_LOG)
+
+        stored = await service.add_skill(
+            Skill("mineOakLog", "async function mineOakLog(bot) { await exploreUntil(bot, v, 60); await mineBlock(bot, 'oak_log'); }",
+                  "Mine an oak log from a nearby tree")
+        )
+
+        assert stored.name == "mineWoodLog"
+        assert database.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_distinct_skill_and_new_version_are_kept(self, open_database):
+        """Test that unrelated skills are added and a same-name skill replaces its old version"""
+        database = open_database()
+        service = _service(database)
+        await service.add_skill(MINE_WOOD_LOG)
+        await service.add_skill(Skill("craftTable", "async function craftTable(bot) { await craftItem(bot, 'crafting_table'); }", "Craft a crafting table."))
+        updated = Skill(MINE_WOOD_LOG.name, MINE_WOOD_LOG.code.replace("1);", "2);"), MINE_WOOD_LOG.description)
+
+        assert await service.add_skill(updated) is updated
+        assert database.count() == 2
+
+    @pytest.mark.asyncio
+    async def test_aliases_survive_restart(self, open_database):
+        """Test that a resumed library still merges into and searches by recorded aliases"""
+        service = _service(open_database())
+        await service.add_skill(MINE_WOOD_LOG)
+        await service.add_skill(Skill("collectWoodLogs", MINE_WOOD_LOG.code.replace("mineWoodLog", "collectWoodLogs"), "Collect logs."))
+
+        resumed = _service(open_database())
+        skills = await resumed.retrieve_skillset(Task(command="Collect wood logs", reasoning="", context=""))
+
+        assert [skill.name for skill in skills] == ["mineWoodLog"]
+        assert resumed.aliases("mineWoodLog") == ["collectWoodLogs"]
+
+    @pytest.mark.asyncio
+    async def test_dedupe_disabled(self, open_database):
+        """Test that dedupe=False stores every skill"""
+        database = open_database()
+        service = _service(database, dedupe=False)
+        await service.add_skill(MINE_WOOD_LOG)
+        await service.add_skill(Skill("collectWoodLogs", MINE_WOOD_LOG.code.replace("mineWoodLog", "collectWoodLogs"), "Collect logs."))
+
+        assert database.count() == 2
@@ -0,0 +1,121 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.skill_ingestion import SkillIngestionWorker
+from domain.models import Skill
+
+
+def _snippet(name: str, code: str = "") -> Mock:
+    return Mock(function_name=name, main_function_code=code or f"async function {name}(bot) {{}}")
+
+
+@pytest.fixture
+def skill_service():
+    service = Mock()
+    release = asyncio.Event()
+
+    async def describe_skill(code):
+        await release.wait()
+        return Skill(name=code.function_name, code=code.main_function_code, description="desc")
+
+    service.release = release
+    service.describe_skill = AsyncMock(side_effect=describe_skill)
+    service.add_skill = AsyncMock()
+    return service
+
+
+class TestSkillIngestionWorker:
+    """Unit tests for SkillIngestionWorker"""
+
+    @pytest.mark.asyncio
+    async def test_submit_does_not_wait_for_indexing(self, skill_service):
+        """Test that submit returns while the description is still pending, and flush waits for it"""
+        worker = SkillIngestionWorker(skill_service)
+        worker.start()
+
+        await asyncio.wait_for(worker.submit(_snippet("mineWoodLog"), task="task"), timeout=0.1)
+        await asyncio.sleep(0)
+        skill_service.add_skill.assert_not_awaited()
+
+        skill_service.release.set()
+        await worker.flush()
+        skill_service.add_skill.assert_awaited_once()
+        assert skill_service.add_skill.await_args.kwargs == {"task": "task"}
+        await worker.stop()
+
+    @pytest.mark.asyncio
+    async def test_queued_duplicates_are_collapsed(self, skill_service):
+        """Test that resubmitting a queued name keeps one entry with the latest code"""
+        worker = SkillIngestionWorker(skill_service)
+        await worker.submit(_snippet("craftTable", "v1"))
+        await worker.submit(_snippet("craftTable", "v2"))
+        assert worker.pending == 1
+
+        skill_service.release.set()
+        worker.start()
+        await worker.stop()
+
+        skill_service.describe_skill.assert_awaited_once()
+        assert skill_service.add_skill.await_args.args[0].code == "v2"
+
+    @pytest.mark.asyncio
+    async def test_bounded_queue_applies_backpressure(self, skill_service):
+        """Test that submit waits once max_pending programs are queued"""
+        worker = SkillIngestionWorker(skill_service, max_pending=1)
+        await worker.submit(_snippet("a"))
+
+        blocked = asyncio.create_task(worker.submit(_snippet("b")))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        skill_service.release.set()
+        worker.start()
+        await blocked
+        await worker.stop()
+        assert skill_service.add_skill.await_count == 2
+
+    @pytest.mark.asyncio
+    async def test_failures_do_not_stop_the_worker(self, skill_service):
+        """Test that a failed description is counted and later skills are still indexed"""
+        skill_service.release.set()
+        skill_service.add_skill.side_effect = [RuntimeError("embedding failed"), None]
+        worker = SkillIngestionWorker(skill_service)
+        worker.start()
+
+        await worker.submit(_snippet("a"))
+        await worker.submit(_snippet("b"))
+        await worker.stop()
+
+        assert (worker.failed, worker.ingested) == (1, 1)
+
+
+class TestControllerStop:
+    """Unit tests for stopping an AgentController whose loop already ended"""
+
+    @pytest.mark.asyncio
+    async def test_finished_loop_still_drains_the_worker(self, skill_service):
+        """Test that stop indexes the queued skills and closes the environment after the loop has failed"""
+        from application.agent_controller import AgentController
+        from benchmarks.curriculum_latency import _observation
+
+        env = Mock(reset=AsyncMock(return_value=_observation()), close=AsyncMock())
+        curriculum = Mock(get_next_task=AsyncMock(side_effect=RuntimeError("curriculum failed")), flush=AsyncMock())
+        controller = AgentController(
+            curriculum_service=curriculum, skill_service=skill_service, planner_service=Mock(), critic_service=Mock(),
+            env=env, speculative_curriculum=False,
+        )
+        await controller._skill_ingestion.submit(_snippet("mineWoodLog"))
+
+        controller.start()
+        await asyncio.gather(controller._running_task, return_exceptions=True)
+        assert not controller.is_running
+        skill_service.release.set()
+        await controller.stop()
+
+        skill_service.add_skill.assert_awaited_once()
+        env.close.assert_awaited_once()
+        curriculum.flush.assert_awaited_once()
+        await controller.stop()
+        env.close.assert_awaited_once()
@@ -0,0 +1,79 @@
+import json
+from unittest.mock import Mock
+
+import pytest
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Skill, Task
+from domain.services import SkillService
+from infrastructure.adapters.database import ChromaDatabase, NumpyVectorDatabase
+
+LIBRARY = [
+    Skill("mineWoodLog", "async function mineWoodLog(bot) { await mineBlock(bot, 'oak_log'); }", "mine wood log"),
+    Skill("craftTable", "async function craftTable(bot) { await craftItem(bot, 'crafting_table'); }", "craft crafting table"),
+]
+
+
+@pytest.fixture(params=[ChromaDatabase, NumpyVectorDatabase])
+def open_database(request, tmp_path):
+    def open_database():
+        return request.param("test_skills", HashEmbeddings(), persist_dir=tmp_path, score_threshold=0.9)
+    return open_database
+
+
+def _service(database) -> SkillService:
+    return SkillService(llm=Mock(), prompt_builder=Mock(), database=database)
+
+
+class TestSkillResume:
+    """Unit tests for resuming a persisted skill library"""
+
+    @pytest.mark.asyncio
+    async def test_library_survives_restart(self, open_database):
+        """Test that a new service indexes the persisted skills on first retrieval"""
+        await _service(open_database()).add_skill(LIBRARY[0])
+        await _service(open_database()).add_skill(LIBRARY[1])
+
+        resumed = _service(open_database())
+        skills = await resumed.retrieve_skillset(Task(command="Craft table", reasoning="", context=""))
+
+        assert skills[0].name == "craftTable"
+        assert sorted(skill.name for skill in await open_database().get_all()) == ["craftTable", "mineWoodLog"]
+
+    @pytest.mark.asyncio
+    async def test_tampered_skill_is_skipped_until_repair(self, open_database, tmp_path):
+        """Test that a skill whose code no longer matches the manifest is skipped, and only repair deletes it"""
+        await _service(open_database()).add_skill(LIBRARY[0])
+        await _service(open_database()).add_skill(LIBRARY[1])
+        manifest = tmp_path / "test_skills.manifest.json"
+        entries = json.loads(manifest.read_text())
+        entries["craftTable"] = "0" * 64
+        manifest.write_text(json.dumps(entries))
+
+        database = open_database()
+        assert [skill.name for skill in await database.get_all()] == ["mineWoodLog"]
+        assert database.count() == 2
+
+        assert await database.repair() == ["craftTable"]
+        assert database.count() == 1
+
+    @pytest.mark.asyncio
+    async def test_library_without_manifest_is_adopted(self, open_database, tmp_path):
+        """Test that a library written before manifests existed keeps every skill and gets a manifest"""
+        await _service(open_database()).add_skill(LIBRARY[0])
+        await _service(open_database()).add_skill(LIBRARY[1])
+        (tmp_path / "test_skills.manifest.json").unlink()
+
+        database = open_database()
+        assert sorted(skill.name for skill in await database.get_all()) == ["craftTable", "mineWoodLog"]
+        assert sorted(json.loads((tmp_path / "test_skills.manifest.json").read_text())) == ["craftTable", "mineWoodLog"]
+        assert await database.repair() == []
+
+    @pytest.mark.asyncio
+    async def test_clear_starts_fresh(self, open_database):
+        """Test that clear removes the persisted library and its manifest"""
+        service = _service(open_database())
+        await service.add_skill(LIBRARY[0])
+        await service.clear()
+
+        assert await open_database().get_all() == []
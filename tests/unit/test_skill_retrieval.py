@@ -0,0 +1,134 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from domain.models import Skill, Task
+from domain.services import BM25Index, SkillService
+from domain.services.lexical_index import tokenize
+
+
+def _skill(name: str, description: str) -> Skill:
+    return Skill(name=name, code=f"async function {name}(bot) {{}}", description=description)
+
+
+def _task(command: str) -> Task:
+    return Task(command=command, reasoning="", context="")
+
+
+LIBRARY = [
+    _skill("mineIronOre", "Mine iron ore with a stone pickaxe."),
+    _skill("craftFurnace", "Craft a furnace from 8 cobblestone."),
+    _skill("smeltIronIngot", "Smelt raw iron into iron ingots in a furnace."),
+    _skill("mineWoodLog", "Find a tree and mine one log."),
+]
+
+
+@pytest.fixture
+def database():
+    database = Mock()
+    database.lookup.return_value = None
+    database.get_all = AsyncMock(return_value=[])
+    database.add = AsyncMock()
+    database.clear = AsyncMock()
+    database.query = AsyncMock(return_value=[])
+    return database
+
+
+async def _service(database, **kwargs) -> SkillService:
+    # the mocked vector rankings would read as near duplicates; dedupe is covered in test_skill_dedupe
+    kwargs.setdefault("dedupe", False)
+    service = SkillService(llm=Mock(), prompt_builder=Mock(), database=database, **kwargs)
+    for skill in LIBRARY:
+        await service.add_skill(skill)
+    return service
+
+
+class TestSkillRetrieval:
+    """Unit tests for hybrid retrieval in SkillService.retrieve_skillset"""
+
+    @pytest.mark.asyncio
+    async def test_exact_lexical_hit_skips_the_vector_search(self, database):
+        """Test that a task naming a skill literally needs no embedding call"""
+        service = await _service(database)
+
+        skills = await service.retrieve_skillset(_task("Mine 3 iron ores"))
+
+        assert skills[0].name == "mineIronOre"
+        database.query.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rankings_are_fused_otherwise(self, database):
+        """Test that lexical and vector results are merged with RRF"""
+        database.query.return_value = [_skill("killZombie", "Kill a zombie."), LIBRARY[2]]
+        service = await _service(database)
+
+        skills = await service.retrieve_skillset(_task("Obtain iron ingots"))
+
+        database.query.assert_awaited_once_with("Obtain iron ingots")
+        names = [skill.name for skill in skills]
+        assert names[0] == "smeltIronIngot"  # ranked by both
+        assert "killZombie" in names
+
+    @pytest.mark.asyncio
+    async def test_retrieve_skillsets_batches_vector_searches(self, database):
+        """Test that only tasks without a lexical shortcut go to one query_many call"""
+        database.query_many = AsyncMock(return_value=[[LIBRARY[2]], []])
+        service = await _service(database)
+
+        results = await service.retrieve_skillsets(
+            [_task("Obtain iron ingots"), _task("Craft furnace"), _task("Build a house")]
+        )
+
+        database.query_many.assert_awaited_once_with(["Obtain iron ingots", "Build a house"])
+        database.query.assert_not_awaited()
+        assert results[0][0].name == "smeltIronIngot"
+        assert results[1][0].name == "craftFurnace"
+
+    @pytest.mark.asyncio
+    async def test_hybrid_disabled(self, database):
+        """Test that hybrid_retrieval=False uses the vector database only"""
+        service = await _service(database, hybrid_retrieval=False)
+
+        await service.retrieve_skillset(_task("Craft furnace"))
+
+        database.query.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_clear_empties_the_lexical_index(self, database):
+        """Test that clear resets the lexical side too"""
+        service = await _service(database)
+        await service.clear()
+
+        await service.retrieve_skillset(_task("Craft furnace"))
+
+        database.query.assert_awaited_once()
+
+
+class TestBM25Index:
+    """Unit tests for BM25Index"""
+
+    def test_tokenize_splits_identifiers(self):
+        """Test camelCase splitting, plural folding and stopword removal"""
+        assert tokenize("craftWoodenPlanks") == ["craft", "wooden", "plank"]
+        assert tokenize("Mine 3 iron ores with the pickaxe") == ["mine", "iron", "ore", "pickaxe"]
+
+    def test_rare_terms_rank_higher(self):
+        """Test that IDF favours the document matching the rarer term"""
+        index = BM25Index()
+        index.add("a", "mine stone")
+        index.add("b", "mine diamond")
+        index.add("c", "mine coal")
+
+        assert index.search("mine diamond")[0][0] == "b"
+
+    def test_replace_and_remove(self):
+        """Test that re-adding replaces the document and remove drops it"""
+        index = BM25Index()
+        index.add("a", "mine stone")
+        index.add("a", "craft table")
+
+        assert index.search("stone") == []
+        assert index.search("table")[0][0] == "a"
+        index.remove("a")
+        assert len(index) == 0
+        assert index.search("table") == []
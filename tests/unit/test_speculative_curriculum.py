@@ -0,0 +1,102 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from application.speculative_curriculum import SpeculativeCurriculum
+from domain.models import Observation
+from domain.services.curriculum import observation_similarity
+
+
+def _observation(biome: str = "plains", inventory: str = "oak_log: 3, wooden_pickaxe: 1") -> Observation:
+    return Observation(
+        biome=biome, time="day", nearby_blocks="grass_block, dirt, oak_log", other_blocks="",
+        nearby_entities="cow", health="20.0/20", hunger="20.0/20", position={"x": 0, "y": 64, "z": 0},
+        equipment="wooden_pickaxe", inventory=inventory, chests={},
+    )
+
+
+@pytest.fixture
+def curriculum():
+    curriculum = Mock()
+    curriculum.gather_qa = AsyncMock(return_value=[("How to get stone?", "Mine it.")])
+    curriculum.get_next_task = AsyncMock(return_value="task")
+    return curriculum
+
+
+class TestObservationSimilarity:
+    """Unit tests for observation_similarity"""
+
+    def test_counts_and_position_are_ignored(self):
+        """Test that mining one more log leaves the observation fully similar"""
+        after = _observation(inventory="oak_log: 4, wooden_pickaxe: 1")
+        after.position = {"x": 30, "y": 70, "z": -5}
+        assert observation_similarity(_observation(), after) == 1.0
+
+    def test_biome_change_is_a_new_context(self):
+        """Test that a different biome scores zero"""
+        assert observation_similarity(_observation(), _observation(biome="desert")) == 0.0
+
+    def test_new_items_lower_the_score(self):
+        """Test that new item names reduce the similarity"""
+        after = _observation(inventory="oak_log: 3, wooden_pickaxe: 1, cobblestone: 8, stone_pickaxe: 1")
+        assert 0.0 < observation_similarity(_observation(), after) < 1.0
+
+
+class TestSpeculativeCurriculum:
+    """Unit tests for SpeculativeCurriculum"""
+
+    @pytest.mark.asyncio
+    async def test_similar_observation_reuses_the_speculation(self, curriculum):
+        """Test that the QA pairs gathered during the step are passed on"""
+        speculation = SpeculativeCurriculum(curriculum)
+        speculation.speculate(_observation())
+        after = _observation(inventory="oak_log: 4, wooden_pickaxe: 1")
+
+        assert await speculation.next_task(after) == "task"
+
+        curriculum.gather_qa.assert_awaited_once()
+        curriculum.get_next_task.assert_awaited_once_with(after, qa_pairs=[("How to get stone?", "Mine it.")])
+        assert (speculation.reused, speculation.discarded) == (1, 0)
+
+    @pytest.mark.asyncio
+    async def test_changed_observation_discards_the_speculation(self, curriculum):
+        """Test that a stale speculation is cancelled and the QA phase runs afresh"""
+        gate = asyncio.Event()
+
+        async def slow_gather(observation):
+            await gate.wait()
+            return []
+
+        curriculum.gather_qa.side_effect = slow_gather
+        speculation = SpeculativeCurriculum(curriculum)
+        speculation.speculate(_observation())
+        await asyncio.sleep(0)
+
+        await speculation.next_task(_observation(biome="desert"))
+
+        curriculum.get_next_task.assert_awaited_once()
+        assert curriculum.get_next_task.await_args.kwargs == {"qa_pairs": None}
+        assert (speculation.reused, speculation.discarded) == (0, 1)
+
+    @pytest.mark.asyncio
+    async def test_retries_keep_a_similar_speculation(self, curriculum):
+        """Test that another attempt from a similar observation does not start a second QA phase"""
+        speculation = SpeculativeCurriculum(curriculum)
+        speculation.speculate(_observation())
+        await asyncio.sleep(0)
+        speculation.speculate(_observation(inventory="oak_log: 5, wooden_pickaxe: 1"))
+        await speculation.next_task(_observation())
+
+        curriculum.gather_qa.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_failed_speculation_falls_back(self, curriculum):
+        """Test that an error in the background QA phase is not raised to the caller"""
+        curriculum.gather_qa.side_effect = RuntimeError("quota")
+        speculation = SpeculativeCurriculum(curriculum)
+        speculation.speculate(_observation())
+
+        await speculation.next_task(_observation())
+
+        assert curriculum.get_next_task.await_args.kwargs == {"qa_pairs": None}
@@ -0,0 +1,120 @@
+import threading
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from benchmarks.stubs import HashEmbeddings
+from domain.models import Message, Skill, Task
+from domain.services import CriticService, SkillService
+from infrastructure.adapters.database import NumpyVectorDatabase, SqliteKeyValueStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SqliteKeyValueStore(tmp_path / "kv.sqlite3", namespace="test", lru_size=2)
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def database(tmp_path):
+    return NumpyVectorDatabase("test_memory", HashEmbeddings(), persist_dir=tmp_path)
+
+
+class TestSqliteKeyValueStore:
+    """Unit tests for SqliteKeyValueStore"""
+
+    def test_put_get_overwrite(self, store):
+        """Test that values round-trip and a second put replaces the first"""
+        assert store.get("q") is None
+        store.put("q", "a1")
+        store.put("q", "a2")
+
+        assert store.get("q") == "a2"
+        assert len(store) == 1
+
+    def test_values_persist_beyond_the_lru(self, store, tmp_path):
+        """Test that entries evicted from the LRU and from a closed store are read from disk"""
+        for i in range(5):
+            store.put(f"k{i}", f"v{i}")
+        assert store.stats()["lru_entries"] == 2
+        assert store.get("k0") == "v0"
+        store.close()
+
+        reopened = SqliteKeyValueStore(tmp_path / "kv.sqlite3", namespace="test")
+        assert [reopened.get(f"k{i}") for i in range(5)] == [f"v{i}" for i in range(5)]
+        reopened.close()
+
+    def test_namespaces_are_isolated(self, store, tmp_path):
+        """Test that stores sharing a file do not see or clear each other's keys"""
+        other = SqliteKeyValueStore(tmp_path / "kv.sqlite3", namespace="other")
+        store.put("k", "mine")
+        other.put("k", "theirs")
+        other.clear()
+
+        assert store.get("k") == "mine"
+        assert other.get("k") is None
+        other.close()
+
+    def test_concurrent_threads(self, store):
+        """Test that worker threads read and write through their own connections"""
+        def work(n):
+            for i in range(50):
+                store.put(f"{n}-{i}", str(i))
+                assert store.get(f"{n}-{i}") == str(i)
+
+        threads = [threading.Thread(target=work, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(store) == 200
+
+
+class TestExactMatchMemory:
+    """Unit tests for services answered from DatabasePort.lookup / store"""
+
+    @pytest.mark.asyncio
+    async def test_database_lookup_and_clear(self, database):
+        """Test that the vector database exposes the store and clear empties it"""
+        database.store("task:Mine 1 wood log", "mineWoodLog")
+
+        assert database.lookup("task:Mine 1 wood log") == "mineWoodLog"
+        await database.clear()
+        assert database.lookup("task:Mine 1 wood log") is None
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("cache", ["database", "store"])
+    async def test_critic_verdicts_are_reused(self, cache, request):
+        """Test that an identical critique prompt is answered without the LLM, from a database or a bare store"""
+        verdict_cache = request.getfixturevalue(cache)
+        llm = Mock()
+        llm.chat = AsyncMock(return_value=Message("assistant", "verdict"))
+        prompt_builder = Mock()
+        prompt_builder.build_prompt.return_value = (Message("system", "sys"), Message("user", "inventory: log"))
+        parser = Mock()
+        parser.parse.return_value = (False, "Mine one more log.")
+        critic = CriticService(llm=llm, prompt_builder=prompt_builder, parser=parser, verdict_cache=verdict_cache)
+        task = Task(command="Mine 2 wood logs", reasoning="", context="")
+
+        first = await critic.evaluate(Mock(), task)
+        second = await critic.evaluate(Mock(), task)
+
+        assert first == second == (False, "Mine one more log.")
+        llm.chat.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_solved_task_returns_its_skill_first(self, database):
+        """Test that a task solved before maps straight to its skill without a vector search"""
+        skills = SkillService(llm=Mock(), prompt_builder=Mock(), database=database)
+        await skills.add_skill(Skill("craftTable", "async function craftTable(bot) { await craftItem(bot, 'crafting_table'); }", "Craft a crafting table."))
+        await skills.add_skill(
+            Skill("gatherWood", "async function gatherWood(bot) { await mineBlock(bot, 'oak_log'); }", "Chop trees for logs."),
+            task=Task(command="Get some logs", reasoning="", context=""),
+        )
+        database.query = AsyncMock(side_effect=AssertionError("vector search"))
+
+        retrieved = await skills.retrieve_skillset(Task(command="Get some logs", reasoning="", context=""))
+
+        assert retrieved[0].name == "gatherWood"